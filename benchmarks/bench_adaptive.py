@@ -0,0 +1,107 @@
+"""自适应扫描模拟：python -m benchmarks.bench_adaptive --weeks 8
+
+按“工作日上午 9-11 点、下午 14-17 点集中发布，夜间和周末极少发布”的规律生成发布时间，
+分别模拟固定间隔扫描与自适应扫描，统计请求数和检测延迟（发布到被检测到的时间）分位数。
+自适应扫描按 --max 给出的每个冷清时段最长间隔（MAX_SCAN_INTERVAL）各模拟一次：
+冷清时段发布的条目最多要等一个最长间隔才被检测到，尾部延迟随之增长，请求数随之减少。
+前 --warmup 周只用于学习规律，不计入统计。
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+
+import benchmarks.common  # noqa: F401  设置环境变量与导入路径
+from utils.adaptive import PublishPattern
+
+
+def generate(start: datetime, weeks: int, per_day: float, off_hours: float, rng: random.Random):
+    """生成发布时间（时间戳，升序）"""
+    events = []
+    for day in range(weeks * 7):
+        date = start + timedelta(days=day)
+        workday = date.weekday() < 5
+        count = _poisson(rng, per_day if workday else per_day * off_hours)
+        for _ in range(count):
+            if workday and rng.random() > off_hours:
+                hour = rng.choice([9, 10, 11, 14, 15, 16])
+            else:
+                hour = rng.randrange(24)
+            events.append((date + timedelta(hours=hour, seconds=rng.randrange(3600))).timestamp())
+    return sorted(events)
+
+
+def _poisson(rng: random.Random, lam: float) -> int:
+    # Knuth 算法，lam 较小时足够
+    limit, k, p = 2.718281828 ** -lam, 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+
+def simulate(events, start: float, end: float, measure_from: float, next_delay, on_detect=None):
+    requests, latencies = 0, []
+    now, index = start, 0
+    while now < end:
+        if now >= measure_from:
+            requests += 1
+        found = []
+        while index < len(events) and events[index] <= now:
+            found.append(events[index])
+            index += 1
+        if found:
+            if now >= measure_from:
+                latencies.extend(now - published for published in found if published >= measure_from)
+            if on_detect is not None:
+                on_detect(now, found)
+        now += next_delay(now)
+    return requests, sorted(latencies)
+
+
+def percentile(values, q):
+    return values[min(int(len(values) * q), len(values) - 1)] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weeks", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--per-day", type=float, default=3, help="工作日平均发布条数")
+    parser.add_argument("--off-hours", type=float, default=0.05, help="非工作时段发布的比例")
+    parser.add_argument("--interval", type=float, default=300)
+    parser.add_argument("--min", type=float, default=120)
+    parser.add_argument("--max", type=float, nargs="+", default=[600, 900, 1800])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    start = datetime(2026, 1, 5)
+    events = generate(start, args.weeks, args.per_day, args.off_hours, random.Random(args.seed))
+    begin = start.timestamp()
+    end = (start + timedelta(weeks=args.weeks)).timestamp()
+    measure_from = (start + timedelta(weeks=args.warmup)).timestamp()
+
+    days = (end - measure_from) / 86400
+    print(f"{len(events)} postings over {args.weeks} weeks, measured over the last {days:.0f} days")
+
+    def report(label, requests, latencies):
+        print(f"{label:>14}: {requests} requests ({requests / days:.0f}/day), detection latency "
+              f"p50 {percentile(latencies, 0.5):.0f}s, p90 {percentile(latencies, 0.9):.0f}s, "
+              f"p99 {percentile(latencies, 0.99):.0f}s, max {latencies[-1] if latencies else 0:.0f}s")
+
+    fixed = simulate(events, begin, end, measure_from, lambda now: args.interval)
+    report("fixed", *fixed)
+    for max_interval in args.max:
+        pattern = PublishPattern(args.interval, args.min, max_interval)
+        requests, latencies = simulate(
+            events, begin, end, measure_from, pattern.next_delay,
+            lambda now, found: pattern.record_detection(
+                now, [datetime.fromtimestamp(t).strftime("%Y-%m-%d") for t in found]
+            ),
+        )
+        report(f"adaptive {max_interval:.0f}s", requests, latencies)
+        saved = fixed[0] - requests
+        print(f"{'':>14}  requests saved: {saved} ({saved / fixed[0]:.0%}), hot hours learned: {pattern.hot_hours()}")
+
+if __name__ == "__main__":
+    main()
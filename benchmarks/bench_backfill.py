@@ -0,0 +1,111 @@
+"""历史回填基准：python -m benchmarks.bench_backfill --records 5000 --delay 0.05
+
+本地桩服务器模拟栏目页和分页接口（每次请求延迟 --delay 秒，并记录同时进行的请求数）：
+1. 顺序抓取（1 个线程）与并发抓取的耗时对比；
+2. 抓取一部分后中断，再次运行只抓取未完成的页，最终条目完整（总数分别为每页条数的整数倍和非整数倍，
+   后者最新一页未满）；
+3. 栏目新增若干条记录后再次运行，只抓取最新的几页；
+4. 状态库中已有较早的历史（例如长期运行的监控记录）但没有回填进度时，遇到已有历史即停止。
+"""
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qsl
+
+from benchmarks.common import StubServer, make_page, make_record
+
+
+class Column:
+    def __init__(self, records: int, delay: float):
+        self.records = records
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.requests = 0
+
+    def app(self, method, path, headers, body):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.requests += 1
+        try:
+            time.sleep(self.delay)
+            if path.startswith("/col/"):
+                page = make_page(20, newest=self.records - 1)
+                return 200, {"Content-Type": "text/html; charset=utf-8"}, page.encode("utf-8")
+            params = dict(parse_qsl(body.decode("utf-8")))
+            start, end = int(params["startrecord"]), min(int(params["endrecord"]), self.records)
+            # 第 p 条（从新到旧，从 1 开始）对应编号 records - p 的记录
+            records = "".join(make_record(self.records - p) for p in range(start, end + 1))
+            xml = (f"<datastore><nextgroup><![CDATA[]]></nextgroup><recordset>{records}</recordset>"
+                   f"<totalrecord>{self.records}</totalrecord></datastore>")
+            return 200, {"Content-Type": "text/xml; charset=utf-8"}, xml.encode("utf-8")
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def reset(self):
+        self.requests = self.max_active = 0
+
+
+def run(url, store, workers, column, **kwargs):
+    from utils.backfill import Backfill, HostLimiter
+
+    column.reset()
+    backfill = Backfill(url, store, per_page=100, workers=workers,
+                        limiter=HostLimiter(workers, 0))
+    start = time.perf_counter()
+    stats = backfill.run(**kwargs)
+    return time.perf_counter() - start, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--delay", type=float, default=0.05, help="每次请求的响应延迟（秒）")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    from utils.store import StateStore
+
+    column = Column(args.records, args.delay)
+    with StubServer(column.app) as server, tempfile.TemporaryDirectory() as tmp:
+        url = f"{server.base_url}/col/col37116/index.html"
+
+        store = StateStore(Path(tmp) / "sequential.db")
+        elapsed, stats = run(url, store, 1, column)
+        print(f"sequential: {stats['pages']} pages, {store.count_items()} items in {elapsed:.2f}s")
+
+        # 先用最新一页未满的总数，最后一次为 --records 条，之后的步骤在这个库上继续
+        for records in (args.records + 50, args.records):
+            column.records = records
+            store = StateStore(Path(tmp) / f"concurrent-{records}.db")
+            elapsed, stats = run(url, store, args.workers, column, limit=10)
+            print(f"{records} records, interrupted after {stats['pages']} pages: {store.count_items()} items")
+            elapsed, stats = run(url, store, args.workers, column)
+            assert store.count_items() == records, store.count_items()
+            print(f"resumed: {stats['pages']} pages ({stats['skipped']} already done), {store.count_items()} items "
+                  f"in {elapsed:.2f}s, {column.requests} requests, max {column.max_active} concurrent")
+
+        column.records += 30
+        elapsed, stats = run(url, store, args.workers, column)
+        assert store.count_items() == column.records, store.count_items()
+        print(f"after 30 new postings: {stats['pages']} pages fetched, {stats['new_items']} new items, "
+              f"{column.requests} requests in {elapsed:.2f}s")
+
+        from utils.monitor import WebMonitor
+
+        monitor = WebMonitor(url)
+        store = StateStore(Path(tmp) / "history.db")
+        store.add_items(url, monitor.parse_content(make_page(column.records - 1000, newest=column.records - 1001)))
+        elapsed, stats = run(url, store, args.workers, column)
+        assert store.count_items() == column.records, store.count_items()
+        print(f"with older history already stored: {stats['pages']} pages fetched, {stats['new_items']} new items, "
+              f"{column.requests} requests in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""详情页抓取基准：python -m benchmarks.bench_detail --items 20 --delay 0.2
+
+本地桩服务器提供栏目页和详情页（详情页每次响应延迟 --delay 秒，正文下方附带附件链接）：
+1. 栏目页新增 --items 条记录后执行 check_once：检查本身的耗时（不等待详情页）与通知发出的时间，
+   分别使用 1 个线程和 --workers 个线程抓取详情页；
+2. 校验通知中每条记录都附带正文摘要和附件的绝对地址；
+3. 使用同一缓存目录再次获取这些详情页，不再请求服务器。
+"""
+import argparse
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.common import StubServer, make_page
+
+ARTICLE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{id}</title>
+<script>var pageId = {id};</script></head>
+<body>
+<div class="header">济南市历下区人民政府</div>
+<div class="article">
+<!--ZJEG_RSS.content.begin--><meta name="ContentStart">
+<div id="zoom"><p>为满足教育事业发展需要，历下区教育系统面向社会公开招聘教师，编号 {id}。</p>
+<p>报名时间为发布之日起 7 日内，报名方式详见附件。</p>
+<style>p {{ margin: 0 }}</style></div>
+<meta name="ContentEnd"><!--ZJEG_RSS.content.end-->
+</div>
+<div class="attachments">
+<a href="/module/download/downfile.jsp?classid=0&amp;filename={id}.pdf">附件1：招聘岗位表.pdf</a>
+<a href="/picture/0/{id}.xlsx">附件2：报名登记表.xlsx</a>
+<a href="/col/col37116/index.html">返回列表</a>
+</div>
+</body></html>
+"""
+
+
+class Site:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.newest = 19
+        self.lock = threading.Lock()
+        self.detail_requests = 0
+
+    def app(self, method, path, headers, body):
+        if path.startswith("/col/"):
+            page = make_page(20, newest=self.newest)
+            return 200, {"Content-Type": "text/html; charset=utf-8"}, page.encode("utf-8")
+        match = re.search(r"art_\d+_(\d+)\.html", path)
+        if match is None:
+            return 404, {}, b""
+        with self.lock:
+            self.detail_requests += 1
+        time.sleep(self.delay)
+        article = ARTICLE.format(id=match.group(1))
+        return 200, {"Content-Type": "text/html; charset=utf-8"}, article.encode("utf-8")
+
+
+def run_check(monitor, site, fetcher, items):
+    """栏目页新增 items 条后执行一次检查，返回 (检查耗时, 通知发出耗时, 通知内容)"""
+    from utils import detail
+
+    detail._fetcher = fetcher
+    sent = threading.Event()
+    result = {}
+
+    def notify_new(news_list, details):
+        result["elapsed"] = time.perf_counter() - start
+        result["message"] = monitor._format_new(news_list, details)
+        sent.set()
+
+    monitor._notify_new = notify_new
+    site.newest += items
+    start = time.perf_counter()
+    assert monitor.check_once()
+    check = time.perf_counter() - start
+    assert sent.wait(60), "通知未发出"
+    return check, result["elapsed"], result["message"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.2, help="详情页的响应延迟（秒）")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    from config.settings import settings
+    from utils.detail import DetailFetcher
+    from utils.monitor import WebMonitor
+
+    settings.DETAIL_FETCH = True
+    site = Site(args.delay)
+    with StubServer(site.app) as server, tempfile.TemporaryDirectory() as tmp:
+        monitor = WebMonitor(f"{server.base_url}/col/col37116/index.html", 60)
+        monitor.current_interval = 0
+        monitor.check_updates()
+
+        for workers in (1, args.workers):
+            fetcher = DetailFetcher(workers=workers, cache_dir=Path(tmp) / f"cache-{workers}")
+            check, notified, message = run_check(monitor, site, fetcher, args.items)
+            print(f"{workers} worker(s): check_once returned in {check * 1000:.1f} ms, "
+                  f"notification with details after {notified:.2f}s")
+            fetcher.shutdown()
+
+        entries = message.split("\n\n")
+        assert len(entries) == args.items, len(entries)
+        for entry in entries:
+            assert "摘要：为满足教育事业发展需要" in entry and "margin" not in entry, entry
+            assert f"{server.base_url}/module/download/downfile.jsp?classid=0&filename=" in entry, entry
+            assert "附件2：报名登记表.xlsx" in entry and "返回列表" not in entry, entry
+        print("example:\n" + entries[0])
+
+        # 同一缓存目录：再次获取上一轮的详情页
+        urls = re.findall(r"链接：(\S+)", message)
+        fetcher = DetailFetcher(workers=args.workers, cache_dir=Path(tmp) / f"cache-{args.workers}")
+        before = site.detail_requests
+        start = time.perf_counter()
+        details = [fetcher.fetch(url) for url in urls]
+        elapsed = time.perf_counter() - start
+        assert site.detail_requests == before and all(d["attachments"] for d in details)
+        objects = list((Path(tmp) / f"cache-{args.workers}" / "objects").rglob("*"))
+        print(f"cached: {len(urls)} details in {elapsed * 1000:.1f} ms without requests "
+              f"({sum(1 for p in objects if p.is_file())} objects on disk)")
+        fetcher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
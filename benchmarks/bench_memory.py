@@ -0,0 +1,76 @@
+"""每个目标的常驻内存基准：python -m benchmarks.bench_memory --targets 1000"""
+import argparse
+import gc
+import resource
+import tracemalloc
+
+from benchmarks.common import StubServer, make_page
+
+
+def rss_bytes() -> int:
+    """当前进程的常驻内存（RSS）"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        # 非 Linux 平台只能取得峰值
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--targets", type=int, default=1000)
+    parser.add_argument("--records", type=int, default=20)
+    parser.add_argument("--page-kb", type=int, default=60, help="页面中记录区域以外内容的大小（KB）")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--retain-html", action="store_true", help="模拟旧实现：每个目标保留整页内容")
+    parser.add_argument("--trace", action="store_true", help="用 tracemalloc 统计保留的 Python 堆内存（会增大 RSS）")
+    args = parser.parse_args()
+
+    from utils.engine import MonitorEngine
+    from utils.monitor import WebMonitor
+
+    filler = "<div class=\"nav\">" + "历下区人民政府门户网站栏目导航" * (args.page_kb * 1024 // 45) + "</div>\n"
+    page = make_page(args.records).replace("<div class=\"footer\">", filler + "<div class=\"footer\">")
+    payload = page.encode("utf-8")
+
+    def app(method, path, headers, body):
+        return 200, {"Content-Type": "text/html; charset=utf-8"}, payload
+
+    with StubServer(app) as server:
+        monitors = [WebMonitor(f"{server.base_url}/col/col{i}/index.html", 60) for i in range(args.targets)]
+        engine = MonitorEngine(monitors[:1], max_workers=args.workers)
+        # 预热：加载解析相关模块、建立连接
+        engine.run_cycle()
+        gc.collect()
+        before = rss_bytes()
+        if args.trace:
+            tracemalloc.start()
+
+        engine.run_cycle(monitors)
+        if args.retain_html:
+            for monitor in monitors:
+                monitor.last_content = bytes(payload).decode("utf-8")
+        gc.collect()
+        after = rss_bytes()
+        traced_after = tracemalloc.get_traced_memory()[0]
+        # 快照过期后每个目标只剩摘要、条目指纹和最新一条条目
+        for monitor in monitors:
+            monitor.expire_snapshot(max_age=0)
+        gc.collect()
+        traced_expired = tracemalloc.get_traced_memory()[0]
+        engine.executor.shutdown()
+
+    n = args.targets
+    mode = "retain-html" if args.retain_html else "digest-only"
+    print(f"mode: {mode}, page: {len(payload) / 1024:.0f} KB, targets: {n}")
+    print(f"RSS before: {before / 2 ** 20:.1f} MiB, after cycle: {after / 2 ** 20:.1f} MiB, "
+          f"per target: {(after - before) / n / 1024:.1f} KiB")
+    if args.trace:
+        tracemalloc.stop()
+        print(f"retained Python heap per target: {traced_after / n / 1024:.1f} KiB after cycle, "
+              f"{traced_expired / n / 1024:.1f} KiB after snapshot expiry")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""通知分发吞吐基准：python -m benchmarks.bench_notify --messages 500"""
+import argparse
+import json
+import time
+
+from benchmarks.common import StubServer
+
+
+def build_app(delay: float, hitokoto_delay: float = 0.5):
+    def app(method, path, headers, body):
+        if path.startswith("/hitokoto"):
+            # 模拟缓慢的一言接口，验证其不会拖慢推送
+            time.sleep(hitokoto_delay)
+            quote = {"hitokoto": "基准句子", "from": "bench"}
+            return 200, {"Content-Type": "application/json"}, json.dumps(quote).encode()
+        if delay:
+            time.sleep(delay)
+        if path.startswith("/gotify/"):
+            return 200, {"Content-Type": "application/json"}, json.dumps({"id": 1}).encode()
+        return 200, {"Content-Type": "text/plain"}, b"ok"
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--delay", type=float, default=0.02, help="桩渠道的响应延迟（秒）")
+    parser.add_argument("--hitokoto", action="store_true", help="附加一言（桩接口每次响应 0.5 秒）")
+    parser.add_argument("--window", type=float, default=0.0, help="合并窗口（秒），0 表示不合并")
+    parser.add_argument("--rate-limit", default="", help="渠道限速，如 gotify=5/1")
+    parser.add_argument("--blocking", action="store_true", help="使用阻塞发送（逐条等待全部渠道完成）")
+    args = parser.parse_args()
+
+    from utils import notify
+
+    # 屏蔽渠道函数的控制台输出，避免影响计时
+    notify._print = lambda *a, **kw: None
+
+    with StubServer(build_app(args.delay)) as server:
+        config = {
+            "HITOKOTO": "true" if args.hitokoto else "false",
+            "HITOKOTO_URL": f"{server.base_url}/hitokoto",
+            "GOTIFY_URL": f"{server.base_url}/gotify",
+            "GOTIFY_TOKEN": "bench",
+            "NTFY_URL": f"{server.base_url}/ntfy",
+            "NTFY_TOPIC": "bench",
+            "WEBHOOK_URL": f"{server.base_url}/webhook?title=$title",
+            "WEBHOOK_METHOD": "POST",
+            "WEBHOOK_CONTENT_TYPE": "text/plain",
+            "WEBHOOK_BODY": "$content",
+            "NOTIFY_COALESCE_WINDOW": args.window,
+            "NOTIFY_RATE_LIMITS": args.rate_limit,
+        }
+        notify.push_config.update(config)
+        channels = len(notify.add_notify_function())
+        notify.get_dispatcher()
+
+        start = time.perf_counter()
+        latencies = []
+        handles = []
+        for i in range(args.messages):
+            t = time.perf_counter()
+            handles.append(notify.send(f"基准消息 {i}", "内容", block=args.blocking))
+            latencies.append(time.perf_counter() - t)
+        submitted = time.perf_counter() - start
+        for handle in handles:
+            handle.wait()
+        elapsed = time.perf_counter() - start
+        errors = sum(len(h.errors()) for h in handles)
+
+    deliveries = args.messages * channels
+    mode = "blocking" if args.blocking else "dispatcher"
+    print(f"mode: {mode}, messages: {args.messages}, channels: {channels}, errors: {errors}")
+    print(f"send() returned after {submitted:.3f}s, all delivered after {elapsed:.3f}s")
+    latencies.sort()
+    print(f"send() latency: p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+          f"max {latencies[-1] * 1000:.2f} ms")
+    print(f"throughput: {args.messages / elapsed:.1f} msg/s ({deliveries / elapsed:.1f} deliveries/s)")
+    stats = notify.channel_stats()
+    for name, s in stats["channels"].items():
+        print(f"  {name}: avg {s['avg_latency'] * 1000:.1f} ms, max {s['max_latency'] * 1000:.1f} ms, "
+              f"failures {s['failures']}")
+    for name, s in stats["backpressure"].items():
+        print(f"  {name}: submitted {s['submitted']}, sent {s['flushed']}, merged {s['merged']}, "
+              f"throttled {s['throttled']}, max pending {s['max_pending']}, max delay {s['max_delay']:.2f}s")
+    for host, s in stats["connections"].items():
+        print(f"  {host}: {s['requests']} requests, {s['connections']} new connections, {s['reused']} reused")
+
+
+if __name__ == "__main__":
+    main()
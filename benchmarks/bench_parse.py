@@ -0,0 +1,43 @@
+"""记录解析基准：对比 BeautifulSoup 解析与单遍提取器，python -m benchmarks.bench_parse"""
+import argparse
+import time
+from pathlib import Path
+
+from benchmarks.common import make_page
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def best_of(func, html, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(html)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="20,1000,10000", help="合成页面的记录数，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from utils.monitor import WebMonitor
+
+    monitor = WebMonitor("http://www.lixia.gov.cn/col/col37116/index.html")
+    cases = [(path.name, path.read_text(encoding="utf-8")) for path in sorted(FIXTURES.glob("*.html"))]
+    cases += [(f"synthetic-{n}", make_page(n)) for n in map(int, args.sizes.split(","))]
+
+    print(f"{'case':<20}{'records':>8}{'bs4 (ms)':>12}{'fast (ms)':>12}{'speedup':>10}")
+    for name, html in cases:
+        slow, expected = best_of(monitor._parse_records_bs4, html, args.repeat)
+        fast, actual = best_of(monitor._parse_records_fast, html, args.repeat)
+        if actual != expected:
+            raise SystemExit(f"{name}: 提取结果与 BeautifulSoup 解析结果不一致")
+        print(f"{name:<20}{len(actual):>8}{slow * 1000:>12.2f}{fast * 1000:>12.2f}{slow / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
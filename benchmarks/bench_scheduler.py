@@ -0,0 +1,52 @@
+"""调度精度基准：python -m benchmarks.bench_scheduler --jobs 200
+
+真实时钟：在 --horizon 秒内随机安排若干任务，统计实际唤醒时间与计划时间的偏差。
+假时钟下每个任务都在计划时刻执行的校验见 tests/test_scheduler.py。
+"""
+import argparse
+import random
+import threading
+import time
+
+import benchmarks.common  # noqa: F401  设置环境变量与导入路径
+from utils.scheduler import Scheduler
+
+
+def real_clock(jobs: int, horizon: float):
+    scheduler = Scheduler()
+    errors = []
+    done = threading.Event()
+    remaining = [jobs]
+
+    def make(when):
+        def job():
+            errors.append(time.time() - when)
+            remaining[0] -= 1
+            if not remaining[0]:
+                done.set()
+                scheduler.stop()
+        return job
+
+    thread = threading.Thread(target=scheduler.run, daemon=True)
+    thread.start()
+    for _ in range(jobs):
+        when = time.time() + random.uniform(0.05, horizon)
+        scheduler.call_at(when, make(when))
+    done.wait(horizon + 5)
+    errors.sort()
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--horizon", type=float, default=2.0)
+    args = parser.parse_args()
+
+    errors = real_clock(args.jobs, args.horizon)
+    print(f"real clock: {len(errors)} jobs, wake-up lateness p50 {errors[len(errors) // 2] * 1000:.2f} ms, "
+          f"p99 {errors[int(len(errors) * 0.99)] * 1000:.2f} ms, max {errors[-1] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""全文搜索基准：python -m benchmarks.bench_search --items 100000
+
+在临时状态库中写入 --items 条标题各异的条目（写入时同步建立索引），
+统计写入速度，以及关键词、多关键词、日期范围和组合查询的耗时，并与对标题做 LIKE 扫描对比。
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import benchmarks.common  # noqa: F401  设置环境变量与导入路径
+
+SCHOOLS = ["历下实验小学", "燕山学校", "甸柳第一中学", "济南第三中学", "历下区第二实验幼儿园", "羊头峪小学",
+           "山大附中", "舜耕小学", "文化东路小学", "东关大街小学"]
+POSTS = ["教师", "校医", "会计", "保育员", "心理健康教师", "体育教师", "信息技术教师", "工作人员"]
+KINDS = ["公开招聘", "引进优秀人才", "选聘", "招聘备案制", "面试成绩公示", "拟聘用人员公示", "资格审查公告",
+         "笔试成绩公布", "体检通知", "考察人员名单"]
+
+QUERIES = [
+    ("教师", None, None),
+    ("燕山学校", None, None),
+    ("燕山学校 教师", None, None),
+    ("拟聘用 体育", None, None),
+    ("", "2024-01-01", "2024-03-31"),
+    ("校医", "2023-01-01", "2023-12-31"),
+    ("不存在的关键词", None, None),
+]
+
+
+def make_items(n: int, rng: random.Random):
+    items = []
+    for i in range(n):
+        year = 2010 + i * 16 // n
+        date = f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        title = f"{rng.choice(SCHOOLS)}{year}年{rng.choice(KINDS)}{rng.choice(POSTS)}公告（第{i}号）"
+        items.append({"title": title, "url": f"http://www.lixia.gov.cn/art/{i}.html", "date": date})
+    return items
+
+
+def timed(func, repeat=5):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    from utils.store import StateStore
+
+    items = make_items(args.items, random.Random(args.seed))
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StateStore(Path(tmp) / "state.db")
+        start = time.perf_counter()
+        for i in range(0, len(items), 1000):
+            store.add_items("bench", items[i:i + 1000])
+        elapsed = time.perf_counter() - start
+        print(f"indexed {store.count_items()} items in {elapsed:.2f}s ({len(items) / elapsed:.0f} items/s)")
+
+        # 监控每次检查写入一页（20 条）时的耗时
+        page = make_items(20, random.Random(args.seed + 1))
+        for n, news in enumerate(page):
+            news["url"] += f"?page={n}"
+        write, _ = timed(lambda: store.save_state("bench", "digest", None, None, page))
+        print(f"save_state with 20 items: {write * 1000:.2f} ms")
+
+        print(f"{'query':<30}{'results':>8}{'fts (ms)':>10}{'like (ms)':>11}")
+        for keywords, since, until in QUERIES:
+            fts, results = timed(lambda: store.search(keywords, since, until, limit=50))
+            like, expected = timed(lambda: like_search(store, keywords, since, until), repeat=1)
+            # 同一天的条目先后顺序可能不同，只比较日期
+            assert [r["date"] for r in results] == [r["date"] for r in expected], keywords
+            label = " ".join(filter(None, [keywords, f"{since}..{until}" if since else ""]))
+            print(f"{label:<30}{len(results):>8}{fts * 1000:>10.2f}{like * 1000:>11.2f}")
+
+
+def like_search(store, keywords, since, until, limit=50):
+    sql = "SELECT target, title, url, date FROM seen_items WHERE 1"
+    params = []
+    for word in keywords.split():
+        sql += " AND title LIKE ?"
+        params.append(f"%{word}%")
+    if since:
+        sql += " AND date >= ?"
+        params.append(since)
+    if until:
+        sql += " AND date <= ?"
+        params.append(until)
+    sql += " ORDER BY date DESC LIMIT ?"
+    params.append(limit)
+    with store._lock:
+        rows = store._conn.execute(sql, params).fetchall()
+    return [{"target": t, "title": ti, "url": u, "date": d} for t, ti, u, d in rows]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""SMTP 推送延迟基准：python -m benchmarks.bench_smtp --messages 50"""
+import argparse
+import smtplib
+import socketserver
+import threading
+import time
+
+import benchmarks.common  # noqa: F401  设置环境变量与导入路径
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    """最小化的 SMTP 服务端，问候与认证阶段加入延迟以模拟 TLS 握手和登录开销"""
+
+    def _reply(self, line: str):
+        self.wfile.write(line.encode() + b"\r\n")
+        self.wfile.flush()
+
+    def handle(self):
+        server = self.server
+        time.sleep(server.handshake_delay)
+        server.connections += 1
+        self._reply("220 bench ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self._reply("250-bench")
+                self._reply("250 AUTH PLAIN LOGIN")
+            elif command.startswith("AUTH"):
+                time.sleep(server.handshake_delay)
+                self._reply("235 Authentication successful")
+            elif command == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                server.messages += 1
+                self._reply("250 OK")
+            elif command == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("250 OK")
+
+
+class StubSmtpServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, handshake_delay: float):
+        super().__init__(("127.0.0.1", 0), _SmtpHandler)
+        self.handshake_delay = handshake_delay
+        self.connections = 0
+        self.messages = 0
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+def legacy_send(server: str, message):
+    """改造前的做法：每封邮件新建连接并登录"""
+    conn = smtplib.SMTP(server)
+    conn.login("bench@example.com", "secret")
+    conn.sendmail("bench@example.com", "bench@example.com", message.as_bytes())
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.05, help="桩服务器握手与认证各自的延迟（秒）")
+    parser.add_argument("--interval", type=float, default=0.0, help="逐条发送时两封邮件的间隔（秒）")
+    args = parser.parse_args()
+
+    from utils import notify
+
+    notify._print = lambda *a, **kw: None
+
+    with StubSmtpServer(args.delay) as stub:
+        server = f"127.0.0.1:{stub.server_address[1]}"
+        notify.push_config.update({
+            "SMTP_SERVER": server,
+            "SMTP_SSL": "false",
+            "SMTP_EMAIL": "bench@example.com",
+            "SMTP_PASSWORD": "secret",
+            "SMTP_NAME": "bench",
+        })
+
+        def run(label, deliver):
+            stub.connections = stub.messages = 0
+            latencies = []
+            start = time.perf_counter()
+            for i in range(args.messages):
+                t = time.perf_counter()
+                deliver(f"基准邮件 {i}")
+                latencies.append(time.perf_counter() - t)
+                if args.interval:
+                    time.sleep(args.interval)
+            elapsed = time.perf_counter() - start
+            latencies.sort()
+            print(f"{label}: {stub.messages} messages over {stub.connections} connections in {elapsed:.2f}s, "
+                  f"per-message p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+                  f"max {latencies[-1] * 1000:.1f} ms")
+
+        def legacy(title):
+            message = notify.MIMEText("内容", "plain", "utf-8")
+            message["Subject"] = notify.Header(title, "utf-8")
+            legacy_send(server, message)
+
+        run("per-message connection (before)", legacy)
+        run("reused session (after)", lambda title: notify.smtp(title, "内容"))
+
+        # 并发提交：批处理窗口内的邮件连续发出
+        stub.connections = stub.messages = 0
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(target=notify.smtp, args=(f"并发邮件 {i}", "内容"))
+            for i in range(args.messages)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        session = notify.get_smtp_session()
+        print(f"concurrent burst: {stub.messages} messages over {stub.connections} connections "
+              f"in {time.perf_counter() - start:.2f}s, session stats {session.stats}")
+
+        # 订阅者使用自己的 SMTP 配置，与全局配置交替发送：两套配置各自复用一个连接
+        subscriber = notify.subscriber_channel("smtp", "bench", {"SMTP_EMAIL": "subscriber@example.com"})
+        run("alternating with a subscriber config",
+            lambda title: (notify.smtp(title, "内容"), subscriber(title, "内容")))
+        assert stub.connections <= 1, stub.connections
+
+        # 空闲超过 SMTP_IDLE_TIMEOUT 后关闭连接，发送线程退出
+        sessions = list(notify._smtp_sessions.values())
+        for session in sessions:
+            session.idle_timeout = 0.2
+            session.send(notify.MIMEText("内容", "plain", "utf-8")).result()
+        time.sleep(0.5)
+        assert all(session.idle for session in sessions)
+        print(f"after idle timeout: {len(sessions)} sessions, smtp threads alive: "
+              f"{sum(t.name == 'smtp' for t in threading.enumerate())}")
+
+
+if __name__ == "__main__":
+    main()
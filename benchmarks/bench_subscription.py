@@ -0,0 +1,138 @@
+"""关键词订阅匹配基准：python -m benchmarks.bench_subscription --items 2000
+
+1. 10~10000 个订阅（每个订阅若干关键词，部分为需同时出现的组合和排除词）下，
+   自动机与逐个订阅检查关键词的朴素实现的单条匹配耗时对比，并校验两者结果一致；
+   scan 为自动机扫描标题本身的耗时，match 另含按命中关键词反查订阅的耗时（与命中的订阅数成正比）；
+2. 经本地桩 ntfy 服务推送：三个订阅者各自配置自己的 NTFY_TOPIC，校验每个主题只收到匹配的条目。
+"""
+import argparse
+import random
+import threading
+import time
+from collections import defaultdict
+
+from benchmarks.common import StubServer
+from benchmarks.bench_search import KINDS, POSTS, SCHOOLS, make_items
+
+SIZES = (10, 100, 1000, 10000)
+# 生成订阅关键词用的词表：真实的学校、岗位、公告类型，加上不会出现在标题中的随机词
+WORDS = SCHOOLS + POSTS + KINDS + ["招聘", "公示", "2024年", "面试", "小学", "中学", "幼儿园"]
+
+
+def make_subscriptions(n: int, rng: random.Random):
+    entries = []
+    for i in range(n):
+        keywords = []
+        for _ in range(rng.randint(1, 4)):
+            roll = rng.random()
+            if roll < 0.1:
+                keywords.append(rng.sample(WORDS, 2))
+            elif roll < 0.2:
+                keywords.append(rng.choice(WORDS))
+            else:
+                keywords.append(f"关键词{rng.randrange(n * 10)}")
+        exclude = [rng.choice(KINDS)] if rng.random() < 0.2 else []
+        entries.append({"name": f"sub{i}", "keywords": keywords, "exclude": exclude, "channels": ["console"]})
+    return entries
+
+
+def naive_match(subscriptions, news):
+    """逐个订阅检查关键词，作为对照"""
+    title = news["title"].casefold()
+    return [
+        s for s in subscriptions
+        if any(all(k.casefold() in title for k in group) for group in s.groups)
+        and not any(k.casefold() in title for k in s.exclude)
+    ]
+
+
+def bench_match(items, rng):
+    from utils.subscription import Subscription, SubscriptionRouter
+
+    print(f"{'subscriptions':>13}{'keywords':>10}{'compile (ms)':>14}{'scan (us)':>11}{'match (us)':>12}"
+          f"{'naive (us)':>12}{'matches/item':>14}")
+    for n in SIZES:
+        subscriptions = [Subscription.from_dict(entry) for entry in make_subscriptions(n, rng)]
+        start = time.perf_counter()
+        router = SubscriptionRouter(subscriptions)
+        compile_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for news in items:
+            router.automaton.search(news["title"])
+        scan = (time.perf_counter() - start) / len(items)
+
+        start = time.perf_counter()
+        matched = [router.match(news) for news in items]
+        automaton = (time.perf_counter() - start) / len(items)
+
+        sample = items[:200]
+        start = time.perf_counter()
+        expected = [naive_match(subscriptions, news) for news in sample]
+        naive = (time.perf_counter() - start) / len(sample)
+        assert matched[:len(sample)] == expected, n
+
+        total = sum(len(m) for m in matched)
+        print(f"{n:>13}{len(router.automaton.patterns):>10}{compile_time * 1000:>14.1f}{scan * 1e6:>11.1f}"
+              f"{automaton * 1e6:>12.1f}{naive * 1e6:>12.1f}{total / len(items):>14.1f}")
+
+
+def bench_delivery(items):
+    from utils import notify
+    from utils.subscription import Subscription, SubscriptionRouter
+
+    notify._print = lambda *a, **kw: None
+    received = defaultdict(list)
+    lock = threading.Lock()
+
+    def app(method, path, headers, body):
+        with lock:
+            received[path.split("/")[-1]].append(body.decode("utf-8"))
+        return 200, {"Content-Type": "text/plain"}, b"ok"
+
+    with StubServer(app) as server:
+        notify.push_config.update({"HITOKOTO": "false", "NTFY_URL": f"{server.base_url}/ntfy",
+                                   "NOTIFY_COALESCE_WINDOW": 0, "NOTIFY_OUTBOX": ""})
+        entries = [
+            {"name": "teacher", "keywords": ["教师"], "exclude": ["心理健康"],
+             "channels": [{"channel": "ntfy", "NTFY_TOPIC": "teacher"}]},
+            {"name": "yanshan", "keywords": [["燕山学校", "招聘"], ["燕山学校", "选聘"]],
+             "channels": [{"channel": "ntfy", "NTFY_TOPIC": "yanshan"}]},
+            {"name": "doctor", "keywords": ["校医", "保育员"],
+             "channels": [{"channel": "ntfy", "NTFY_TOPIC": "doctor"}]},
+        ]
+        subscriptions = [Subscription.from_dict(entry) for entry in entries]
+        router = SubscriptionRouter(subscriptions)
+        routes = router.route(items)
+        handles = [
+            notify.send(f"订阅 {len(matched)} 条", "\n".join(news["title"] for news in matched), channels=[channel])
+            for channel, matched in routes.items()
+        ]
+        for handle in handles:
+            handle.wait()
+            assert not handle.errors(), handle.errors()
+
+    for subscription in subscriptions:
+        topic = subscription.channels[0].__name__
+        expected = [news["title"] for news in items if subscription in router.match(news)]
+        titles = [line for body in received[subscription.name] for line in body.splitlines()]
+        assert titles == expected, topic
+        assert all(naive_match([subscription], {"title": title}) for title in titles), topic
+        print(f"{topic}: {len(titles)} matching items delivered to its own topic")
+    assert set(received) == {s.name for s in subscriptions}, set(received)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    items = make_items(args.items, rng)
+    bench_match(items, rng)
+    bench_delivery(items[:200])
+
+
+if __name__ == "__main__":
+    main()
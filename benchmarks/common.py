@@ -0,0 +1,109 @@
+"""基准测试公共工具：合成页面与本地桩服务器"""
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+# 基准测试默认降低日志级别，避免大量目标时日志输出影响计时
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# 基准测试的目标都是临时地址，不写入状态库
+os.environ.setdefault("STATE_PERSIST", "false")
+# 桩服务器不提供详情页，检测到新增条目后直接发送通知（bench_detail 单独测量详情页抓取）
+os.environ.setdefault("DETAIL_FETCH", "false")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# app(method, path, headers, body) -> (status, headers, body)
+App = Callable[[str, str, Dict[str, str], bytes], Tuple[int, Dict[str, str], bytes]]
+
+PAGE_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+<meta http-equiv="Content-Type" content="text/html; charset=utf-8">
+<title>教育招聘 济南市历下区人民政府</title>
+<script type="text/javascript" src="/script/jquery.js"></script>
+</head>
+<body>
+<div class="main-box">
+<div class="list-box" id="{column}">
+<script type="text/javascript">var visitCount = {counter};</script>
+<script type="text/xml"><datastore>
+<nextgroup><![CDATA[<a href="/module/web/jpage/dataproxy.jsp?page=1&appid=1&webid=47&path=/&columnid={column}&unitid=124445&webname=%E6%B5%8E%E5%8D%97%E5%B8%82%E5%8E%86%E4%B8%8B%E5%8C%BA%E4%BA%BA%E6%B0%91%E6%94%BF%E5%BA%9C&permissiontype=0"></a>]]></nextgroup>
+<recordset>
+"""
+
+PAGE_TAIL = """</recordset>
+</datastore></script>
+</div>
+</div>
+<div class="footer">访问量：{counter}</div>
+</body>
+</html>
+"""
+
+RECORD = """<record><![CDATA[
+<li><a href="/art/{year}/{month}/{day}/art_{column}_{id}.html" title="{title}" target="_blank">{title}</a><span class="font14">[{year}-{month:02d}-{day:02d}]</span></li>]]></record>
+"""
+
+
+def make_record(index: int, column: int = 37116) -> str:
+    """生成第 index 条合成记录，index 越大越新"""
+    day = index % 28 + 1
+    month = index // 28 % 12 + 1
+    year = 2015 + index // 336
+    title = f"济南市历下区教育系统{year}年公开招聘教师公告（第{index}号）"
+    return RECORD.format(year=year, month=month, day=day, column=column, id=100000 + index, title=title)
+
+
+def make_page(n_records: int, newest: Optional[int] = None, column: int = 37116, counter: int = 0) -> str:
+    """生成包含 n_records 条记录的栏目页面，记录按从新到旧排列"""
+    newest = n_records - 1 if newest is None else newest
+    records = "".join(make_record(i, column) for i in range(newest, newest - n_records, -1))
+    return PAGE_HEAD.format(column=column, counter=counter) + records + PAGE_TAIL.format(counter=counter)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 响应头和响应体分两次写出，不关闭 Nagle 算法时小响应会额外等待约 40ms 的延迟确认
+    disable_nagle_algorithm = True
+
+    def _handle(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, headers, payload = self.server.app(self.command, self.path, dict(self.headers), body)
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_HEAD = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+    """本地桩服务器，在后台线程中运行，可用作上下文管理器"""
+
+    def __init__(self, app: App, host: str = "127.0.0.1", port: int = 0):
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.app = app
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StubServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,318 @@
+"""离线回放压测：python -m benchmarks.replay --targets 1000 --duration 60
+
+本地回放服务器用录制的栏目页（benchmarks/fixtures）模拟任意多个监控目标，按脚本随时间修改页面：
+新增条目（publish）、只修改访问量等无关内容（touch）、一段时间内返回 500（outage）。
+同一服务器模拟各推送渠道（gotify、ntfy、自定义 webhook）的接口，每个渠道可配置响应延迟和错误率。
+监控引擎按真实的调度、抓取、比较、合并、限速和失败重试流程运行，统计每条新增条目
+从发布到被检测到、从检测到送达各渠道、以及从发布到送达的延迟分位数。
+
+录制新的样本：python -m benchmarks.replay record http://www.lixia.gov.cn/col/col37116/index.html
+脚本文件为 JSON 数组，每项形如 {"at": 秒, "target": 目标序号, "action": "publish"|"touch"|"outage", "duration": 秒}；
+不指定 --script 时按 --rate 随机生成。
+"""
+import argparse
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# 回放目标的扫描间隔很短，不使用按发布规律放宽间隔的自适应扫描
+os.environ.setdefault("ADAPTIVE_POLLING", "false")
+os.environ.setdefault("METRICS_PORT", "0")
+
+from benchmarks.common import RECORD, StubServer  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+ITEM_ID = re.compile(r"art_(\d+)_(\d+)\.html")
+COUNTER = re.compile(r"(visitCount\s*=\s*)(\d+)|(访问量：)(\d+)")
+
+
+class Script:
+    """按时间排序的页面修改事件 (at, target, action, duration)"""
+
+    def __init__(self, events: List[Tuple[float, int, str, float]]):
+        self.events = sorted(events)
+
+    @classmethod
+    def generate(cls, targets: int, duration: float, rate: float, touch_rate: float, outages: int,
+                 outage_duration: float, warmup: float, rng: random.Random) -> "Script":
+        """rate、touch_rate 为每个目标每分钟的平均事件数，事件在 warmup 之后发生"""
+        events = []
+        for action, per_minute in (("publish", rate), ("touch", touch_rate)):
+            total = int(targets * per_minute * (duration - warmup) / 60)
+            for _ in range(total):
+                events.append((rng.uniform(warmup, duration), rng.randrange(targets), action, 0.0))
+        for _ in range(outages):
+            events.append((rng.uniform(warmup, duration), rng.randrange(targets), "outage", outage_duration))
+        return cls(events)
+
+    @classmethod
+    def load(cls, path: str) -> "Script":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls([(e["at"], e["target"], e["action"], e.get("duration", 0.0)) for e in data])
+
+
+class ReplaySite:
+    """回放的监控目标：录制页面加上脚本新增的条目，按版本号生成 ETag"""
+
+    def __init__(self, fixture: str, targets: int):
+        head, sep, tail = fixture.partition("<recordset>\n")
+        if not sep:
+            raise ValueError("录制页面中没有 <recordset>")
+        self.head, self.tail = head + sep, tail
+        self.lock = threading.Lock()
+        self.added: Dict[int, List[str]] = defaultdict(list)
+        self.counters: Dict[int, int] = defaultdict(int)
+        self.versions: Dict[int, int] = defaultdict(int)
+        self.down_until: Dict[int, float] = {}
+        self.pages: Dict[int, Tuple[int, bytes]] = {}
+        self.published: Dict[Tuple[str, str], float] = {}
+        self.next_id = 9000000
+        self.targets = targets
+
+    def apply(self, target: int, action: str, duration: float):
+        now = time.time()
+        with self.lock:
+            if action == "publish":
+                self.next_id += 1
+                today = datetime.now()
+                title = f"回放目标{target}公开招聘公告（第{self.next_id}号）"
+                self.added[target].insert(0, RECORD.format(
+                    year=today.year, month=today.month, day=today.day, column=target, id=self.next_id, title=title
+                ))
+                self.published[(str(target), str(self.next_id))] = now
+            elif action == "touch":
+                self.counters[target] += 1
+            elif action == "outage":
+                self.down_until[target] = now + duration
+            self.versions[target] += 1
+
+    def page(self, target: int) -> Tuple[Optional[str], bytes]:
+        with self.lock:
+            if self.down_until.get(target, 0) > time.time():
+                return None, b""
+            version = self.versions[target]
+            cached = self.pages.get(target)
+            if cached is None or cached[0] != version:
+                counter = self.counters[target]
+                head = COUNTER.sub(lambda m: (m.group(1) or m.group(3)) + str(counter), self.head)
+                tail = COUNTER.sub(lambda m: (m.group(1) or m.group(3)) + str(counter), self.tail)
+                cached = (version, (head + "".join(self.added[target]) + tail).encode("utf-8"))
+                self.pages[target] = cached
+            return f'"{target}-{version}"', cached[1]
+
+
+class Channels:
+    """模拟的推送渠道接口：记录每次送达的条目和时间，按配置注入延迟和错误"""
+
+    def __init__(self, latency: Dict[str, float], error_rate: Dict[str, float], seed: int):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.delivered: Dict[str, Dict[Tuple[str, str], float]] = defaultdict(dict)
+        self.requests: Dict[str, int] = defaultdict(int)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def handle(self, channel: str, body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        time.sleep(self.latency.get(channel, 0.0))
+        with self.lock:
+            self.requests[channel] += 1
+            if self.rng.random() < self.error_rate.get(channel, 0.0):
+                self.errors[channel] += 1
+                return 500, {"Content-Type": "application/json"}, b'{"error": "injected"}'
+        now = time.time()
+        text = urllib.parse.unquote_plus(body.decode("utf-8", "replace"))
+        with self.lock:
+            delivered = self.delivered[channel]
+            for key in ITEM_ID.findall(text):
+                delivered.setdefault(key, now)
+        if channel == "gotify":
+            return 200, {"Content-Type": "application/json"}, b'{"id": 1}'
+        return 200, {"Content-Type": "text/plain"}, b"ok"
+
+
+def build_app(site: ReplaySite, channels: Channels):
+    def app(method, path, headers, body):
+        if path.startswith("/col/col"):
+            target = int(path.split("/col/col")[1].split("/")[0])
+            tag, page = site.page(target)
+            if tag is None:
+                return 500, {"Content-Type": "text/plain"}, b"scripted outage"
+            if headers.get("If-None-Match") == tag:
+                return 304, {"ETag": tag}, b""
+            return 200, {"Content-Type": "text/html; charset=utf-8", "ETag": tag}, page
+        if path.startswith("/push/"):
+            return channels.handle(path.split("?")[0].split("/")[2], body)
+        return 404, {"Content-Type": "text/plain"}, b"not found"
+
+    return app
+
+
+def play(script: Script, site: ReplaySite, start: float, stop: threading.Event):
+    """按脚本时间依次修改页面"""
+    for at, target, action, duration in script.events:
+        if stop.wait(max(start + at - time.time(), 0)):
+            return
+        site.apply(target, action, duration)
+
+
+def parse_channels(spec: str) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """gotify=0.05:0.1,ntfy=0.2 -> 延迟（秒）与错误率"""
+    latency, errors = {}, {}
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        name, _, value = item.partition("=")
+        delay, _, rate = value.partition(":")
+        latency[name] = float(delay or 0)
+        errors[name] = float(rate or 0)
+    return latency, errors
+
+
+def percentiles(values: List[float]) -> str:
+    if not values:
+        return "n/a"
+    values = sorted(values)
+    pick = lambda q: values[min(int(len(values) * q), len(values) - 1)]  # noqa: E731
+    return (f"p50 {pick(0.5):.2f}s, p90 {pick(0.9):.2f}s, p99 {pick(0.99):.2f}s, "
+            f"max {values[-1]:.2f}s ({len(values)})")
+
+
+def record(url: str, name: str):
+    import requests
+
+    response = requests.get(url, timeout=30)
+    response.raise_for_status()
+    response.encoding = response.apparent_encoding if response.encoding is None else response.encoding
+    path = FIXTURES / f"{name or url.rstrip('/').split('/')[-2]}.html"
+    path.write_text(response.text, encoding="utf-8")
+    print(f"recorded {len(response.content)} bytes to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "record"])
+    parser.add_argument("url", nargs="?", help="record 时要录制的页面")
+    parser.add_argument("--name", default="", help="record 时保存的样本名，默认取栏目名")
+    parser.add_argument("--fixture", default=str(FIXTURES / "col37116.html"))
+    parser.add_argument("--targets", type=int, default=1000)
+    parser.add_argument("--interval", type=int, default=10, help="每个目标的扫描间隔（秒）")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=60, help="回放时长（秒）")
+    parser.add_argument("--warmup", type=float, default=15, help="首轮检查建立基准所用的时间（秒）")
+    parser.add_argument("--drain", type=float, default=15, help="回放结束后等待推送送达的时间（秒）")
+    parser.add_argument("--rate", type=float, default=0.05, help="每个目标每分钟平均新增条目数")
+    parser.add_argument("--touch-rate", type=float, default=0.2, help="每个目标每分钟平均无关修改次数")
+    parser.add_argument("--outages", type=int, default=5, help="返回 500 的故障次数")
+    parser.add_argument("--outage-duration", type=float, default=20)
+    parser.add_argument("--channels", default="gotify=0.05:0.05,ntfy=0.02:0,webhook=0.2:0.1",
+                        help="渠道=延迟秒数:错误率，逗号分隔")
+    parser.add_argument("--window", type=float, default=1.0, help="推送合并窗口（秒）")
+    parser.add_argument("--script", default="", help="页面修改脚本（JSON）")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        if not args.url:
+            parser.error("record 需要页面地址")
+        record(args.url, args.name)
+        return
+
+    from utils import monitor as monitor_module
+    from utils import notify
+    from utils.engine import MonitorEngine
+    from utils.monitor import WebMonitor
+
+    rng = random.Random(args.seed)
+    if args.script:
+        script = Script.load(args.script)
+    else:
+        script = Script.generate(args.targets, args.duration, args.rate, args.touch_rate, args.outages,
+                                 args.outage_duration, args.warmup, rng)
+    latency, error_rate = parse_channels(args.channels)
+    site = ReplaySite(Path(args.fixture).read_text(encoding="utf-8"), args.targets)
+    channels = Channels(latency, error_rate, args.seed)
+
+    # 记录检测时间：条目进入 send 的时刻
+    detected: Dict[Tuple[str, str], float] = {}
+    original_send = monitor_module.send
+
+    def send(title, content, *a, **kw):
+        now = time.time()
+        for key in ITEM_ID.findall(content):
+            detected.setdefault(key, now)
+        return original_send(title, content, *a, **kw)
+
+    monitor_module.send = send
+    notify._print = lambda *a, **kw: None
+
+    with StubServer(build_app(site, channels)) as server, tempfile.TemporaryDirectory() as tmp:
+        base = server.base_url
+        notify.push_config.update({
+            "HITOKOTO": "false",
+            "NOTIFY_COALESCE_WINDOW": args.window,
+            "NOTIFY_OUTBOX": os.path.join(tmp, "outbox.jsonl"),
+            "NOTIFY_DEAD_LETTER": os.path.join(tmp, "dead_letter.jsonl"),
+            "NOTIFY_RETRY_BASE": 1,
+            "NOTIFY_RETRY_MAX": 5,
+        })
+        if "gotify" in latency:
+            notify.push_config.update({"GOTIFY_URL": f"{base}/push/gotify", "GOTIFY_TOKEN": "replay"})
+        if "ntfy" in latency:
+            notify.push_config.update({"NTFY_URL": f"{base}/push", "NTFY_TOPIC": "ntfy"})
+        if "webhook" in latency:
+            notify.push_config.update({
+                "WEBHOOK_URL": f"{base}/push/webhook?title=$title",
+                "WEBHOOK_METHOD": "POST",
+                "WEBHOOK_CONTENT_TYPE": "text/plain",
+                "WEBHOOK_BODY": "$content",
+            })
+        names = [func.__name__ for func in notify.add_notify_function()]
+        notify.get_dispatcher()
+
+        monitors = [WebMonitor(f"{base}/col/col{i}/index.html", args.interval) for i in range(args.targets)]
+        engine = MonitorEngine(monitors, max_workers=args.workers)
+        engine.scheduling = True
+        for monitor in monitors:
+            engine._schedule_check(monitor, rng.uniform(0, min(args.interval, args.warmup)))
+        scheduler = threading.Thread(target=engine.scheduler.run, name="replay-scheduler", daemon=True)
+        stop = threading.Event()
+        start = time.time()
+        player = threading.Thread(target=play, args=(script, site, start, stop), daemon=True)
+        print(f"replaying {len(script.events)} events on {args.targets} targets for {args.duration:.0f}s, "
+              f"channels: {', '.join(names)}")
+        scheduler.start()
+        player.start()
+        player.join(max(start + args.duration - time.time(), 0) + 1)
+        stop.set()
+        time.sleep(args.drain)
+        engine.scheduler.stop()
+        elapsed = time.time() - start
+
+    checks = sum(engine.check_counts.values())
+    published = site.published
+    print(f"{checks} checks in {elapsed:.0f}s ({checks / elapsed:.0f}/s), "
+          f"{len(published)} items published, {len(detected)} detected")
+    print(f"publish -> detect: {percentiles([detected[k] - t for k, t in published.items() if k in detected])}")
+    channel_names = {"custom_notify": "webhook"}
+    for name in names:
+        delivered = channels.delivered.get(channel_names.get(name, name), {})
+        key = channel_names.get(name, name)
+        print(f"{key}: {channels.requests[key]} requests, {channels.errors[key]} injected errors, "
+              f"{len(delivered)}/{len(published)} items delivered")
+        print(f"  detect -> deliver: {percentiles([t - detected[k] for k, t in delivered.items() if k in detected])}")
+        print(f"  publish -> deliver: {percentiles([t - published[k] for k, t in delivered.items() if k in published])}")
+    breakers = engine.breaker_stats()
+    print(f"breaker trips: {sum(s['trips'] for s in breakers.values())}, "
+          f"open now: {sum(s['state'] != 'closed' for s in breakers.values())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""基准测试套件：python -m benchmarks.suite --output results.json [--compare baseline.json]
+
+依次测量：
+1. parse_content：录制的栏目页样本与 10~10000 条记录的合成页面；
+2. check_updates：本地桩服务器上的栏目页，分别测量页面新增一条记录和页面未变化（304）两种情况；
+3. notify.send：推送到本地桩渠道服务器的吞吐。
+
+每项记录耗时的最小值、中位数和峰值内存（tracemalloc，单独运行一次测量，不影响计时），
+结果写入 JSON，便于在版本之间比较。--compare 与之前的结果比较，
+耗时或峰值内存超过 --tolerance 时以非零状态退出。
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.common import StubServer, make_page
+from benchmarks import bench_notify
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+SIZES = (10, 100, 1000, 10000)
+
+
+def measure(func, repeat: int, setup=None):
+    """执行 repeat 次 func，返回耗时统计和一次单独运行的峰值内存；setup 的耗时不计入"""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    if setup is not None:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds_min": min(times),
+        "seconds_median": statistics.median(times),
+        "peak_bytes": peak,
+        "repeat": repeat,
+    }
+
+
+def bench_parse(repeat: int):
+    from utils.monitor import WebMonitor
+
+    monitor = WebMonitor("http://www.lixia.gov.cn/col/col37116/index.html")
+    cases = [(f"fixture-{path.stem}", path.read_text(encoding="utf-8")) for path in sorted(FIXTURES.glob("*.html"))]
+    cases += [(f"synthetic-{n}", make_page(n)) for n in SIZES]
+    results = {}
+    for name, html in cases:
+        result = measure(lambda: monitor.parse_content(html), repeat)
+        result["records"] = len(monitor.parse_content(html))
+        results[f"parse_content/{name}"] = result
+    return results
+
+
+def _page_app(pages: dict):
+    def app(method, path, headers, body):
+        column = int(path.split("/col/col")[1].split("/")[0])
+        page, tag = pages[column]
+        if headers.get("If-None-Match") == tag:
+            return 304, {"ETag": tag}, b""
+        return 200, {"Content-Type": "text/html; charset=utf-8", "ETag": tag}, page
+
+    return app
+
+
+def bench_check_updates(repeat: int):
+    from utils.monitor import WebMonitor
+
+    pages, newest = {}, {}
+
+    def publish(column: int, size: int):
+        """页面顶部新增一条记录"""
+        newest[column] = newest.get(column, size - 1) + 1
+        page = make_page(size, newest=newest[column], column=column).encode("utf-8")
+        pages[column] = (page, f'"{column}-{newest[column]}"')
+
+    results = {}
+    with StubServer(_page_app(pages)) as server:
+        for size in SIZES:
+            publish(size, size)
+            monitor = WebMonitor(f"{server.base_url}/col/col{size}/index.html", 60)
+            # 每次检查都重新抓取，不复用快照
+            monitor.current_interval = 0
+            monitor.check_updates()
+
+            def check_new(size=size, monitor=monitor):
+                diff = monitor.check_updates()
+                assert len(diff.new) == 1, diff.summary()
+
+            results[f"check_updates/new-item-{size}"] = measure(
+                check_new, repeat, setup=lambda size=size: publish(size, size)
+            )
+            result = measure(monitor.check_updates, repeat)
+            result["not_modified"] = monitor.cycle_stats["not_modified"]
+            results[f"check_updates/unchanged-{size}"] = result
+    return results
+
+
+def bench_send(messages: int, delay: float):
+    from utils import notify
+
+    notify._print = lambda *a, **kw: None
+    with StubServer(bench_notify.build_app(delay)) as server:
+        notify.push_config.update({
+            "HITOKOTO": "false",
+            "GOTIFY_URL": f"{server.base_url}/gotify",
+            "GOTIFY_TOKEN": "bench",
+            "NTFY_URL": f"{server.base_url}/ntfy",
+            "NTFY_TOPIC": "bench",
+            "WEBHOOK_URL": f"{server.base_url}/webhook?title=$title",
+            "WEBHOOK_METHOD": "POST",
+            "WEBHOOK_CONTENT_TYPE": "text/plain",
+            "WEBHOOK_BODY": "$content",
+            "NOTIFY_COALESCE_WINDOW": 0,
+            "NOTIFY_OUTBOX": "",
+        })
+        channels = len(notify.add_notify_function())
+        notify.get_dispatcher()
+        errors = []
+
+        def run():
+            handles = [notify.send(f"基准消息 {i}", "内容") for i in range(messages)]
+            for handle in handles:
+                handle.wait()
+                errors.extend(handle.errors().values())
+
+        result = measure(run, 3)
+    result.update({
+        "messages": messages,
+        "channels": channels,
+        "errors": len(errors),
+        "messages_per_second": messages / result["seconds_median"],
+    })
+    return {"notify.send/throughput": result}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """返回超过容差的 (用例, 指标, 基准值, 当前值)"""
+    regressions = []
+    for name, current in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        for key in ("seconds_median", "peak_bytes"):
+            if old.get(key) and current[key] > old[key] * (1 + tolerance):
+                regressions.append((name, key, old[key], current[key]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="", help="结果 JSON 文件，留空时输出到标准输出")
+    parser.add_argument("--compare", default="", help="与之前的结果 JSON 比较")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的退化比例")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.005, help="桩渠道的响应延迟（秒）")
+    parser.add_argument("--only", default="", help="只运行名称包含该字符串的部分：parse、check、send")
+    args = parser.parse_args()
+
+    results = {}
+    for key, run in (
+        ("parse", lambda: bench_parse(args.repeat)),
+        ("check", lambda: bench_check_updates(args.repeat)),
+        ("send", lambda: bench_send(args.messages, args.delay)),
+    ):
+        if args.only and args.only not in key:
+            continue
+        results.update(run())
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+    for name, r in results.items():
+        print(f"{name:<36}median {r['seconds_median'] * 1000:>9.2f} ms  min {r['seconds_min'] * 1000:>9.2f} ms  "
+              f"peak {r['peak_bytes'] / 1024:>9.1f} KiB", file=sys.stderr)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for name, key, old, new in regressions:
+            print(f"regression: {name} {key} {old:.6g} -> {new:.6g} (+{new / old - 1:.0%})", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.tolerance:.0%} against {args.compare}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import os
 from pydantic import BaseSettings, Field, validator
 from dotenv import load_dotenv
@@ -18,16 +18,61 @@ class Settings(BaseSettings):
     SCAN_INTERVAL: int = Field(default=300)  # 默认5分钟
     SEND_STARTUP_NOTIFY: bool = Field(default=True)  # 是否在启动时发送通知
 
+    # 多目标监控配置
+    TARGETS: str = Field(default="")  # 多个目标URL，逗号分隔，可用 url|秒数 单独指定扫描间隔
+    MAX_WORKERS: int = Field(default=8)  # 并发抓取的最大线程数
+    FETCH_TIMEOUT: int = Field(default=10)  # 单次抓取超时（秒）
+    SNAPSHOT_TTL: int = Field(default=60)  # 页面快照缓存时间（秒），有效期内各处共享同一次抓取结果
+    FAST_PARSER: bool = Field(default=True)  # 使用单遍提取器解析记录，关闭则使用 BeautifulSoup
+
+    # 自适应扫描配置
+    ADAPTIVE_POLLING: bool = Field(default=True)  # 根据目标的发布规律调整扫描间隔
+    MIN_SCAN_INTERVAL: int = Field(default=120)  # 活跃时段的最短扫描间隔（秒）
+    MAX_SCAN_INTERVAL: int = Field(default=1800)  # 冷清时段的最长扫描间隔（秒）
+
+    # 抓取失败熔断配置
+    BREAKER_THRESHOLD: int = Field(default=3)  # 连续失败多少次后熔断并发送故障通知
+    BREAKER_BASE_DELAY: int = Field(default=60)  # 首次重试等待（秒），之后按指数增长并加入随机抖动
+    BREAKER_MAX_DELAY: int = Field(default=3600)  # 重试等待上限（秒）
+
+    # 历史回填配置
+    BACKFILL_PER_PAGE: int = Field(default=100)  # 回填时每次请求的记录数
+    BACKFILL_WORKERS: int = Field(default=8)  # 回填的并发线程数
+    BACKFILL_HOST_CONCURRENCY: int = Field(default=4)  # 同一主机同时进行的请求数上限
+    BACKFILL_HOST_RATE: int = Field(default=10)  # 同一主机每秒请求数上限，为 0 时不限速
+
+    # 指标接口配置
+    METRICS_HOST: str = Field(default="127.0.0.1")  # 指标接口监听地址
+    METRICS_PORT: int = Field(default=9108)  # 指标接口端口，为 0 时不启动
+    STATS_REPORT_INTERVAL: int = Field(default=3600)  # 输出推送渠道统计的间隔（秒），为 0 时不输出
+
+    # 详情页配置
+    DETAIL_FETCH: bool = Field(default=True)  # 检测到新增条目后抓取详情页，在通知中附上正文摘要和附件
+    DETAIL_WORKERS: int = Field(default=4)  # 并发抓取详情页的线程数
+    DETAIL_CACHE_DIR: Path = Field(default=Path("data/details"))  # 详情页缓存目录（按内容寻址）
+    DETAIL_SUMMARY_CHARS: int = Field(default=200)  # 通知中正文摘要的最大字数
+
+    # 关键词订阅配置
+    SUBSCRIPTIONS_FILE: str = Field(default="data/subscriptions.json")  # 订阅文件（JSON），文件不存在时不启用订阅
+
     # 定时推送配置
     DAILY_PUSH_ENABLED: bool = Field(default=True)  # 是否启用每日推送
     DAILY_PUSH_TIMES: str = Field(default="09:00,21:00")  # 每日推送时间
 
+    # 状态持久化配置
+    STATE_PERSIST: bool = Field(default=True)  # 是否持久化已见条目，重启后补发停机期间的新条目
+    STATE_DB: Path = Field(default=Path("data/state.db"))  # 状态库路径
+
     # 日志配置
     LOG_LEVEL: str = Field(default="INFO")
     LOG_RETENTION: int = Field(default=30)  # 日志保留天数
     LOG_DIR: Path = Field(default=Path("logs"))
 
-    @validator('SCAN_INTERVAL', 'LOG_RETENTION', pre=True)
+    @validator('SCAN_INTERVAL', 'LOG_RETENTION', 'MAX_WORKERS', 'FETCH_TIMEOUT',
+               'SNAPSHOT_TTL', 'MIN_SCAN_INTERVAL', 'MAX_SCAN_INTERVAL',
+               'BREAKER_THRESHOLD', 'BREAKER_BASE_DELAY', 'BREAKER_MAX_DELAY', 'METRICS_PORT',
+               'BACKFILL_PER_PAGE', 'BACKFILL_WORKERS', 'BACKFILL_HOST_CONCURRENCY', 'BACKFILL_HOST_RATE',
+               'DETAIL_WORKERS', 'DETAIL_SUMMARY_CHARS', 'STATS_REPORT_INTERVAL', pre=True)
     def parse_int(cls, v):
         print(f"Parsing int value: {v}, type: {type(v)}")  # 调试信息
         if isinstance(v, str):
@@ -38,7 +83,8 @@ class Settings(BaseSettings):
                 return None
         return v
 
-    @validator('SEND_STARTUP_NOTIFY', 'DAILY_PUSH_ENABLED', pre=True)
+    @validator('SEND_STARTUP_NOTIFY', 'DAILY_PUSH_ENABLED', 'FAST_PARSER', 'STATE_PERSIST',
+               'ADAPTIVE_POLLING', 'DETAIL_FETCH', pre=True)
     def parse_bool(cls, v):
         print(f"Parsing bool value: {v}, type: {type(v)}")  # 调试信息
         if isinstance(v, str):
@@ -53,6 +99,24 @@ class Settings(BaseSettings):
             return ["09:00", "21:00"]
         return [time.strip() for time in self.DAILY_PUSH_TIMES.split(',') if time.strip()]
 
+    @property
+    def targets(self) -> List[Tuple[str, int]]:
+        """获取监控目标列表，每项为 (url, 扫描间隔)"""
+        if not self.TARGETS:
+            return [(self.TARGET_URL, self.SCAN_INTERVAL)]
+        targets = []
+        for item in self.TARGETS.split('#')[0].split(','):
+            item = item.strip()
+            if not item:
+                continue
+            url, _, interval = item.partition('|')
+            try:
+                interval = int(interval) if interval.strip() else self.SCAN_INTERVAL
+            except ValueError:
+                interval = self.SCAN_INTERVAL
+            targets.append((url.strip(), interval))
+        return targets
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -65,6 +129,8 @@ all_vars = {
     'TARGET_URL': os.getenv('TARGET_URL'),
     'SCAN_INTERVAL': os.getenv('SCAN_INTERVAL'),
     'SEND_STARTUP_NOTIFY': os.getenv('SEND_STARTUP_NOTIFY'),
+    'TARGETS': os.getenv('TARGETS'),
+    'MAX_WORKERS': os.getenv('MAX_WORKERS'),
     'DAILY_PUSH_ENABLED': os.getenv('DAILY_PUSH_ENABLED'),
     'DAILY_PUSH_TIMES': os.getenv('DAILY_PUSH_TIMES'),
     'LOG_LEVEL': os.getenv('LOG_LEVEL'),
@@ -79,6 +145,9 @@ print("\n=== Final Settings Values ===")
 print(f"TARGET_URL: {settings.TARGET_URL}")
 print(f"SCAN_INTERVAL: {settings.SCAN_INTERVAL}")
 print(f"SEND_STARTUP_NOTIFY: {settings.SEND_STARTUP_NOTIFY}")
+print(f"Targets: {settings.targets}")
+print(f"MAX_WORKERS: {settings.MAX_WORKERS}")
+print(f"ADAPTIVE_POLLING: {settings.ADAPTIVE_POLLING} ({settings.MIN_SCAN_INTERVAL}-{settings.MAX_SCAN_INTERVAL}s)")
 print(f"DAILY_PUSH_ENABLED: {settings.DAILY_PUSH_ENABLED}")
 print(f"DAILY_PUSH_TIMES: {settings.DAILY_PUSH_TIMES}")
 print(f"Push times list: {settings.push_times}")
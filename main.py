@@ -1,28 +1,74 @@
 import sys
 import signal
+import argparse
 from utils.logger import logger
-from utils.monitor import WebMonitor
+from utils.engine import MonitorEngine
 from utils.notify import send
 
 def signal_handler(signum, frame):
     """处理退出信号"""
     logger.info("接收到退出信号，正在关闭程序...")
-    send("监控程序退出", "程序正常退出")
+    send("监控程序退出", "程序正常退出", block=True)
     sys.exit(0)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="网站更新监控")
+    parser.add_argument("--backfill", action="store_true", help="回填栏目历史记录到状态库后退出，不启动监控")
+    parser.add_argument("--url", action="append", help="回填的栏目地址，可重复指定，默认为所有监控目标")
+    parser.add_argument("--limit", type=int, help="每个栏目最多回填的页数")
+    parser.add_argument("--full", action="store_true", help="遇到已有历史时也不停止，抓取全部未完成的页")
+    parser.add_argument("--search", metavar="关键词", help="在状态库中搜索历史条目后退出，多个关键词用空格分隔")
+    parser.add_argument("--since", help="搜索的起始日期（YYYY-MM-DD）")
+    parser.add_argument("--until", help="搜索的截止日期（YYYY-MM-DD）")
+    parser.add_argument("--top", type=int, default=50, help="最多显示的搜索结果数")
+    return parser.parse_args()
+
+def backfill(args):
+    """回填栏目历史记录，中断后再次运行会从未完成的页继续"""
+    from config.settings import settings
+    from utils.backfill import Backfill
+
+    urls = args.url or [url for url, _ in settings.targets]
+    for url in urls:
+        Backfill(url).run(limit=args.limit, full=args.full)
+
+def search(args):
+    """按关键词和日期范围搜索已见条目"""
+    import time
+    from utils.monitor import get_state_store
+
+    state_store = get_state_store()
+    if state_store is None:
+        print("搜索需要启用状态库（STATE_PERSIST=true）")
+        return
+    start_time = time.perf_counter()
+    results = state_store.search(args.search or "", args.since, args.until, limit=args.top)
+    elapsed = time.perf_counter() - start_time
+    for news in results:
+        print(f"[{news['date']}] {news['title']}\n    {news['url']}")
+    print(f"共 {len(results)} 条结果，耗时 {elapsed * 1000:.1f} 毫秒")
+
 def main():
     """主程序入口"""
+    args = parse_args()
+    if args.backfill:
+        backfill(args)
+        return
+    if args.search is not None or args.since or args.until:
+        search(args)
+        return
+
     # 注册信号处理器
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
     try:
-        # 创建并运行监控器
-        monitor = WebMonitor()
-        monitor.run()
+        # 创建并运行监控引擎（支持多个目标）
+        engine = MonitorEngine()
+        engine.run()
     except Exception as e:
         logger.error(f"程序启动失败: {str(e)}")
         raise
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main() 
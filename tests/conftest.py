@@ -0,0 +1,9 @@
+"""测试公共设置：降低日志级别、不写状态库，并把项目根目录加入导入路径"""
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("STATE_PERSIST", "false")
+os.environ.setdefault("DETAIL_FETCH", "false")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,82 @@
+"""条目级差异比较：python -m pytest -q tests/test_diff.py"""
+from benchmarks.common import StubServer, make_page
+from utils.diff import diff_items, item_fingerprint, item_key
+from utils.monitor import WebMonitor
+
+
+def news(n: int, title: str = "", date: str = "2024-05-01") -> dict:
+    return {"title": title or f"公告 {n}", "url": f"http://example.com/art_{n}.html", "date": date}
+
+
+def fingerprints(items) -> dict:
+    return {item_key(item): item_fingerprint(item) for item in items}
+
+
+def test_unchanged_items_give_empty_diff():
+    items = [news(1), news(2)]
+    diff = diff_items(fingerprints(items), [dict(item) for item in items], set())
+    assert not diff
+    assert diff.summary() == "新增 0 条，变更 0 条，移除 0 条"
+
+
+def test_new_item():
+    previous = [news(1), news(2)]
+    current = [news(3)] + previous
+    diff = diff_items(fingerprints(previous), current, set(fingerprints(previous)))
+    assert diff.new == [news(3)] and not diff.changed and not diff.removed
+
+
+def test_changed_title_or_date_is_a_change_not_a_new_item():
+    previous = [news(1), news(2)]
+    current = [news(1, title="公告 1（更正）"), news(2, date="2024-05-02")]
+    diff = diff_items(fingerprints(previous), current, set(fingerprints(previous)))
+    assert not diff.new and not diff.removed
+    assert diff.changed == current
+
+
+def test_removed_item():
+    previous = [news(1), news(2)]
+    diff = diff_items(fingerprints(previous), [news(1)], set(fingerprints(previous)))
+    assert diff.removed == [item_key(news(2))] and not diff.new and not diff.changed
+
+
+def test_item_seen_before_is_not_new_when_it_reappears():
+    """从页面上掉出后又重新出现的条目（在历史中见过）不算新增"""
+    previous = [news(1)]
+    seen = set(fingerprints([news(1), news(2)]))
+    diff = diff_items(fingerprints(previous), [news(2), news(1)], seen)
+    assert not diff
+
+
+def test_duplicate_items_are_counted_once():
+    diff = diff_items({}, [news(1), news(1)], set())
+    assert diff.new == [news(1)]
+
+
+def test_item_without_url_is_keyed_by_title():
+    assert item_key({"title": "无链接公告", "url": ""}) == item_key({"title": "无链接公告"})
+    assert item_key({"title": "无链接公告"}) != item_key({"title": "另一条"})
+
+
+def test_visit_counter_change_alone_triggers_nothing():
+    """页面上只有访问计数变化时不解析出任何差异，也不发送通知"""
+    state = {"counter": 0, "newest": 19}
+
+    def app(method, path, headers, body):
+        state["counter"] += 1
+        page = make_page(20, newest=state["newest"], counter=state["counter"])
+        return 200, {"Content-Type": "text/html; charset=utf-8"}, page.encode("utf-8")
+
+    sent = []
+    with StubServer(app) as server:
+        monitor = WebMonitor(f"{server.base_url}/col/col37116/index.html", 60)
+        monitor.current_interval = 0
+        monitor._notify_new = lambda news_list, details: sent.append(news_list)
+        assert not monitor.check_updates()  # 首次检查只记录
+        assert not monitor.check_updates()
+        assert not monitor.check_once()
+        assert state["counter"] == 3 and not sent
+
+        state["newest"] += 1
+        assert monitor.check_once()
+        assert sent == [monitor.parse_content(make_page(1, newest=20))]
@@ -0,0 +1,52 @@
+"""单遍提取器与 BeautifulSoup 解析结果一致：python -m pytest -q tests/test_parse.py"""
+from pathlib import Path
+
+import pytest
+
+from benchmarks.common import PAGE_HEAD, PAGE_TAIL, make_page
+from utils.monitor import WebMonitor
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
+
+# 手写的边界情况：实体、绝对地址、多个 class、日期中嵌套标签、缺少日期、不是 CDATA 的记录
+EDGE_RECORDS = """
+<record><![CDATA[<li><a href="/art/2024/5/1/art_37116_1.html" title="招聘&amp;公示 &quot;2024&quot;">x</a><span class="font14">[2024-05-01]</span></li>]]></record>
+<record><![CDATA[<li><a href="http://other.example.com/a.html" title="外部链接">y</a><span class="gray font14">[2024-04-30]</span></li>]]></record>
+<record><![CDATA[<li><a href="/art/2024/4/29/art_37116_3.html" title="嵌套日期"></a><span class="font14">[<b>2024-04-29</b>]<!-- c --></span></li>]]></record>
+<record><![CDATA[<li><a href="/art/2024/4/28/art_37116_4.html" title="没有日期">z</a></li>]]></record>
+<record><li><a href="/art/2024/4/27/art_37116_5.html" title="没有 CDATA">w</a><span class="font14">[2024-04-27]</span></li></record>
+"""
+EDGE_PAGE = PAGE_HEAD.format(column=37116, counter=0) + EDGE_RECORDS + PAGE_TAIL.format(counter=0)
+
+
+@pytest.fixture(scope="module")
+def monitor():
+    return WebMonitor("http://www.lixia.gov.cn/col/col37116/index.html")
+
+
+CASES = (
+    [pytest.param(path.read_text(encoding="utf-8"), id=path.name) for path in sorted(FIXTURES.glob("*.html"))]
+    + [pytest.param(make_page(n), id=f"synthetic-{n}") for n in (1, 20, 1000)]
+    + [pytest.param(EDGE_PAGE, id="edge-cases")]
+)
+
+
+@pytest.mark.parametrize("html", CASES)
+def test_fast_parser_matches_bs4(monitor, html):
+    expected = monitor._parse_records_bs4(html)
+    assert expected, "用例应至少包含一条有效记录"
+    assert monitor._parse_records_fast(html) == expected
+
+
+def test_edge_cases(monitor):
+    news_list = monitor._parse_records_fast(EDGE_PAGE)
+    assert [news["title"] for news in news_list] == ['招聘&公示 "2024"', "外部链接", "嵌套日期"]
+    assert news_list[0]["url"] == "http://www.lixia.gov.cn/art/2024/5/1/art_37116_1.html"
+    assert news_list[1]["url"] == "http://other.example.com/a.html"
+    assert news_list[2]["date"] == "2024-04-29"
+
+
+def test_page_without_record_block(monitor):
+    html = "<html><body><p>维护中</p></body></html>"
+    assert monitor._parse_records_bs4(html) is None
+    assert monitor._parse_records_fast(html) is None
@@ -0,0 +1,90 @@
+"""调度器的假时钟测试：python -m pytest -q tests/test_scheduler.py"""
+from datetime import datetime
+
+from utils.scheduler import Scheduler, next_daily
+
+START = datetime(2026, 1, 1, 8, 57, 30).timestamp()
+PUSH_TIMES = ["09:00", "21:00"]
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+def make_scheduler(start: float = START):
+    clock = FakeClock(start)
+    return clock, Scheduler(clock=clock.time, sleep=clock.sleep)
+
+
+def test_every_and_daily_run_exactly_on_schedule():
+    """两天内每 300 秒的扫描和每天 09:00、21:00 的推送都在计划时刻执行，推送不受扫描间隔影响"""
+    days, interval = 2, 300
+    clock, scheduler = make_scheduler()
+    runs = {"scan": [], "push": []}
+    scheduler.every(interval, lambda: runs["scan"].append(clock.now))
+    for at in PUSH_TIMES:
+        scheduler.daily(at, lambda: runs["push"].append(clock.now))
+    scheduler.call_at(START + days * 86400, scheduler.stop)
+    scheduler.run()
+
+    assert runs["scan"] == [START + interval * i for i in range(1, days * 86400 // interval + 1)]
+    expected_push, when = [], START
+    for _ in range(days * len(PUSH_TIMES)):
+        when = min(next_daily(at, when) for at in PUSH_TIMES)
+        expected_push.append(when)
+    assert runs["push"] == expected_push
+    assert datetime.fromtimestamp(runs["push"][0]).strftime("%H:%M:%S") == "09:00:00"
+
+
+def test_next_daily_is_strictly_later():
+    nine = datetime(2026, 1, 1, 9, 0).timestamp()
+    assert next_daily("09:00", nine - 1) == nine
+    assert next_daily("09:00", nine) == datetime(2026, 1, 2, 9, 0).timestamp()
+    assert next_daily("21:30:15", nine) == datetime(2026, 1, 1, 21, 30, 15).timestamp()
+
+
+def test_every_does_not_drift_with_slow_jobs():
+    """周期任务按计划时间顺延，执行耗时不累积到后续的执行时刻"""
+    clock, scheduler = make_scheduler()
+    runs = []
+
+    def slow():
+        runs.append(clock.now)
+        clock.now += 7
+
+    scheduler.every(60, slow)
+    scheduler.call_at(START + 600, scheduler.stop)
+    scheduler.run()
+    assert runs == [START + 60 * i for i in range(1, 11)]
+
+
+def test_cancelled_job_does_not_run():
+    clock, scheduler = make_scheduler()
+    runs = []
+    job = scheduler.call_later(10, lambda: runs.append("cancelled"))
+    scheduler.call_later(20, lambda: runs.append("kept"))
+    scheduler.cancel(job)
+    scheduler.run()
+    assert runs == ["kept"]
+    assert clock.now == START + 20
+
+
+def test_errors_go_to_handler_and_periodic_job_continues():
+    clock, scheduler = make_scheduler()
+    errors = []
+    scheduler.on_error = lambda job, error: errors.append((job.name, str(error)))
+
+    def broken():
+        raise RuntimeError("boom")
+
+    scheduler.every(30, broken, name="broken")
+    scheduler.call_at(START + 90, scheduler.stop)
+    scheduler.run()
+    assert errors == [("broken", "boom")] * 3
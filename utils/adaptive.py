@@ -0,0 +1,125 @@
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterable, List, Optional, Tuple
+
+
+# 条目日期可能带有时分
+_TIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d")
+
+
+def publish_time(value: str) -> Tuple[Optional[float], bool]:
+    """条目日期对应的时间戳，以及日期是否带有时分；无法识别时返回 (None, False)"""
+    value = (value or '').strip()
+    for fmt in _TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).timestamp(), fmt != "%Y-%m-%d"
+        except ValueError:
+            continue
+    return None, False
+
+
+class PublishPattern:
+    """
+    目标的发布规律：按星期统计条目日期，按小时统计当天发布、当天检测到的新条目的检测时间。
+    活跃时段使用 min_interval，冷清时段逐步放宽到 max_interval；样本不足时使用固定的 base 间隔。
+    """
+
+    # 每记录一个新样本，旧样本的权重乘以该系数，使规律变化后能逐渐适应
+    DECAY = 0.995
+    # 活跃度达到峰值的该比例即视为活跃时段
+    HOT = 0.5
+
+    def __init__(self, base: float, min_interval: float, max_interval: float, min_samples: int = 10,
+                 clock: Callable[[], float] = time.time):
+        self.base = base
+        self.min_interval = min(min_interval, max_interval)
+        self.max_interval = max(min_interval, max_interval)
+        self.min_samples = min_samples
+        self.clock = clock
+        self.weekdays = [0.0] * 7
+        self.hours = [0.0] * 24
+        self.weekday_samples = 0
+        self.hour_samples = 0
+
+    @staticmethod
+    def _parse_date(value: str) -> Optional[date]:
+        try:
+            return datetime.strptime(value.strip()[:10], "%Y-%m-%d").date()
+        except (AttributeError, ValueError):
+            return None
+
+    def record_dates(self, dates: Iterable[str]):
+        """记录条目的发布日期（只有日期，计入星期分布）"""
+        for value in dates:
+            day = self._parse_date(value)
+            if day is None:
+                continue
+            self.weekdays = [w * self.DECAY for w in self.weekdays]
+            self.weekdays[day.weekday()] += 1
+            self.weekday_samples += 1
+
+    def record_detection(self, detected_at: float, dates: Iterable[str]):
+        """
+        记录一次检测到的新条目：日期计入星期分布；
+        条目日期与检测当天一致时，检测时间近似发布时间，计入小时分布。
+        """
+        dates = list(dates)
+        self.record_dates(dates)
+        detected = datetime.fromtimestamp(detected_at)
+        if any(self._parse_date(value) == detected.date() for value in dates):
+            self.hours = [h * self.DECAY for h in self.hours]
+            self.hours[detected.hour] += 1
+            self.hour_samples += 1
+
+    def load_history(self, history: Iterable[Tuple[str, float]]):
+        """从已见条目的 (日期, 首次发现时间) 恢复规律"""
+        for value, first_seen in history:
+            self.record_detection(first_seen, [value])
+
+    def score(self, at: float) -> Optional[float]:
+        """at 时刻的活跃度（0~1），样本不足时返回 None"""
+        moment = datetime.fromtimestamp(at)
+        scores = []
+        if self.weekday_samples >= self.min_samples:
+            scores.append((self.weekdays[moment.weekday()] + 1) / (max(self.weekdays) + 1))
+        if self.hour_samples >= self.min_samples:
+            # 相邻小时按一半权重计入，避免活跃时段边缘因样本稀疏被判为冷清
+            hour = moment.hour
+            nearby = max(self.hours[hour], 0.5 * max(self.hours[(hour - 1) % 24], self.hours[(hour + 1) % 24]))
+            scores.append((nearby + 0.5) / (max(self.hours) + 0.5))
+        if not scores:
+            return None
+        result = 1.0
+        for value in scores:
+            result *= value
+        return result
+
+    def interval_at(self, at: float) -> float:
+        """
+        at 时刻的扫描间隔：活跃度达到 HOT 时为 min_interval，趋近 0 时为 max_interval，
+        中间按对数插值，使稍有发布的时段仍能较快检查。
+        """
+        score = self.score(at)
+        if score is None:
+            return self.base
+        heat = min(score / self.HOT, 1.0)
+        return self.min_interval * (self.max_interval / self.min_interval) ** (1.0 - heat)
+
+    def next_delay(self, now: Optional[float] = None) -> float:
+        """
+        下一次检查前的等待时间；冷清时段的长间隔不会越过下一个整点之后更活跃的时段。
+        """
+        now = self.clock() if now is None else now
+        delay = self.interval_at(now)
+        current_hour = datetime.fromtimestamp(now).replace(minute=0, second=0, microsecond=0)
+        next_hour = (current_hour + timedelta(hours=1)).timestamp()
+        if now + delay > next_hour and self.interval_at(next_hour) < delay:
+            delay = max(next_hour - now, self.min_interval)
+        return delay
+
+    def hot_hours(self, threshold: float = 0.5) -> List[int]:
+        """活跃度不低于 threshold 的小时（用于日志展示）"""
+        if self.hour_samples < self.min_samples:
+            return []
+        peak = max(self.hours) or 1.0
+        return [hour for hour, weight in enumerate(self.hours) if weight / peak >= threshold]
@@ -0,0 +1,194 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urljoin, urlparse
+
+import requests
+
+from utils import extractor
+from utils.diff import item_key
+from utils.logger import logger
+from utils.monitor import session_pool, get_state_store
+from utils.ratelimit import TokenBucket
+from utils.store import StateStore
+from config.settings import settings
+
+_NEXTGROUP_RE = re.compile(r'<nextgroup>.*?href="([^"]+)"', re.S | re.I)
+_TOTAL_RE = re.compile(r'<totalrecord>\s*(\d+)\s*</totalrecord>', re.I)
+
+
+def jpage_request(html: str, page_url: str) -> Optional[Tuple[str, Dict[str, str]]]:
+    """从栏目页的 <nextgroup> 中取出分页接口地址和请求参数，找不到时返回 None"""
+    match = _NEXTGROUP_RE.search(html)
+    if match is None:
+        return None
+    href = urljoin(page_url, match.group(1).replace("&amp;", "&"))
+    parsed = urlparse(href)
+    params = {key: value for key, value in parse_qsl(parsed.query) if key != "page"}
+    params.setdefault("col", "1")
+    params.setdefault("sourceContentType", "1")
+    return parsed._replace(query="").geturl(), params
+
+
+class HostLimiter:
+    """按主机限制并发数和请求速率，避免回填时对目标网站造成压力"""
+
+    def __init__(self, concurrency: int, rate: float):
+        self.concurrency = max(concurrency, 1)
+        self.rate = rate
+        self.lock = threading.Lock()
+        self.hosts: Dict[str, Tuple[threading.Semaphore, Optional[TokenBucket]]] = {}
+
+    def _host(self, url: str) -> Tuple[threading.Semaphore, Optional[TokenBucket]]:
+        host = urlparse(url).netloc
+        with self.lock:
+            entry = self.hosts.get(host)
+            if entry is None:
+                bucket = TokenBucket(self.rate, 1) if self.rate > 0 else None
+                entry = self.hosts[host] = (threading.Semaphore(self.concurrency), bucket)
+            return entry
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        semaphore, bucket = self._host(url)
+        with semaphore:
+            while bucket is not None:
+                wait = bucket.try_acquire()
+                if not wait:
+                    break
+                time.sleep(wait)
+            return session_pool.get(url).request(method, url, **kwargs)
+
+
+class Backfill:
+    """
+    栏目历史回填：通过栏目的分页接口并发抓取历史记录，用与监控相同的提取器解析后写入状态库。
+
+    分页从最早一条记录开始编号（第 block 页为从最早一条起的第 block*per_page+1 至 (block+1)*per_page 条），
+    栏目新增记录不会改变已抓取页的编号，中断后再次运行只抓取未完成的页；
+    抓到的整页条目都已在状态库中（且不只是当前页面上的条目）时，说明已经接上已有的历史，停止抓取更早的页。
+    之前的回填写入过的页（未满的最新一页，以及比已完成的最早一页更新的页）不能说明更早的历史已存在，
+    不据此停止。
+    """
+
+    def __init__(self, url: Optional[str] = None, store: Optional[StateStore] = None,
+                 per_page: Optional[int] = None, workers: Optional[int] = None,
+                 limiter: Optional[HostLimiter] = None):
+        self.url = url or settings.TARGET_URL
+        self.store = store if store is not None else get_state_store()
+        if self.store is None:
+            raise ValueError("回填需要启用状态库（STATE_PERSIST=true）")
+        self.per_page = per_page or settings.BACKFILL_PER_PAGE
+        self.workers = workers or settings.BACKFILL_WORKERS
+        self.limiter = limiter or HostLimiter(settings.BACKFILL_HOST_CONCURRENCY, settings.BACKFILL_HOST_RATE)
+        parsed = urlparse(self.url)
+        self.base_url = f"{parsed.scheme}://{parsed.netloc}"
+        self.headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+        }
+        self.endpoint: Optional[str] = None
+        self.params: Dict[str, str] = {}
+        self.stop = threading.Event()
+        self.stats = {"pages": 0, "skipped": 0, "items": 0, "new_items": 0, "failed": 0}
+
+    def _get(self, url: str) -> str:
+        response = self.limiter.request("GET", url, headers=self.headers, timeout=settings.FETCH_TIMEOUT)
+        response.raise_for_status()
+        return response.text
+
+    def fetch_range(self, start: int, end: int) -> Tuple[List[Dict[str, str]], int]:
+        """抓取按从新到旧排列的第 start 至 end 条记录，返回 (条目, 栏目总记录数)"""
+        params = dict(self.params, startrecord=str(start), endrecord=str(end), perpage=str(self.per_page))
+        response = self.limiter.request(
+            "POST", self.endpoint, data=params, headers=self.headers, timeout=settings.FETCH_TIMEOUT
+        )
+        response.raise_for_status()
+        if response.encoding is None or response.encoding.lower() == "iso-8859-1":
+            response.encoding = "utf-8"
+        text = response.text
+        total = _TOTAL_RE.search(text)
+        return extractor.extract_records(text, self.base_url), int(total.group(1)) if total else 0
+
+    def _fetch_block(self, block: int, total: int) -> List[Dict[str, str]]:
+        end = total - block * self.per_page
+        start = max(end - self.per_page + 1, 1)
+        for attempt in range(3):
+            if self.stop.is_set():
+                raise CancelledError()
+            try:
+                return self.fetch_range(start, end)[0]
+            except requests.RequestException as e:
+                if attempt == 2:
+                    raise
+                logger.warning(f"回填第 {block} 页失败，稍后重试: {str(e)}")
+                time.sleep(2 ** attempt)
+        return []
+
+    def _save(self, block: int, total: int, news_list: List[Dict[str, str]], page_keys: set) -> bool:
+        """保存一页，返回该页是否为已满且条目均已在状态库中（不只是当前页面上的条目）的页"""
+        keys = [item_key(news) for news in news_list]
+        known = self.store.known_keys(self.url, keys)
+        complete = (block + 1) * self.per_page <= total
+        # 最新的一页未满，之后还会有新记录补进来，不记为已完成
+        self.store.save_backfill_block(self.url, self.per_page, block if complete else -1, news_list)
+        self.stats["pages"] += 1
+        self.stats["items"] += len(news_list)
+        self.stats["new_items"] += len(keys) - len(known)
+        return complete and bool(keys) and len(known) == len(keys) and not known <= page_keys
+
+    def run(self, limit: Optional[int] = None, full: bool = False) -> Dict[str, int]:
+        """执行回填，最多抓取 limit 页；full 为 True 时不因遇到已有历史而提前停止"""
+        start_time = time.time()
+        html = self._get(self.url)
+        request = jpage_request(html, self.url)
+        if request is None:
+            raise ValueError(f"{self.url} 中没有找到分页接口")
+        self.endpoint, self.params = request
+        _, total = self.fetch_range(1, 1)
+        if not total:
+            logger.warning("栏目总记录数为 0，无需回填")
+            return self.stats
+        blocks = (total + self.per_page - 1) // self.per_page
+        done = self.store.backfill_blocks(self.url, self.per_page)
+        pending = [block for block in range(blocks - 1, -1, -1) if block not in done]
+        self.stats["skipped"] = blocks - len(pending)
+        if limit is not None:
+            pending = pending[:limit]
+        page_keys = self.store.page_keys(self.url)
+        # 比已完成的最早一页更新的页可能由之前中断的回填写入，只有更早的页才能说明接上了已有的历史
+        oldest_done = min(done, default=blocks)
+        logger.info(f"开始回填 {self.url}：共 {total} 条记录 {blocks} 页，"
+                    f"已完成 {self.stats['skipped']} 页，本次抓取 {len(pending)} 页")
+
+        # 按从新到旧的顺序提交，每完成一页立即写入；遇到已有历史时取消尚未开始的更早的页
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="backfill") as executor:
+            futures = [(block, executor.submit(self._fetch_block, block, total)) for block in pending]
+            try:
+                for index, (block, future) in enumerate(futures):
+                    try:
+                        news_list = future.result()
+                    except CancelledError:
+                        continue
+                    except Exception as e:
+                        self.stats["failed"] += 1
+                        logger.error(f"回填第 {block} 页失败: {str(e)}")
+                        continue
+                    caught_up = self._save(block, total, news_list, page_keys)
+                    if caught_up and block < oldest_done and not full:
+                        logger.info(f"第 {block} 页的条目均已在状态库中，停止回填更早的页")
+                        self._cancel(futures[index + 1:])
+                        break
+            except KeyboardInterrupt:
+                logger.warning("回填被中断，已完成的页已保存，再次运行将从未完成的页继续")
+                self._cancel(futures)
+                raise
+
+        elapsed = time.time() - start_time
+        logger.info(f"回填完成，耗时: {elapsed:.2f}秒，统计: {self.stats}")
+        return self.stats
+
+    def _cancel(self, futures):
+        self.stop.set()
+        for _, future in futures:
+            future.cancel()
@@ -0,0 +1,93 @@
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class CircuitBreaker:
+    """
+    单个目标的熔断器：连续失败达到 threshold 次后打开，按带抖动的指数退避等待，
+    到期后进入半开状态放行一次探测请求，成功则关闭，失败则再次打开并加倍等待。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    # 导出指标时使用的状态数值
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, threshold: int = 3, base_delay: float = 60, max_delay: float = 3600,
+                 clock: Callable[[], float] = time.time):
+        self.threshold = max(threshold, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0            # 连续失败次数
+        self.trips = 0               # 累计打开次数
+        self.opened_at: Optional[float] = None
+        self.retry_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def backoff(self, failures: int) -> float:
+        """第 failures 次连续失败后的等待时间，在 [delay/2, delay] 之间随机"""
+        delay = min(self.base_delay * 2 ** max(failures - 1, 0), self.max_delay)
+        return random.uniform(delay / 2, delay)
+
+    def allow(self) -> bool:
+        """是否允许发起请求；打开状态到期后转为半开，放行一次探测"""
+        with self.lock:
+            if self.state == self.OPEN:
+                if self.clock() < self.retry_at:
+                    return False
+                self.state = self.HALF_OPEN
+            return True
+
+    def record_success(self) -> Optional[Dict]:
+        """记录一次成功；如果是从故障中恢复，返回本次故障的信息"""
+        with self.lock:
+            outage = None
+            if self.opened_at is not None:
+                outage = {
+                    "duration": self.clock() - self.opened_at,
+                    "failures": self.failures,
+                    "last_error": self.last_error,
+                }
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = self.retry_at = None
+            return outage
+
+    def record_failure(self, error: str) -> bool:
+        """记录一次失败，返回熔断器是否因此从关闭变为打开（即一次新故障的开始）"""
+        with self.lock:
+            now = self.clock()
+            self.failures += 1
+            self.last_error = error
+            self.retry_at = now + self.backoff(self.failures)
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.threshold):
+                tripped = self.opened_at is None
+                self.state = self.OPEN
+                if tripped:
+                    self.opened_at = now
+                    self.trips += 1
+                return tripped
+            return False
+
+    def retry_delay(self) -> float:
+        """距离下一次允许重试的秒数"""
+        with self.lock:
+            return 0.0 if self.retry_at is None else max(self.retry_at - self.clock(), 0.0)
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                "state": self.state,
+                "state_value": self.STATE_VALUES[self.state],
+                "failures": self.failures,
+                "trips": self.trips,
+                "opened_at": self.opened_at,
+                "retry_at": self.retry_at,
+                "last_error": self.last_error,
+            }
@@ -0,0 +1,230 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from urllib.parse import unquote, urljoin, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from utils.http_pool import SessionPool
+from utils.logger import logger
+from utils import metrics
+from config.settings import settings
+
+News = Dict[str, str]
+Detail = Dict[str, object]
+
+# 海云（Hanweb）站点正文区域的注释标记
+_CONTENT_RE = re.compile(r'<!--ZJEG_RSS\.content\.begin-->(.*?)<!--ZJEG_RSS\.content\.end-->', re.S | re.I)
+# 没有注释标记时依次尝试的正文容器
+_CONTENT_SELECTORS = ("#zoom", ".TRS_Editor", "#content", ".article-content", ".article", ".content")
+ATTACHMENT_EXTENSIONS = (".pdf", ".doc", ".docx", ".xls", ".xlsx", ".wps", ".et", ".zip", ".rar", ".7z", ".txt")
+
+
+def _attachment_name(link) -> str:
+    return link.get_text(" ", strip=True) or link.get("title") or ""
+
+
+def _is_attachment(href: str) -> bool:
+    parsed = urlparse(href)
+    path = unquote(parsed.path).lower()
+    query = unquote(parsed.query).lower()
+    # 海云的附件下载地址形如 /module/download/downfile.jsp?filename=xxx.pdf
+    return path.endswith(ATTACHMENT_EXTENSIONS) or (
+        "download" in path and any(ext in query for ext in ATTACHMENT_EXTENSIONS)
+    )
+
+
+def extract_detail(html: str, page_url: str, summary_chars: int = 200) -> Detail:
+    """从详情页提取正文文本、摘要和附件链接"""
+    match = _CONTENT_RE.search(html)
+    soup = BeautifulSoup(html, 'html.parser')
+    body = BeautifulSoup(match.group(1), 'html.parser') if match else None
+    for tree in filter(None, (soup, body)):
+        for tag in tree(["script", "style"]):
+            tag.decompose()
+    if body is None:
+        for selector in _CONTENT_SELECTORS:
+            body = soup.select_one(selector)
+            if body is not None:
+                break
+        else:
+            body = soup.body or soup
+    lines = (line.strip() for line in body.get_text("\n").splitlines())
+    text = "\n".join(line for line in lines if line)
+
+    # 附件链接可能在正文区域之外（如正文下方的附件列表），在整页中查找
+    attachments, seen = [], set()
+    for link in soup.find_all("a", href=True):
+        href = urljoin(page_url, link["href"].strip())
+        if href in seen or not _is_attachment(href):
+            continue
+        seen.add(href)
+        name = _attachment_name(link) or unquote(urlparse(href).path.rsplit("/", 1)[-1])
+        attachments.append({"name": name, "url": href})
+
+    summary = " ".join(text.split())
+    if len(summary) > summary_chars:
+        summary = summary[:summary_chars] + "…"
+    return {"text": text, "summary": summary, "attachments": attachments}
+
+
+def format_detail(detail: Optional[Detail]) -> str:
+    """格式化详情摘要和附件用于推送，没有详情时返回空字符串"""
+    if not detail:
+        return ""
+    parts = []
+    if detail["summary"]:
+        parts.append(f"摘要：{detail['summary']}")
+    if detail["attachments"]:
+        parts.append("附件：\n" + "\n".join(f"  {a['name']}：{a['url']}" for a in detail["attachments"]))
+    return "\n".join(parts)
+
+
+class ContentCache:
+    """
+    按内容寻址的磁盘缓存：页面内容以其 SHA-256 为文件名保存在 objects 下，
+    urls 下按地址的哈希记录对应的内容哈希；相同内容只保存一份，写入先写临时文件再原子替换。
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    @staticmethod
+    def _fan_out(base: Path, digest: str) -> Path:
+        return base / digest[:2] / digest[2:]
+
+    def _url_path(self, url: str) -> Path:
+        return self._fan_out(self.root / "urls", hashlib.sha1(url.encode("utf-8")).hexdigest())
+
+    @staticmethod
+    def _write(path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def get(self, url: str) -> Optional[str]:
+        try:
+            digest = self._url_path(url).read_text(encoding="utf-8").strip()
+            return self._fan_out(self.root / "objects", digest).read_bytes().decode("utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def put(self, url: str, content: str) -> str:
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._fan_out(self.root / "objects", digest)
+        if not path.exists():
+            self._write(path, data)
+        self._write(self._url_path(url), digest.encode("utf-8"))
+        return digest
+
+
+class DetailFetcher:
+    """
+    详情页抓取：检测到新增条目后在独立的有界线程池中并发抓取详情页，提取正文摘要和附件，
+    全部完成（或失败）后回调，由回调发送通知；监控线程提交后立即返回，不影响栏目页的扫描节奏。
+    已抓取过的详情页从磁盘缓存读取，不重复请求。
+    """
+
+    def __init__(self, workers: Optional[int] = None, cache_dir: Optional[Path] = None,
+                 summary_chars: Optional[int] = None):
+        self.workers = workers or settings.DETAIL_WORKERS
+        self.cache = ContentCache(cache_dir or settings.DETAIL_CACHE_DIR)
+        self.summary_chars = summary_chars or settings.DETAIL_SUMMARY_CHARS
+        self.session_pool = SessionPool(pool_maxsize=self.workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="detail")
+        self.headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+        }
+
+    def _download(self, url: str) -> Optional[str]:
+        """下载详情页，返回 HTML；地址本身是附件（非 HTML）时返回 None"""
+        start_time = time.time()
+        try:
+            response = self.session_pool.get(url).get(url, headers=self.headers, timeout=settings.FETCH_TIMEOUT,
+                                                      stream=True)
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type", "").lower()
+            if content_type and "html" not in content_type:
+                response.close()
+                return None
+            if response.encoding is None or response.encoding.lower() == "iso-8859-1":
+                response.encoding = "utf-8"
+            return response.text
+        finally:
+            metrics.DETAIL_SECONDS.labels().observe(time.time() - start_time)
+
+    def fetch(self, url: str) -> Detail:
+        """抓取并解析一个详情页，优先使用缓存"""
+        html = self.cache.get(url)
+        if html is not None:
+            metrics.DETAIL_RESULTS.labels("cache").inc()
+        else:
+            try:
+                html = self._download(url)
+            except requests.RequestException:
+                metrics.DETAIL_RESULTS.labels("error").inc()
+                raise
+            metrics.DETAIL_RESULTS.labels("fetched").inc()
+            if html is None:
+                name = unquote(urlparse(url).path.rsplit("/", 1)[-1])
+                return {"text": "", "summary": "", "attachments": [{"name": name, "url": url}]}
+            self.cache.put(url, html)
+        return extract_detail(html, url, self.summary_chars)
+
+    def fetch_all(self, news_list: List[News], callback: Callable[[Dict[str, Detail]], None]):
+        """
+        并发抓取 news_list 的详情页，全部结束后以 {链接: 详情} 调用 callback（在最后完成的抓取线程中执行），
+        抓取失败的条目不在结果中。
+        """
+        urls = list(dict.fromkeys(news["url"] for news in news_list if news.get("url")))
+        if not urls:
+            callback({})
+            return
+        results: Dict[str, Detail] = {}
+        remaining = [len(urls)]
+        lock = threading.Lock()
+
+        def done(url: str, future: Future):
+            try:
+                results[url] = future.result()
+            except Exception as e:
+                logger.warning(f"获取详情页失败 {url}: {str(e)}")
+            with lock:
+                remaining[0] -= 1
+                finished = remaining[0] == 0
+            if finished:
+                try:
+                    callback(results)
+                except Exception as e:
+                    logger.error(f"详情页抓取完成后的回调失败: {str(e)}")
+
+        for url in urls:
+            future = self.executor.submit(self.fetch, url)
+            future.add_done_callback(lambda future, url=url: done(url, future))
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+
+_fetcher: Optional[DetailFetcher] = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher() -> Optional[DetailFetcher]:
+    """获取全局详情页抓取器，DETAIL_FETCH 关闭时返回 None"""
+    global _fetcher
+    if not settings.DETAIL_FETCH:
+        return None
+    if _fetcher is None:
+        with _fetcher_lock:
+            if _fetcher is None:
+                _fetcher = DetailFetcher()
+    return _fetcher
@@ -0,0 +1,60 @@
+"""条目级差异比较：以链接/标题的哈希作为稳定标识，区分新增、变更和移除的条目"""
+import hashlib
+from typing import Dict, Iterable, List, Set
+
+News = Dict[str, str]
+
+
+def item_key(item: News) -> str:
+    """条目的稳定标识，优先使用链接，没有链接时使用标题"""
+    basis = item.get('url') or item.get('title', '')
+    return hashlib.sha1(basis.encode('utf-8')).hexdigest()[:16]
+
+
+def item_fingerprint(item: News) -> str:
+    """条目内容指纹，标题、日期或链接变化都会改变指纹"""
+    basis = f"{item.get('title', '')}\x1f{item.get('date', '')}\x1f{item.get('url', '')}"
+    return hashlib.sha1(basis.encode('utf-8')).hexdigest()[:16]
+
+
+class ItemDiff:
+    """一次检查的条目差异，无任何差异时为假值
+
+    new/changed 为本次页面上的条目，removed 为从页面上消失的条目标识。
+    """
+
+    __slots__ = ('new', 'changed', 'removed')
+
+    def __init__(self, new: List[News] = None, changed: List[News] = None, removed: List[str] = None):
+        self.new = new or []
+        self.changed = changed or []
+        self.removed = removed or []
+
+    def __bool__(self) -> bool:
+        return bool(self.new or self.changed or self.removed)
+
+    def summary(self) -> str:
+        return f"新增 {len(self.new)} 条，变更 {len(self.changed)} 条，移除 {len(self.removed)} 条"
+
+
+def diff_items(previous: Dict[str, str], current: Iterable[News], seen: Set[str]) -> ItemDiff:
+    """比较上次页面上的条目与本次条目
+
+    previous 为上次页面条目的指纹（标识 -> 指纹），seen 为历史上出现过的标识；
+    从页面上掉出后又重新出现的条目不算新增。
+    """
+    diff = ItemDiff()
+    current_keys = set()
+    for item in current:
+        key = item_key(item)
+        if key in current_keys:
+            continue
+        current_keys.add(key)
+        fingerprint = previous.get(key)
+        if fingerprint is None:
+            if key not in seen:
+                diff.new.append(item)
+        elif fingerprint != item_fingerprint(item):
+            diff.changed.append(item)
+    diff.removed = [key for key in previous if key not in current_keys]
+    return diff
@@ -0,0 +1,273 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from datetime import datetime
+from typing import Optional, List, Dict
+from utils.logger import logger
+from utils.monitor import WebMonitor, session_pool
+from utils.notify import send, hitokoto_enabled, get_hitokoto_pool, get_dispatcher, report_channel_stats
+from utils import subscription
+from utils.scheduler import Scheduler, Job
+from utils.breaker import CircuitBreaker
+from utils import metrics
+from config.settings import settings
+
+
+class MonitorEngine:
+    """多目标并发监控引擎：每个目标按各自间隔调度，在有界线程池中并发抓取解析"""
+
+    def __init__(self, monitors: Optional[List[WebMonitor]] = None, max_workers: Optional[int] = None):
+        if monitors is None:
+            monitors = [WebMonitor(url, interval) for url, interval in settings.targets]
+        self.monitors = monitors
+        self.max_workers = max_workers or settings.MAX_WORKERS
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="monitor")
+        self.running: Dict[WebMonitor, Future] = {}
+        self.running_lock = threading.Lock()
+        self.next_due: Dict[WebMonitor, float] = {}
+        self.scheduler = Scheduler(on_error=self._on_job_error)
+        self.scheduling = False
+        self.check_counts: Dict[WebMonitor, int] = {}
+        self.breakers: Dict[WebMonitor, CircuitBreaker] = {
+            monitor: CircuitBreaker(settings.BREAKER_THRESHOLD, settings.BREAKER_BASE_DELAY, settings.BREAKER_MAX_DELAY)
+            for monitor in self.monitors
+        }
+        self.start_time = datetime.now()
+        logger.info(f"监控引擎初始化完成，目标数: {len(self.monitors)}，并发线程数: {self.max_workers}")
+
+    def _run_target(self, monitor: WebMonitor) -> bool:
+        """在工作线程中检查单个目标，并安排该目标的下一次检查"""
+        breaker = self._breaker(monitor)
+        if not breaker.allow():
+            self._schedule_check(monitor, breaker.retry_delay())
+            return False
+        count = self.check_counts.get(monitor, 0) + 1
+        self.check_counts[monitor] = count
+        logger.info(f"[{monitor.url}] 第 {count} 次检查 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        try:
+            updated = monitor.check_once()
+        except Exception as e:
+            error_msg = f"监控过程发生错误: {str(e)}"
+            logger.error(f"[{monitor.url}] {error_msg}")
+            if breaker.record_failure(str(e)):
+                self._notify_down(monitor, breaker)
+            delay = breaker.retry_delay()
+            logger.info(f"[{monitor.url}] 连续失败 {breaker.failures} 次，等待 {delay:.0f} 秒后重试")
+            self._schedule_check(monitor, delay)
+            raise
+        outage = breaker.record_success()
+        if outage is not None:
+            self._notify_recovered(monitor, outage)
+        delay = monitor.next_interval()
+        self._schedule_check(monitor, delay)
+        logger.info(f"[{monitor.url}] 等待 {delay:.0f} 秒后进行下一次检查，"
+                    f"相对固定间隔已节省 {monitor.saved_requests:.0f} 次请求")
+        return updated
+
+    def _breaker(self, monitor: WebMonitor) -> CircuitBreaker:
+        breaker = self.breakers.get(monitor)
+        if breaker is None:
+            breaker = self.breakers.setdefault(monitor, CircuitBreaker(
+                settings.BREAKER_THRESHOLD, settings.BREAKER_BASE_DELAY, settings.BREAKER_MAX_DELAY
+            ))
+        return breaker
+
+    def _notify_down(self, monitor: WebMonitor, breaker: CircuitBreaker):
+        """目标连续失败、熔断器打开时发送一次故障通知，故障期间不再重复发送"""
+        logger.warning(f"[{monitor.url}] 连续失败 {breaker.failures} 次，暂停检查")
+        send(
+            "监控目标不可用",
+            f"{monitor.url}\n连续失败 {breaker.failures} 次，最近错误: {breaker.last_error}\n"
+            f"将按指数退避重试，恢复后另行通知",
+        )
+
+    def _notify_recovered(self, monitor: WebMonitor, outage: Dict):
+        minutes = outage["duration"] / 60
+        logger.info(f"[{monitor.url}] 已恢复，故障持续 {minutes:.1f} 分钟")
+        send(
+            "监控目标已恢复",
+            f"{monitor.url}\n故障持续 {minutes:.1f} 分钟，期间失败 {outage['failures']} 次，"
+            f"最近错误: {outage['last_error']}",
+        )
+
+    def breaker_stats(self) -> Dict[str, Dict]:
+        """各目标熔断器的状态"""
+        return {monitor.url: breaker.snapshot() for monitor, breaker in self.breakers.items()}
+
+    def _collect_metrics(self):
+        """采集时读取各目标熔断器状态、正在执行的检查数和调度器中的任务数"""
+        breakers = self.breaker_stats()
+        yield ("monitor_breaker_state", "gauge", "熔断器状态：0 关闭，1 半开，2 打开",
+               {(url,): s["state_value"] for url, s in breakers.items()}, ("target",))
+        yield ("monitor_breaker_failures", "gauge", "连续失败次数",
+               {(url,): s["failures"] for url, s in breakers.items()}, ("target",))
+        yield ("monitor_breaker_trips_total", "counter", "熔断器打开次数",
+               {(url,): s["trips"] for url, s in breakers.items()}, ("target",))
+        yield "monitor_checks_running", "gauge", "正在执行的检查数", {(): len(self.running)}, ()
+        yield "monitor_scheduled_jobs", "gauge", "调度器中等待执行的任务数", {(): len(self.scheduler.heap)}, ()
+
+    def _schedule_check(self, monitor: WebMonitor, delay: float):
+        """在 delay 秒后提交该目标的下一次检查"""
+        due = self.next_due[monitor] = time.time() + delay
+        # run_cycle 单独执行一轮时调度器未运行，只记录下次到期时间
+        if self.scheduling:
+            self.scheduler.call_later(delay, lambda: self._submit_due(monitor, due), name=f"check {monitor.url}")
+
+    def _submit_due(self, monitor: WebMonitor, due: float):
+        """
+        定时检查到期时提交：该目标之后已重新安排（如手动检查结束后）时跳过；
+        目标仍在检查中时（安排下一次检查的正是这次检查），等它结束后再提交，不中断该目标的调度
+        """
+        if self.next_due.get(monitor) != due:
+            return
+        future = self.running.get(monitor)
+        if future is not None and not future.done():
+            future.add_done_callback(lambda _: self._submit_due(monitor, due))
+            return
+        self.submit(monitor)
+
+    def submit(self, monitor: WebMonitor) -> Future:
+        """提交一个目标的检查任务；该目标已有任务在执行时返回该任务，同一目标同一时间只会有一个任务在执行"""
+        with self.running_lock:
+            future = self.running.get(monitor)
+            if future is not None and not future.done():
+                return future
+            future = self.executor.submit(self._run_target, monitor)
+            self.running[monitor] = future
+
+        def finished(_, m=monitor, f=future):
+            with self.running_lock:
+                if self.running.get(m) is f:
+                    del self.running[m]
+
+        future.add_done_callback(finished)
+        return future
+
+    def run_cycle(self, monitors: Optional[List[WebMonitor]] = None, timeout: Optional[float] = None) -> Dict[str, float]:
+        """对所有目标并发执行一轮检查，返回本轮统计"""
+        monitors = self.monitors if monitors is None else monitors
+        start_time = time.time()
+        connections_before = session_pool.connection_stats()
+        futures = [self.submit(monitor) for monitor in monitors]
+        done, not_done = wait(futures, timeout=timeout)
+        elapsed = time.time() - start_time
+        connections_after = session_pool.connection_stats()
+        stats = {
+            "targets": len(monitors),
+            "completed": len(done),
+            "pending": len(not_done),
+            "updated": sum(1 for f in done if not f.exception() and f.result()),
+            "failed": sum(1 for f in done if f.exception()),
+            "elapsed": elapsed,
+            "throughput": len(done) / elapsed if elapsed > 0 else 0.0,
+            "not_modified": sum(m.cycle_stats["not_modified"] for m in monitors),
+            "bytes_downloaded": sum(m.cycle_stats["bytes_downloaded"] for m in monitors),
+            "bytes_saved": sum(m.cycle_stats["bytes_saved"] for m in monitors),
+            "connections_new": connections_after["connections"] - connections_before["connections"],
+            "connections_reused": connections_after["reused"] - connections_before["reused"],
+        }
+        logger.info(f"本轮检查完成，耗时: {elapsed:.2f}秒，统计: {stats}")
+        return stats
+
+    def _collect(self, func) -> List[tuple]:
+        """并发对所有目标执行 func，返回 (monitor, 结果) 列表；会等待线程池，不能在线程池的工作线程中调用"""
+        return list(zip(self.monitors, self.executor.map(func, self.monitors)))
+
+    def send_startup_notify(self):
+        """发送启动通知，附带各目标当前最新信息"""
+        logger.info("发送启动通知")
+        parts = []
+        for monitor, latest_news in self._collect(lambda m: m.get_latest_news()):
+            if not latest_news:
+                continue
+            part = f"目标：{monitor.url}\n" if len(self.monitors) > 1 else ""
+            part += f"标题：{latest_news['title']}\n"
+            part += f"日期：{latest_news['date']}\n"
+            part += f"链接：{latest_news['url']}\n"
+            parts.append(part)
+        if not parts:
+            logger.warning("未找到最新消息，跳过启动通知")
+            return
+        send("监控程序启动通知", "监控程序启动，当前最新信息：\n\n" + "\n".join(parts))
+        logger.info("启动通知发送成功")
+
+    def _start_daily_summary(self):
+        threading.Thread(target=self.send_daily_summary, name="daily-summary", daemon=True).start()
+
+    def send_daily_summary(self):
+        """发送每日汇总消息，汇总所有目标的最新消息"""
+        start_time = time.time()
+        logger.info("开始发送每日汇总")
+        try:
+            parts = []
+            for monitor, latest_message in self._collect(lambda m: m.get_latest_message()):
+                if not latest_message:
+                    continue
+                prefix = f"目标：{monitor.url}\n" if len(self.monitors) > 1 else ""
+                parts.append(prefix + latest_message)
+            elapsed = time.time() - start_time
+            if not parts:
+                logger.warning(f"没有找到最新消息，跳过每日汇总，耗时: {elapsed:.2f}秒")
+                return
+            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            message = f"每日汇总 ({current_time}):\n最新消息：\n" + "\n\n".join(parts)
+            send("每日汇总消息", message)
+            logger.info(f"每日汇总消息发送成功，耗时: {elapsed:.2f}秒")
+        except Exception as e:
+            elapsed = time.time() - start_time
+            logger.error(f"发送每日汇总消息失败，耗时: {elapsed:.2f}秒，错误: {str(e)}")
+
+    def _expire_snapshots(self):
+        """空闲目标释放过期的页面快照"""
+        for monitor in self.monitors:
+            if monitor not in self.running:
+                monitor.expire_snapshot()
+
+    def _on_job_error(self, job: Job, error: Exception):
+        error_msg = f"定时任务 {job.name} 执行失败: {str(error)}"
+        logger.error(error_msg)
+        send("监控程序异常", error_msg)
+
+    def run(self):
+        """运行监控"""
+        logger.info(f"开始监控网页更新... 启动时间: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+
+        if settings.METRICS_PORT:
+            metrics.registry.add_collector(self._collect_metrics)
+            metrics.start_server(settings.METRICS_HOST, settings.METRICS_PORT)
+
+        # 先加载订阅，再启动通知分发器和重试队列：重启前未完成的重试（包括订阅者渠道的）立即按计划重放，
+        # 不必等到下一条通知触发分发器的创建
+        subscription.get_router()
+        get_dispatcher()
+
+        # 提前启动一言预取，推送时直接从缓存取用
+        if hitokoto_enabled():
+            get_hitokoto_pool()
+
+        if settings.SEND_STARTUP_NOTIFY:
+            self.send_startup_notify()
+
+        # 设置定时推送任务，在单独的线程中执行，不占用调度线程；
+        # 汇总本身要在线程池中并发获取各目标的最新消息，不能在线程池的工作线程中等待自己的线程池
+        if settings.DAILY_PUSH_ENABLED:
+            logger.info("设置定时推送任务")
+            for push_time in settings.push_times:
+                self.scheduler.daily(push_time, self._start_daily_summary, name=f"daily {push_time}")
+                logger.info(f"已设置每日推送时间: {push_time}")
+
+        # 每个目标的检查是独立的定时任务，检查结束后再按各自间隔安排下一次，
+        # 慢目标只占用自己的线程，不影响其他目标
+        self.scheduling = True
+        for monitor in self.monitors:
+            self._schedule_check(monitor, 0)
+        self.scheduler.every(max(settings.SNAPSHOT_TTL / 2, 1), self._expire_snapshots)
+        # 定期输出各推送渠道的发送统计与连接复用情况
+        if settings.STATS_REPORT_INTERVAL:
+            self.scheduler.every(
+                settings.STATS_REPORT_INTERVAL, lambda: self.executor.submit(report_channel_stats),
+                name="channel stats"
+            )
+
+        # 调度器只在最近一个任务到期时醒来
+        self.scheduler.run()
@@ -0,0 +1,104 @@
+"""栏目页记录的快速提取：单遍正则扫描 <script type="text/xml"> 中的 <record>，
+输出与基于 BeautifulSoup 的 WebMonitor 解析结果一致"""
+import re
+from html import unescape
+from typing import Dict, Iterator, List, Optional
+
+# 开始标签，属性值中允许出现引号包裹的 '>'
+_SCRIPT_TAG_RE = re.compile(r'<script(?=[\s/>])((?:[^\'">]+|"[^"]*"|\'[^\']*\')*)>', re.I)
+_SCRIPT_END_RE = re.compile(r'</\s*script\s*>', re.I)
+_ATTR_RE = re.compile(r'([^\s/>="\']+)(?:\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]*))?')
+_RECORD_RE = re.compile(r'<record(?=[\s/>])[^>]*>([^<]*(?:<(?!/record)[^<]*)*)</record\s*>', re.I)
+_CDATA_CLOSE_RE = re.compile(r'\]\s*\]\s*>')
+_A_TAG_RE = re.compile(r'<a(?=[\s/>])((?:[^\'">]+|"[^"]*"|\'[^\']*\')*)>', re.I)
+_SPAN_TAG_RE = re.compile(r'<span(?=[\s/>])((?:[^\'">]+|"[^"]*"|\'[^\']*\')*)>', re.I)
+_SPAN_BOUNDARY_RE = re.compile(r'<(/?)span(?=[\s/>])(?:[^\'">]+|"[^"]*"|\'[^\']*\')*>', re.I)
+_COMMENT_RE = re.compile(r'<!--.*?-->', re.S)
+_TAG_RE = re.compile(r'<[^>]*>')
+
+CDATA_OPEN = '<![cdata['
+
+
+def parse_attrs(attr_text: str) -> Dict[str, str]:
+    """解析开始标签中的属性，属性名转小写，值做实体反转义，重复属性以后者为准"""
+    attrs = {}
+    for match in _ATTR_RE.finditer(attr_text):
+        value = match.group(2)
+        if value is None:
+            value = ''
+        elif value[:1] in ('"', "'"):
+            value = value[1:-1]
+        attrs[match.group(1).lower()] = unescape(value) if '&' in value else value
+    return attrs
+
+
+def find_record_block(html: str) -> Optional[str]:
+    """返回第一个 <script type="text/xml"> 的内容，不存在时返回 None"""
+    for match in _SCRIPT_TAG_RE.finditer(html):
+        if parse_attrs(match.group(1)).get('type') != 'text/xml':
+            continue
+        end = _SCRIPT_END_RE.search(html, match.end())
+        return html[match.end():end.start() if end else len(html)]
+    return None
+
+
+def iter_records(block: str) -> Iterator[Optional[str]]:
+    """依次返回每个 <record> 的 CDATA 内容；不是单一 CDATA 的记录返回 None"""
+    for match in _RECORD_RE.finditer(block):
+        inner = match.group(1)
+        if inner[:9].lower() != CDATA_OPEN:
+            yield None
+            continue
+        close = _CDATA_CLOSE_RE.search(inner, 9)
+        if close is None or close.end() != len(inner):
+            yield None
+            continue
+        yield inner[9:close.start()]
+
+
+def _span_text(record: str, start: int) -> str:
+    """取从 start 开始到匹配的 </span> 为止的纯文本"""
+    depth = 1
+    end = len(record)
+    for match in _SPAN_BOUNDARY_RE.finditer(record, start):
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            end = match.start()
+            break
+    text = _COMMENT_RE.sub('', record[start:end])
+    return unescape(_TAG_RE.sub('', text))
+
+
+def extract_record(record: str, base_url: str) -> Optional[Dict[str, str]]:
+    """从单条记录中提取 title/url/date，缺少链接或日期时返回 None"""
+    link = _A_TAG_RE.search(record)
+    if link is None:
+        return None
+    for span in _SPAN_TAG_RE.finditer(record):
+        span_class = parse_attrs(span.group(1)).get('class')
+        if span_class is not None and (span_class == 'font14' or 'font14' in span_class.split()):
+            break
+    else:
+        return None
+
+    attrs = parse_attrs(link.group(1))
+    url = attrs.get('href', '')
+    if url and not url.startswith('http'):
+        url = f"{base_url}{url}"
+    return {
+        'title': attrs.get('title', '').strip(),
+        'url': url,
+        'date': _span_text(record, span.end()).strip('[]'),
+    }
+
+
+def extract_records(block: str, base_url: str) -> List[Dict[str, str]]:
+    """单遍提取记录块中的所有新闻"""
+    news_list = []
+    for record in iter_records(block):
+        if record is None:
+            continue
+        news = extract_record(record, base_url)
+        if news is not None:
+            news_list.append(news)
+    return news_list
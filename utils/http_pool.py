@@ -0,0 +1,68 @@
+import threading
+from typing import Dict
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class SessionPool:
+    """按主机复用 requests.Session，保持长连接，避免每次请求重新建立 TCP/TLS 连接"""
+
+    def __init__(self, pool_maxsize: int = 10):
+        self.pool_maxsize = pool_maxsize
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> requests.Session:
+        """获取 url 所在主机的会话，不存在时创建"""
+        parsed = urlparse(url)
+        host = f"{parsed.scheme}://{parsed.netloc}"
+        session = self._sessions.get(host)
+        if session is not None:
+            return session
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+            return session
+
+    def stats_by_host(self) -> Dict[str, Dict[str, int]]:
+        """按主机统计累计的请求数、新建连接数与复用连接数"""
+        with self._lock:
+            sessions = list(self._sessions.items())
+        stats = {}
+        for host, session in sessions:
+            total_requests = total_connections = 0
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is None:
+                        continue
+                    total_requests += pool.num_requests
+                    total_connections += pool.num_connections
+            stats[host] = {
+                "requests": total_requests,
+                "connections": total_connections,
+                "reused": max(total_requests - total_connections, 0),
+            }
+        return stats
+
+    def connection_stats(self) -> Dict[str, int]:
+        """统计所有会话累计的请求数、新建连接数与复用连接数"""
+        total = {"requests": 0, "connections": 0, "reused": 0}
+        for host_stats in self.stats_by_host().values():
+            for key in total:
+                total[key] += host_stats[key]
+        return total
+
+    def close(self):
+        """关闭所有会话"""
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            session.close()
@@ -0,0 +1,256 @@
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.logger import logger
+
+# 延迟类直方图的默认分桶（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 条目数直方图的分桶
+COUNT_BUCKETS = (0, 1, 5, 10, 20, 50, 100, 500, 1000, 10000)
+# 检测延迟（秒）：从一两分钟到一天
+DETECTION_BUCKETS = (60, 120, 300, 600, 900, 1800, 3600, 7200, 21600, 86400)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """一个指标族：按标签值缓存子指标，记录时只做一次字典查找和一次加锁累加"""
+
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.children: Dict[Tuple[str, ...], object] = {}
+        self.lock = threading.Lock()
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        child = self.children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} 需要标签 {self.labelnames}，实际为 {key}")
+            with self.lock:
+                child = self.children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for key, child in sorted(self.children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key, child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.get())}"]
+
+
+class _Value:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self.lock:
+            self.value += amount
+
+    def set(self, value: float):
+        self.value = value
+
+    def get(self) -> float:
+        return self.value
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def _render_child(self, key, child) -> List[str]:
+        with child.lock:
+            counts, total = list(child.counts), child.sum
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = 'le="' + _format_value(bound) + '"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+# 采集时调用的回调：返回 (指标名, 类型, 说明, {标签值元组: 数值}, 标签名元组)
+Collector = Callable[[], Iterable[Tuple[str, str, str, Dict[Tuple[str, ...], float], Tuple[str, ...]]]]
+
+
+class MetricsRegistry:
+    """
+    指标注册表：计数器和直方图在检查、推送时直接累加；
+    队列长度、熔断器状态等现成的状态由回调在采集时读取，不占用检查周期的时间。
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        self.collectors: List[Collector] = []
+        self.lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Collector):
+        with self.lock:
+            self.collectors.append(collector)
+
+    def render(self) -> str:
+        """按 Prometheus 文本格式输出所有指标"""
+        lines: List[str] = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        for collector in list(self.collectors):
+            try:
+                families = list(collector())
+            except Exception as e:
+                logger.error(f"采集指标失败: {str(e)}")
+                continue
+            for name, kind, help, samples, labelnames in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in sorted(samples.items()):
+                    lines.append(f"{name}{_format_labels(labelnames, key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# 抓取
+FETCH_SECONDS = registry.histogram("monitor_fetch_seconds", "目标页面抓取耗时（秒）", ("target",))
+FETCH_BYTES = registry.counter("monitor_fetch_bytes_total", "目标页面下载字节数", ("target",))
+FETCH_RESPONSES = registry.counter(
+    "monitor_fetch_responses_total", "目标页面响应次数，按状态码统计，请求异常记为 error", ("target", "status")
+)
+# 解析与比较
+PARSE_SECONDS = registry.histogram("monitor_parse_seconds", "页面解析耗时（秒）", ("target",))
+PARSE_RECORDS = registry.histogram(
+    "monitor_parse_records", "每次解析得到的条目数", ("target",), buckets=COUNT_BUCKETS
+)
+CHECK_SECONDS = registry.histogram("monitor_check_seconds", "一次更新检查（含抓取、解析、比较）的耗时（秒）", ("target",))
+NEW_ITEMS = registry.counter("monitor_new_items_total", "检测到的新增条目数", ("target",))
+DETECTION_SECONDS = registry.histogram(
+    "monitor_detection_latency_seconds",
+    "新增条目从发布到被检测到的时间（秒），页面只有日期时为上界",
+    ("target",), buckets=DETECTION_BUCKETS,
+)
+# 详情页
+DETAIL_SECONDS = registry.histogram("monitor_detail_fetch_seconds", "详情页下载耗时（秒）")
+DETAIL_RESULTS = registry.counter(
+    "monitor_detail_fetches_total", "详情页获取次数，按结果统计：cache、fetched、error", ("result",)
+)
+# 推送
+NOTIFY_SECONDS = registry.histogram("notify_send_seconds", "单个渠道一次推送的耗时（秒）", ("channel",))
+NOTIFY_RESULTS = registry.counter("notify_sends_total", "推送次数，按渠道和结果统计", ("channel", "result"))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 采集请求较频繁，不写入访问日志
+        pass
+
+
+def start_server(host: str, port: int) -> Optional[ThreadingHTTPServer]:
+    """在后台线程中提供 /metrics 接口，端口被占用时只记录错误，不影响监控"""
+    try:
+        server = ThreadingHTTPServer((host, port), _Handler)
+    except OSError as e:
+        logger.error(f"指标接口启动失败 {host}:{port}: {str(e)}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    logger.info(f"指标接口已启动: http://{host}:{server.server_address[1]}/metrics")
+    return server
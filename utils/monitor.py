@@ -1,39 +1,161 @@
 import time
-import schedule
+import hashlib
+import threading
 from datetime import datetime
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Set
+from urllib.parse import urlparse
 import requests
 from bs4 import BeautifulSoup
 from utils.logger import logger
 from utils.notify import send
+from utils.http_pool import SessionPool
+from utils import extractor
+from utils.diff import ItemDiff, diff_items, item_key, item_fingerprint
+from utils.snapshot import Snapshot
+from utils.store import StateStore
+from utils.adaptive import PublishPattern, publish_time
+from utils import metrics
+from utils import subscription
+from utils import detail
 from config.settings import settings
 
+# 所有监控目标共享的按主机连接池
+session_pool = SessionPool(pool_maxsize=settings.MAX_WORKERS)
+# 持久化状态库，重启后据此补发停机期间错过的条目；首次使用时才打开
+_state_store: Optional[StateStore] = None
+_state_store_lock = threading.Lock()
+
+
+def get_state_store() -> Optional[StateStore]:
+    """获取全局状态库，STATE_PERSIST 关闭时返回 None"""
+    global _state_store
+    if not settings.STATE_PERSIST:
+        return None
+    if _state_store is None:
+        with _state_store_lock:
+            if _state_store is None:
+                _state_store = StateStore(settings.STATE_DB)
+    return _state_store
+
+
+class FetchError(Exception):
+    """抓取目标页面失败"""
+
+
 class WebMonitor:
-    def __init__(self):
-        self.url = settings.TARGET_URL
-        self.last_content: Optional[str] = None
+    def __init__(self, url: Optional[str] = None, interval: Optional[int] = None):
+        self.url = url or settings.TARGET_URL
+        self.interval = interval or settings.SCAN_INTERVAL
+        parsed_url = urlparse(self.url)
+        self.base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+        # 上次检查的页面摘要，以及在更新检查、最新消息和每日汇总之间共享的页面快照
+        self.last_digest: Optional[str] = None
+        self.snapshot: Optional[Snapshot] = None
+        self.snapshot_lock = threading.Lock()
+        # 不保留整页内容，只保留紧凑的指纹：上次页面条目的指纹（标识 -> 指纹）、最新一条条目，
+        # 以及未启用状态库时历史上出现过的条目标识
+        self.page_fingerprints: Dict[str, str] = {}
+        self.latest: Optional[Dict[str, str]] = None
+        self.seen_keys: Set[str] = set()
+        # 条件请求所需的缓存校验信息
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.cached_size = 0
+        self.not_modified = False
+        # 最近一次抓取失败的原因，成功或 304 时清空
+        self.last_error: Optional[str] = None
+        self.cycle_stats: Dict[str, int] = self._new_stats()
+        # 上一次取得页面的时间，此时页面上还没有之后检测到的新增条目，用于估算检测延迟
+        self.last_page_at: Optional[float] = None
+        self.store = get_state_store()
+        # 按发布规律调整的扫描间隔，以及相对固定间隔节省的请求数统计
+        self.pattern: Optional[PublishPattern] = None
+        if settings.ADAPTIVE_POLLING:
+            self.pattern = PublishPattern(self.interval, settings.MIN_SCAN_INTERVAL, settings.MAX_SCAN_INTERVAL)
+        self.current_interval: float = self.interval
+        self.poll_stats = {"polls": 0, "fixed_polls": 0.0}
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
         self.start_time = datetime.now()
         logger.info(f"监控器初始化完成，目标URL: {self.url}")
-        logger.info(f"扫描间隔: {settings.SCAN_INTERVAL}秒")
+        logger.info(f"扫描间隔: {self.interval}秒")
         logger.info(f"每日推送: {'启用' if settings.DAILY_PUSH_ENABLED else '禁用'}")
         if settings.DAILY_PUSH_ENABLED:
             logger.info(f"推送时间: {', '.join(settings.push_times)}")
+        if self.store is not None:
+            self._restore()
+
+    def _restore(self):
+        """从状态库恢复上次的页面摘要、校验信息和页面条目"""
+        try:
+            state = self.store.load_state(self.url)
+        except Exception as e:
+            logger.error(f"读取持久化状态失败: {str(e)}")
+            return
+        if not state or not state["page_fingerprints"]:
+            logger.info("状态库中没有该目标的记录，首次检查将记录当前内容")
+            return
+        self.last_digest = state["digest"]
+        self.etag = state["etag"]
+        self.last_modified = state["last_modified"]
+        self.page_fingerprints = state["page_fingerprints"]
+        self.latest = state["latest"]
+        self.last_page_at = state["updated_at"]
+        if self.pattern is not None:
+            try:
+                self.pattern.load_history(self.store.publish_history(self.url))
+            except Exception as e:
+                logger.error(f"读取发布历史失败: {str(e)}")
+        logger.info(f"已从状态库恢复上次状态，上次页面 {len(self.page_fingerprints)} 条，首次检查将补发停机期间的新条目")
+
+    @staticmethod
+    def _new_stats() -> Dict[str, int]:
+        return {"requests": 0, "not_modified": 0, "bytes_downloaded": 0, "bytes_saved": 0}
 
     def fetch_content(self) -> Optional[str]:
-        """获取网页内容"""
+        """获取网页内容，使用长连接并携带 ETag/Last-Modified 进行条件请求
+
+        返回 304 时 self.not_modified 置为 True 并返回 None，由调用方沿用已有快照
+        """
         start_time = time.time()
+        self.not_modified = False
+        self.last_error = None
+        headers = dict(self.headers)
+        # 有快照或从状态库恢复了最新条目时才发送条件请求
+        can_revalidate = self.snapshot is not None or self.latest is not None
+        if can_revalidate:
+            if self.etag:
+                headers["If-None-Match"] = self.etag
+            if self.last_modified:
+                headers["If-Modified-Since"] = self.last_modified
         try:
             logger.info(f"开始获取网页内容: {self.url}")
-            response = requests.get(self.url, headers=self.headers, timeout=10)
-            response.raise_for_status()
+            session = session_pool.get(self.url)
+            response = session.get(self.url, headers=headers, timeout=settings.FETCH_TIMEOUT)
+            self.cycle_stats["requests"] += 1
             elapsed = time.time() - start_time
+            metrics.FETCH_SECONDS.labels(self.url).observe(elapsed)
+            metrics.FETCH_RESPONSES.labels(self.url, response.status_code).inc()
+            if response.status_code == 304 and can_revalidate:
+                self.not_modified = True
+                self.cycle_stats["not_modified"] += 1
+                self.cycle_stats["bytes_saved"] += self.cached_size
+                logger.info(f"网页未修改(304)，耗时: {elapsed:.2f}秒，节省 {self.cached_size} 字节")
+                return None
+            response.raise_for_status()
+            self.etag = response.headers.get("ETag")
+            self.last_modified = response.headers.get("Last-Modified")
+            self.cached_size = len(response.content)
+            self.cycle_stats["bytes_downloaded"] += self.cached_size
+            metrics.FETCH_BYTES.labels(self.url).inc(self.cached_size)
             logger.info(f"网页获取成功，耗时: {elapsed:.2f}秒，状态码: {response.status_code}")
             return response.text
         except requests.RequestException as e:
             elapsed = time.time() - start_time
+            self.last_error = str(e)
+            metrics.FETCH_SECONDS.labels(self.url).observe(elapsed)
+            metrics.FETCH_RESPONSES.labels(self.url, "error").inc()
             logger.error(f"获取网页内容失败，耗时: {elapsed:.2f}秒，错误: {str(e)}")
             return None
 
@@ -42,54 +164,16 @@ class WebMonitor:
         start_time = time.time()
         try:
             logger.info("开始解析网页内容")
-            soup = BeautifulSoup(html, 'html.parser')
-            news_list = []
-            
-            # 查找包含新闻列表的script标签
-            script_tag = soup.find('script', {'type': 'text/xml'})
-            if not script_tag:
-                logger.warning("未找到新闻列表数据")
-                return []
-
-            # 解析CDATA中的内容
-            cdata_content = script_tag.string
-            if not cdata_content:
-                logger.warning("未找到新闻列表内容")
+            if settings.FAST_PARSER:
+                news_list = self._parse_records_fast(html)
+            else:
+                news_list = self._parse_records_bs4(html)
+            if news_list is None:
                 return []
 
-            # 创建新的BeautifulSoup对象来解析CDATA内容
-            cdata_soup = BeautifulSoup(cdata_content, 'html.parser')
-            
-            # 查找所有record标签
-            records = cdata_soup.find_all('record')
-            logger.info(f"找到 {len(records)} 条记录")
-            
-            for record in records:
-                try:
-                    # 解析每个record中的内容
-                    record_soup = BeautifulSoup(record.string, 'html.parser')
-                    link = record_soup.find('a')
-                    date_span = record_soup.find('span', class_='font14')
-                    
-                    if link and date_span:
-                        title = link.get('title', '').strip()
-                        url = link.get('href', '')
-                        if url and not url.startswith('http'):
-                            url = f"http://www.lixia.gov.cn{url}"
-                        
-                        date = date_span.text.strip('[]')
-                        
-                        news_list.append({
-                            'title': title,
-                            'url': url,
-                            'date': date
-                        })
-                        logger.debug(f"解析成功: {title} ({date})")
-                except Exception as e:
-                    logger.error(f"解析单条新闻失败: {str(e)}")
-                    continue
-            
             elapsed = time.time() - start_time
+            metrics.PARSE_SECONDS.labels(self.url).observe(elapsed)
+            metrics.PARSE_RECORDS.labels(self.url).observe(len(news_list))
             logger.info(f"网页解析完成，耗时: {elapsed:.2f}秒，成功解析 {len(news_list)} 条信息")
             return news_list
         except Exception as e:
@@ -97,47 +181,259 @@ class WebMonitor:
             logger.error(f"解析网页内容失败，耗时: {elapsed:.2f}秒，错误: {str(e)}")
             return []
 
-    def check_updates(self) -> bool:
-        """检查是否有更新"""
+    def _parse_records_fast(self, html: str) -> Optional[List[Dict[str, str]]]:
+        """单遍扫描记录块提取新闻列表，结果与 _parse_records_bs4 一致"""
+        cdata_content = extractor.find_record_block(html)
+        if cdata_content is None:
+            logger.warning("未找到新闻列表数据")
+            return None
+        if not cdata_content:
+            logger.warning("未找到新闻列表内容")
+            return None
+
+        records = list(extractor.iter_records(cdata_content))
+        logger.info(f"找到 {len(records)} 条记录")
+        news_list = []
+        for record in records:
+            news = extractor.extract_record(record, self.base_url) if record is not None else None
+            if news is not None:
+                news_list.append(news)
+        return news_list
+
+    def _parse_records_bs4(self, html: str) -> Optional[List[Dict[str, str]]]:
+        """使用 BeautifulSoup 解析新闻列表（页面、CDATA 和每条记录分别建树）"""
+        soup = BeautifulSoup(html, 'html.parser')
+        news_list = []
+
+        # 查找包含新闻列表的script标签
+        script_tag = soup.find('script', {'type': 'text/xml'})
+        if not script_tag:
+            logger.warning("未找到新闻列表数据")
+            return None
+
+        # 解析CDATA中的内容
+        cdata_content = script_tag.string
+        if not cdata_content:
+            logger.warning("未找到新闻列表内容")
+            return None
+
+        # 创建新的BeautifulSoup对象来解析CDATA内容
+        cdata_soup = BeautifulSoup(cdata_content, 'html.parser')
+
+        # 查找所有record标签
+        records = cdata_soup.find_all('record')
+        logger.info(f"找到 {len(records)} 条记录")
+
+        for record in records:
+            try:
+                # 解析每个record中的内容
+                record_soup = BeautifulSoup(record.string, 'html.parser')
+                link = record_soup.find('a')
+                date_span = record_soup.find('span', class_='font14')
+
+                if link and date_span:
+                    title = link.get('title', '').strip()
+                    url = link.get('href', '')
+                    if url and not url.startswith('http'):
+                        url = f"{self.base_url}{url}"
+
+                    date = date_span.text.strip('[]')
+
+                    news_list.append({
+                        'title': title,
+                        'url': url,
+                        'date': date
+                    })
+                    logger.debug(f"解析成功: {title} ({date})")
+            except Exception as e:
+                logger.error(f"解析单条新闻失败: {str(e)}")
+                continue
+        return news_list
+
+    def get_snapshot(self, max_age: Optional[float] = None) -> Optional[Snapshot]:
+        """获取页面快照，缓存未超过 max_age 秒时直接复用，否则重新抓取
+
+        max_age 默认为 settings.SNAPSHOT_TTL，传 0 表示强制重新抓取
+        """
+        max_age = settings.SNAPSHOT_TTL if max_age is None else max_age
+        with self.snapshot_lock:
+            snapshot = self.snapshot
+            if snapshot is not None and snapshot.age() < max_age:
+                logger.info(f"复用 {snapshot.age():.1f} 秒前的页面快照，跳过抓取")
+                return snapshot
+
+            content = self.fetch_content()
+            if self.not_modified:
+                if snapshot is None:
+                    # 重启后首次请求即返回 304，由状态库中的最新条目重建快照
+                    snapshot = Snapshot.restored(self.last_digest, [self.latest])
+                    self.snapshot = snapshot
+                else:
+                    snapshot.touch()
+                return snapshot
+            if not content:
+                return None
+            digest = self.region_digest(content)
+            if snapshot is not None and snapshot.digest == digest:
+                # 记录区域未变化（例如只有访问量变化），沿用已解析的条目，丢弃本次内容
+                snapshot.touch()
+                return snapshot
+            snapshot = Snapshot(content, self.parse_content, digest=digest)
+            self.snapshot = snapshot
+            return snapshot
+
+    def expire_snapshot(self, max_age: Optional[float] = None):
+        """释放超过缓存时间的快照，之后只保留摘要、条目指纹和最新一条条目"""
+        max_age = settings.SNAPSHOT_TTL if max_age is None else max_age
+        snapshot = self.snapshot
+        if snapshot is None or snapshot.age() < max_age:
+            return
+        with self.snapshot_lock:
+            if self.snapshot is not snapshot:
+                return
+            self.snapshot = None
+            if snapshot.digest != self.last_digest:
+                # 快照还没有被更新检查记录，清除校验信息，避免下次 304 时沿用旧的条目
+                self.etag = self.last_modified = None
+
+    @staticmethod
+    def region_digest(content: str) -> str:
+        """页面中新闻记录区域的摘要，找不到记录区域时对整页计算"""
+        region = extractor.find_record_block(content) or content
+        return hashlib.sha1(region.encode('utf-8')).hexdigest()
+
+    def check_updates(self) -> ItemDiff:
+        """检查是否有更新，返回条目级差异（无变化时为假值）"""
         start_time = time.time()
         logger.info("开始检查更新")
-        
-        current_content = self.fetch_content()
-        if not current_content:
+        self.cycle_stats = self._new_stats()
+
+        # 检查间隔较短时不能复用上一轮自己抓取的快照
+        snapshot = self.get_snapshot(max_age=min(settings.SNAPSHOT_TTL, self.current_interval / 2))
+        self.log_cycle_stats()
+        if not snapshot:
+            if self.last_error is not None:
+                raise FetchError(self.last_error)
             logger.warning("获取当前内容失败，跳过更新检查")
-            return False
+            return ItemDiff()
+
+        # 摘要相同（包括 304）时无需解析
+        if snapshot.digest == self.last_digest:
+            self.last_page_at = snapshot.fetched_at
+            elapsed = time.time() - start_time
+            logger.info(f"未检测到更新，耗时: {elapsed:.2f}秒")
+            return ItemDiff()
+
+        news_list = snapshot.items
+        if not news_list:
+            logger.warning("未解析到任何条目，跳过更新检查")
+            return ItemDiff()
 
-        if self.last_content is None:
+        if self.last_digest is None:
             logger.info("首次运行，记录当前内容")
-            self.last_content = current_content
+            self._remember(snapshot)
+            if self.pattern is not None and self.pattern.weekday_samples == 0:
+                self.pattern.record_dates(news.get('date', '') for news in news_list)
             # 打印最新一条消息
-            news_list = self.parse_content(current_content)
-            if news_list:
-                latest = news_list[0]
-                logger.info("当前最新消息:")
-                logger.info(f"标题: {latest['title']}")
-                logger.info(f"日期: {latest['date']}")
-                logger.info(f"链接: {latest['url']}")
-            return False
+            latest = news_list[0]
+            logger.info("当前最新消息:")
+            logger.info(f"标题: {latest['title']}")
+            logger.info(f"日期: {latest['date']}")
+            logger.info(f"链接: {latest['url']}")
+            return ItemDiff()
 
-        has_update = current_content != self.last_content
+        diff = diff_items(self.page_fingerprints, news_list, self._known_keys(news_list))
+        previous_page_at = self.last_page_at
+        self._remember(snapshot)
         elapsed = time.time() - start_time
-        
-        if has_update:
-            logger.info(f"检测到更新，耗时: {elapsed:.2f}秒")
-            self.last_content = current_content
-            # 打印更新后的最新消息
-            news_list = self.parse_content(current_content)
-            if news_list:
-                latest = news_list[0]
-                logger.info("更新后的最新消息:")
-                logger.info(f"标题: {latest['title']}")
-                logger.info(f"日期: {latest['date']}")
-                logger.info(f"链接: {latest['url']}")
+
+        if diff.new:
+            self._observe_detection(diff.new, snapshot.fetched_at, previous_page_at)
+            if self.pattern is not None:
+                self.pattern.record_detection(time.time(), [news.get('date', '') for news in diff.new])
+
+        if diff:
+            logger.info(f"检测到更新: {diff.summary()}，耗时: {elapsed:.2f}秒")
+            for label, items in (("新增", diff.new), ("变更", diff.changed)):
+                for news in items:
+                    logger.info(f"{label}: {news['title']} ({news['date']}) {news['url']}")
+            if diff.removed:
+                logger.info(f"移除: {', '.join(diff.removed)}")
         else:
-            logger.info(f"未检测到更新，耗时: {elapsed:.2f}秒")
+            logger.info(f"页面内容有变化但条目无变化，未检测到更新，耗时: {elapsed:.2f}秒")
+
+        return diff
+
+    def next_interval(self) -> float:
+        """下一次检查前的等待时间：启用自适应扫描时按发布规律计算，否则为固定间隔"""
+        delay = self.interval if self.pattern is None else self.pattern.next_delay()
+        self.current_interval = delay
+        self.poll_stats["polls"] += 1
+        self.poll_stats["fixed_polls"] += delay / self.interval
+        return delay
+
+    @property
+    def saved_requests(self) -> float:
+        """相对固定间隔扫描节省的请求数（为负表示活跃时段比固定间隔检查得更频繁）"""
+        return self.poll_stats["fixed_polls"] - self.poll_stats["polls"]
+
+    def _known_keys(self, news_list: List[Dict[str, str]]) -> Set[str]:
+        """不在上次页面上的条目中，历史上已经见过的条目标识"""
+        if self.store is None:
+            return self.seen_keys
+        candidates = [key for key in map(item_key, news_list) if key not in self.page_fingerprints]
+        if not candidates:
+            return set()
+        try:
+            return self.store.known_keys(self.url, candidates)
+        except Exception as e:
+            logger.error(f"查询状态库失败，不在上次页面上的条目均按新增处理: {str(e)}")
+            return set()
+
+    def _observe_detection(self, news_list: List[Dict[str, str]], detected_at: float,
+                           previous_page_at: Optional[float]):
+        """
+        记录新增条目的检测延迟。条目日期带时分时按该时间计算；只有日期时，发布时间取当天 0 点与
+        上一次取得页面的时间中较晚者（那时页面上还没有该条目），记录的是延迟的上界。
+        """
+        for news in news_list:
+            published, exact = publish_time(news.get('date', ''))
+            if published is None:
+                continue
+            if not exact and previous_page_at is not None:
+                published = max(published, previous_page_at)
+            if published <= detected_at:
+                metrics.DETECTION_SECONDS.labels(self.url).observe(detected_at - published)
+
+    def _remember(self, snapshot: Snapshot):
+        """记录本次快照的摘要与条目，作为下次比较的基准，并写入状态库"""
+        news_list = snapshot.items
+        self.last_digest = snapshot.digest
+        self.last_page_at = snapshot.fetched_at
+        self.page_fingerprints = {item_key(news): item_fingerprint(news) for news in news_list}
+        self.latest = news_list[0] if news_list else None
+        if self.store is None:
+            self.seen_keys.update(self.page_fingerprints)
+            return
+        try:
+            self.store.save_state(self.url, self.last_digest, self.etag, self.last_modified, news_list)
+        except Exception as e:
+            logger.error(f"写入状态库失败: {str(e)}")
+
+    def log_cycle_stats(self):
+        """输出本轮请求统计：304次数、节省字节与连接复用情况"""
+        stats = self.cycle_stats
+        connections = session_pool.connection_stats()
+        logger.info(
+            f"本轮请求统计: 请求 {stats['requests']} 次，304 {stats['not_modified']} 次，"
+            f"下载 {stats['bytes_downloaded']} 字节，节省 {stats['bytes_saved']} 字节，"
+            f"连接复用 {connections['reused']}/{connections['requests']}"
+        )
 
-        return has_update
+    @staticmethod
+    def format_news(news: Dict[str, str]) -> str:
+        """格式化单条新闻用于推送"""
+        return f"标题：{news['title']}\n日期：{news['date']}\n链接：{news['url']}"
 
     def get_latest_message(self) -> Optional[str]:
         """获取最新的一条消息"""
@@ -146,7 +442,7 @@ class WebMonitor:
         
         news = self.get_latest_news()
         if news:
-            message = f"标题：{news['title']}\n日期：{news['date']}\n链接：{news['url']}"
+            message = self.format_news(news)
             elapsed = time.time() - start_time
             logger.info(f"获取最新消息成功，耗时: {elapsed:.2f}秒")
             logger.info(f"最新消息: {news['title']} ({news['date']})")
@@ -161,12 +457,12 @@ class WebMonitor:
         start_time = time.time()
         logger.info("开始获取最新新闻")
         
-        content = self.fetch_content()
-        if not content:
+        snapshot = self.get_snapshot()
+        if not snapshot:
             logger.error("获取网页内容失败")
             return None
-        
-        news_list = self.parse_content(content)
+
+        news_list = snapshot.items
         elapsed = time.time() - start_time
         
         if news_list:
@@ -196,55 +492,49 @@ class WebMonitor:
             elapsed = time.time() - start_time
             logger.error(f"发送每日汇总消息失败，耗时: {elapsed:.2f}秒，错误: {str(e)}")
 
+    def check_once(self) -> bool:
+        """执行一次检查，只有新增条目才发送通知"""
+        start_time = time.time()
+        try:
+            diff = self.check_updates()
+        finally:
+            metrics.CHECK_SECONDS.labels(self.url).observe(time.time() - start_time)
+        if not diff.new:
+            return False
+        metrics.NEW_ITEMS.labels(self.url).inc(len(diff.new))
+        fetcher = detail.get_fetcher()
+        if fetcher is None:
+            self._notify_new(diff.new, {})
+        else:
+            # 详情页在独立线程池中抓取，完成后再发送通知，本次检查立即返回
+            fetcher.fetch_all(diff.new, lambda details: self._notify_new(diff.new, details))
+        return True
+
+    def _format_new(self, news_list: List[Dict[str, str]], details: Dict[str, Dict]) -> str:
+        parts = []
+        for news in news_list:
+            extra = detail.format_detail(details.get(news.get('url')))
+            parts.append(self.format_news(news) + ("\n" + extra if extra else ""))
+        return "\n\n".join(parts)
+
+    def _notify_new(self, news_list: List[Dict[str, str]], details: Dict[str, Dict]):
+        """发送新增条目的通知，details 为已抓取到的详情页 {链接: 详情}"""
+        send("最新消息发布通知！！", self._format_new(news_list, details))
+        logger.info(f"更新通知发送成功，新增 {len(news_list)} 条，附带详情 {len(details)} 条")
+        self._notify_subscribers(news_list, details)
+
+    def _notify_subscribers(self, news_list: List[Dict[str, str]], details: Dict[str, Dict]):
+        """把新增条目推送到关键词匹配的订阅者的渠道，每个渠道一条消息"""
+        router = subscription.get_router()
+        if router is None:
+            return
+        routes = router.route(news_list, self.url)
+        for channel, matched in routes.items():
+            send("订阅消息发布通知", self._format_new(matched, details), channels=[channel])
+        if routes:
+            logger.info(f"订阅通知已提交 {len(routes)} 个渠道")
+
     def run(self):
         """运行监控"""
-        logger.info(f"开始监控网页更新... 启动时间: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        # 启动时发送最新消息
-        if settings.SEND_STARTUP_NOTIFY:
-            logger.info("发送启动通知")
-            latest_news = self.get_latest_news()
-            if latest_news:
-                message = "监控程序启动，当前最新信息：\n\n"
-                message += f"标题：{latest_news['title']}\n"
-                message += f"日期：{latest_news['date']}\n"
-                message += f"链接：{latest_news['url']}\n"
-                send("监控程序启动通知", message)
-                logger.info("启动通知发送成功")
-            else:
-                logger.warning("未找到最新消息，跳过启动通知")
-
-        # 设置定时推送任务
-        if settings.DAILY_PUSH_ENABLED:
-            logger.info("设置定时推送任务")
-            for push_time in settings.push_times:
-                schedule.every().day.at(push_time).do(self.send_daily_summary)
-                logger.info(f"已设置每日推送时间: {push_time}")
-        
-        check_count = 0
-        while True:
-            try:
-                check_count += 1
-                current_time = datetime.now()
-                logger.info(f"第 {check_count} 次检查 - {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
-                
-                # 运行定时任务
-                schedule.run_pending()
-                
-                # 检查网站更新
-                if self.check_updates():
-                    latest_message = self.get_latest_message()
-                    if latest_message:
-                        send("最新消息发布通知！！", latest_message)
-                        logger.info("更新通知发送成功")
-                
-                # 等待下一次检查
-                logger.info(f"等待 {settings.SCAN_INTERVAL} 秒后进行下一次检查")
-                time.sleep(settings.SCAN_INTERVAL)
-                
-            except Exception as e:
-                error_msg = f"监控过程发生错误: {str(e)}"
-                logger.error(error_msg)
-                send("监控程序异常", error_msg)
-                logger.info("等待60秒后重试")
-                time.sleep(60)  # 发生错误时等待1分钟后继续 
\ No newline at end of file
+        from utils.engine import MonitorEngine
+        MonitorEngine([self]).run()
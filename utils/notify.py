@@ -4,7 +4,10 @@ import base64
 import hashlib
 import hmac
 import json
+import atexit
 import os
+import queue
+import random
 import re
 import threading
 import time
@@ -13,9 +16,18 @@ import smtplib
 from email.mime.text import MIMEText
 from email.header import Header
 from email.utils import formataddr
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 import requests
 
+from utils import metrics
+from utils.http_pool import SessionPool
+from utils.outbox import Outbox
+from utils.ratelimit import DEFAULT_RATE_LIMITS, Coalescer, TokenBucket, parse_rate_limits
+
 # 原先的 print 函数和主线程的锁
 _print = print
 mutex = threading.Lock()
@@ -30,10 +42,89 @@ def print(text, *args, **kw):
         _print(text, *args, **kw)
 
 
+class NotifyError(Exception):
+    """推送渠道发送失败"""
+
+
+class PushConfig(dict):
+    """
+    推送配置：任何修改都会递增 version，渠道注册表据此判断是否需要重建。
+    override() 在当前线程内临时覆盖部分配置项，不影响其他线程，也不改变 version。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+        self._overlay = threading.local()
+
+    @contextmanager
+    def override(self, values: Dict[str, str]):
+        """在 with 块内（仅当前线程）用 values 覆盖配置，用于以订阅者自己的配置调用推送渠道"""
+        previous = getattr(self._overlay, "values", None)
+        self._overlay.values = dict(previous or {}, **values)
+        try:
+            yield self
+        finally:
+            self._overlay.values = previous
+
+    def get(self, key, default=None):
+        values = getattr(self._overlay, "values", None)
+        if values and key in values:
+            return values[key]
+        return super().get(key, default)
+
+    def __getitem__(self, key):
+        values = getattr(self._overlay, "values", None)
+        if values and key in values:
+            return values[key]
+        return super().__getitem__(key)
+
+    def items(self):
+        values = getattr(self._overlay, "values", None)
+        if values:
+            return dict(super().items(), **values).items()
+        return super().items()
+
+    def _changed(self):
+        self.version += 1
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self._changed()
+        return super().setdefault(key, default)
+
+    def pop(self, *args):
+        self._changed()
+        return super().pop(*args)
+
+    def popitem(self):
+        self._changed()
+        return super().popitem()
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+
 # 通知服务
 # fmt: off
-push_config = {
+push_config = PushConfig({
     'HITOKOTO': True,                  # 启用一言（随机句子）
+    'HITOKOTO_URL': 'https://v1.hitokoto.cn/',  # 一言接口地址
+    'HITOKOTO_POOL_SIZE': 10,           # 后台预取的一言缓存数量
+    'HITOKOTO_TIMEOUT': 3,              # 获取一言的超时时间（秒）
 
     'BARK_PUSH': '',                    # bark IP 或设备码，例：https://api.day.app/DxHcxxxxxRxxxxxxcm/
     'BARK_ARCHIVE': '',                 # bark 推送是否存档
@@ -104,6 +195,8 @@ push_config = {
     'SMTP_EMAIL': '',                   # SMTP 收发件邮箱，通知将会由自己发给自己
     'SMTP_PASSWORD': '',                # SMTP 登录密码，也可能为特殊口令，视具体邮件服务商说明而定
     'SMTP_NAME': '',                    # SMTP 收发件人姓名，可随意填写
+    'SMTP_IDLE_TIMEOUT': 60,            # SMTP 连接空闲多久后关闭（秒）
+    'SMTP_BATCH_WINDOW': 0.1,           # 建立连接前收集邮件的等待窗口（秒），窗口内的邮件共用一次建连
 
     'PUSHME_KEY': '',                   # PushMe 的 PUSHME_KEY
     'PUSHME_URL': '',                   # PushMe 的 PUSHME_URL
@@ -121,7 +214,21 @@ push_config = {
     'NTFY_URL': '',                     # ntfy地址,如https://ntfy.sh
     'NTFY_TOPIC': '',                   # ntfy的消息应用topic
     'NTFY_PRIORITY':'3',                # 推送消息优先级,默认为3
-}
+
+    'NOTIFY_CONNECT_TIMEOUT': 5,        # 推送请求的连接超时（秒）
+    'NOTIFY_READ_TIMEOUT': 15,          # 推送请求的读取超时（秒）
+
+    'NOTIFY_WORKERS': 4,                # 通知分发器的工作线程数
+    'NOTIFY_QUEUE_SIZE': 100,           # 通知分发器的任务队列长度，队列满时 send 等待
+    'NOTIFY_SHUTDOWN_TIMEOUT': 30,      # 程序退出时等待未完成通知的最长时间（秒）
+    'NOTIFY_COALESCE_WINDOW': 1,        # 合并窗口（秒），窗口内同一渠道的多条通知合并为一条摘要，0 表示不等待
+    'NOTIFY_OUTBOX': 'data/outbox.jsonl',            # 推送失败重试队列文件，留空则不重试
+    'NOTIFY_DEAD_LETTER': 'data/dead_letter.jsonl',  # 重试次数用尽的推送写入的死信文件
+    'NOTIFY_MAX_ATTEMPTS': 5,           # 每条推送的最大尝试次数（含首次）
+    'NOTIFY_RETRY_BASE': 30,            # 首次重试的等待时间（秒），之后按指数增长并加入随机抖动
+    'NOTIFY_RETRY_MAX': 3600,           # 重试等待时间上限（秒）
+    'NOTIFY_RATE_LIMITS': '',           # 渠道限速，如 dingding_bot=20/60,gotify=5/1，覆盖内置默认值
+})
 # fmt: on
 
 for k in push_config:
@@ -129,6 +236,33 @@ for k in push_config:
         v = os.getenv(k)
         push_config[k] = v
 
+# 所有推送渠道共享的按主机连接池
+session_pool = SessionPool(pool_maxsize=int(push_config.get("NOTIFY_WORKERS") or 4))
+
+
+def _request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    通过共享连接池发送请求，未指定 timeout 时使用 NOTIFY_CONNECT_TIMEOUT/NOTIFY_READ_TIMEOUT。
+    """
+    # 字符串请求体按 UTF-8 编码后发送，否则 Content-Length 按字符数计算，
+    # 含中文时会与实际字节数不符，破坏复用的长连接
+    if isinstance(kwargs.get("data"), str):
+        kwargs["data"] = kwargs["data"].encode("utf-8")
+    if "timeout" not in kwargs:
+        kwargs["timeout"] = (
+            float(push_config.get("NOTIFY_CONNECT_TIMEOUT") or 5),
+            float(push_config.get("NOTIFY_READ_TIMEOUT") or 15),
+        )
+    return session_pool.get(url).request(method, url, **kwargs)
+
+
+def _get(url: str, **kwargs) -> requests.Response:
+    return _request("GET", url, **kwargs)
+
+
+def _post(url: str, data=None, **kwargs) -> requests.Response:
+    return _request("POST", url, data=data, **kwargs)
+
 
 def bark(title: str, content: str) -> None:
     """
@@ -165,14 +299,14 @@ def bark(title: str, content: str) -> None:
     ):
         data[bark_params.get(pair[0])] = pair[1]
     headers = {"Content-Type": "application/json;charset=utf-8"}
-    response = requests.post(
-        url=url, data=json.dumps(data), headers=headers, timeout=15
+    response = _post(
+        url=url, data=json.dumps(data), headers=headers
     ).json()
 
     if response["code"] == 200:
         print("bark 推送成功！")
     else:
-        print("bark 推送失败！")
+        raise NotifyError("bark 推送失败！")
 
 
 def console(title: str, content: str) -> None:
@@ -202,14 +336,14 @@ def dingding_bot(title: str, content: str) -> None:
     url = f'https://oapi.dingtalk.com/robot/send?access_token={push_config.get("DD_BOT_TOKEN")}&timestamp={timestamp}&sign={sign}'
     headers = {"Content-Type": "application/json;charset=utf-8"}
     data = {"msgtype": "text", "text": {"content": f"{title}\n\n{content}"}}
-    response = requests.post(
-        url=url, data=json.dumps(data), headers=headers, timeout=15
+    response = _post(
+        url=url, data=json.dumps(data), headers=headers
     ).json()
 
     if not response["errcode"]:
         print("钉钉机器人 推送成功！")
     else:
-        print("钉钉机器人 推送失败！")
+        raise NotifyError("钉钉机器人 推送失败！")
 
 
 def feishu_bot(title: str, content: str) -> None:
@@ -223,12 +357,12 @@ def feishu_bot(title: str, content: str) -> None:
 
     url = f'https://open.feishu.cn/open-apis/bot/v2/hook/{push_config.get("FSKEY")}'
     data = {"msg_type": "text", "content": {"text": f"{title}\n\n{content}"}}
-    response = requests.post(url, data=json.dumps(data)).json()
+    response = _post(url, data=json.dumps(data)).json()
 
     if response.get("StatusCode") == 0 or response.get("code") == 0:
         print("飞书 推送成功！")
     else:
-        print("飞书 推送失败！错误信息如下：\n", response)
+        raise NotifyError(f"飞书 推送失败！错误信息如下：\n{response}")
 
 
 def go_cqhttp(title: str, content: str) -> None:
@@ -241,12 +375,12 @@ def go_cqhttp(title: str, content: str) -> None:
     print("go-cqhttp 服务启动")
 
     url = f'{push_config.get("GOBOT_URL")}?access_token={push_config.get("GOBOT_TOKEN")}&{push_config.get("GOBOT_QQ")}&message=标题:{title}\n内容:{content}'
-    response = requests.get(url).json()
+    response = _get(url).json()
 
     if response["status"] == "ok":
         print("go-cqhttp 推送成功！")
     else:
-        print("go-cqhttp 推送失败！")
+        raise NotifyError("go-cqhttp 推送失败！")
 
 
 def gotify(title: str, content: str) -> None:
@@ -264,12 +398,12 @@ def gotify(title: str, content: str) -> None:
         "message": content,
         "priority": push_config.get("GOTIFY_PRIORITY"),
     }
-    response = requests.post(url, data=data).json()
+    response = _post(url, data=data).json()
 
     if response.get("id"):
         print("gotify 推送成功！")
     else:
-        print("gotify 推送失败！")
+        raise NotifyError("gotify 推送失败！")
 
 
 def iGot(title: str, content: str) -> None:
@@ -284,12 +418,12 @@ def iGot(title: str, content: str) -> None:
     url = f'https://push.hellyw.com/{push_config.get("IGOT_PUSH_KEY")}'
     data = {"title": title, "content": content}
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
-    response = requests.post(url, data=data, headers=headers).json()
+    response = _post(url, data=data, headers=headers).json()
 
     if response["ret"] == 0:
         print("iGot 推送成功！")
     else:
-        print(f'iGot 推送失败！{response["errMsg"]}')
+        raise NotifyError(f'iGot 推送失败！{response["errMsg"]}')
 
 
 def serverJ(title: str, content: str) -> None:
@@ -310,12 +444,12 @@ def serverJ(title: str, content: str) -> None:
     else:
         url = f'https://sctapi.ftqq.com/{push_config.get("PUSH_KEY")}.send'
 
-    response = requests.post(url, data=data).json()
+    response = _post(url, data=data).json()
 
     if response.get("errno") == 0 or response.get("code") == 0:
         print("serverJ 推送成功！")
     else:
-        print(f'serverJ 推送失败！错误码：{response["message"]}')
+        raise NotifyError(f'serverJ 推送失败！错误码：{response["message"]}')
 
 
 def pushdeer(title: str, content: str) -> None:
@@ -336,12 +470,12 @@ def pushdeer(title: str, content: str) -> None:
     if push_config.get("DEER_URL"):
         url = push_config.get("DEER_URL")
 
-    response = requests.post(url, data=data).json()
+    response = _post(url, data=data).json()
 
     if len(response.get("content").get("result")) > 0:
         print("PushDeer 推送成功！")
     else:
-        print("PushDeer 推送失败！错误信息：", response)
+        raise NotifyError(f"PushDeer 推送失败！错误信息：{response}")
 
 
 def chat(title: str, content: str) -> None:
@@ -354,12 +488,12 @@ def chat(title: str, content: str) -> None:
     print("chat 服务启动")
     data = "payload=" + json.dumps({"text": title + "\n" + content})
     url = push_config.get("CHAT_URL") + push_config.get("CHAT_TOKEN")
-    response = requests.post(url, data=data)
+    response = _post(url, data=data)
 
     if response.status_code == 200:
         print("Chat 推送成功！")
     else:
-        print("Chat 推送失败！错误信息：", response)
+        raise NotifyError(f"Chat 推送失败！错误信息：{response}")
 
 
 def pushplus_bot(title: str, content: str) -> None:
@@ -380,7 +514,7 @@ def pushplus_bot(title: str, content: str) -> None:
     }
     body = json.dumps(data).encode(encoding="utf-8")
     headers = {"Content-Type": "application/json"}
-    response = requests.post(url=url, data=body, headers=headers).json()
+    response = _post(url=url, data=body, headers=headers).json()
 
     if response["code"] == 200:
         print("PUSHPLUS 推送成功！")
@@ -388,13 +522,13 @@ def pushplus_bot(title: str, content: str) -> None:
     else:
         url_old = "http://pushplus.hxtrip.com/send"
         headers["Accept"] = "application/json"
-        response = requests.post(url=url_old, data=body, headers=headers).json()
+        response = _post(url=url_old, data=body, headers=headers).json()
 
         if response["code"] == 200:
             print("PUSHPLUS(hxtrip) 推送成功！")
 
         else:
-            print("PUSHPLUS 推送失败！")
+            raise NotifyError("PUSHPLUS 推送失败！")
 
 
 def weplus_bot(title: str, content: str) -> None:
@@ -421,12 +555,12 @@ def weplus_bot(title: str, content: str) -> None:
     }
     body = json.dumps(data).encode(encoding="utf-8")
     headers = {"Content-Type": "application/json"}
-    response = requests.post(url=url, data=body, headers=headers).json()
+    response = _post(url=url, data=body, headers=headers).json()
 
     if response["code"] == 200:
         print("微加机器人 推送成功！")
     else:
-        print("微加机器人 推送失败！")
+        raise NotifyError("微加机器人 推送失败！")
 
 
 def qmsg_bot(title: str, content: str) -> None:
@@ -440,12 +574,12 @@ def qmsg_bot(title: str, content: str) -> None:
 
     url = f'https://qmsg.zendee.cn/{push_config.get("QMSG_TYPE")}/{push_config.get("QMSG_KEY")}'
     payload = {"msg": f'{title}\n\n{content.replace("----", "-")}'.encode("utf-8")}
-    response = requests.post(url=url, params=payload).json()
+    response = _post(url=url, params=payload).json()
 
     if response["code"] == 0:
         print("qmsg 推送成功！")
     else:
-        print(f'qmsg 推送失败！{response["reason"]}')
+        raise NotifyError(f'qmsg 推送失败！{response["reason"]}')
 
 
 def wecom_app(title: str, content: str) -> None:
@@ -469,7 +603,7 @@ def wecom_app(title: str, content: str) -> None:
         media_id = QYWX_AM_AY[4]
     except IndexError:
         media_id = ""
-    wx = WeCom(corpid, corpsecret, agentid)
+    wx = get_wecom(corpid, corpsecret, agentid)
     # 如果没有配置 media_id 默认就以 text 方式发送
     if not media_id:
         message = title + "\n\n" + content
@@ -480,10 +614,72 @@ def wecom_app(title: str, content: str) -> None:
     if response == "ok":
         print("企业微信推送成功！")
     else:
-        print("企业微信推送失败！错误信息如下：\n", response)
+        raise NotifyError(f"企业微信推送失败！错误信息如下：\n{response}")
+
+
+class WeComTokenCache:
+    """
+    企业微信 access_token 缓存：按 (corpid, agentid) 保存，遵循 expires_in，
+    过期前由后台定时器提前刷新；同一应用的并发请求只会获取一次令牌。
+    """
+
+    # 提前刷新的时间（秒）
+    REFRESH_AHEAD = 300
+
+    def __init__(self):
+        self.entries: Dict[tuple, dict] = {}
+        self.lock = threading.Lock()
+
+    def _entry(self, key: tuple) -> dict:
+        with self.lock:
+            return self.entries.setdefault(
+                key, {"token": None, "expires_at": 0.0, "lock": threading.Lock(), "timer": None}
+            )
+
+    def get(self, wx: "WeCom", force_refresh: bool = False) -> str:
+        entry = self._entry((wx.CORPID, wx.AGENTID))
+        stale = entry["token"]
+        if not force_refresh and entry["token"] and time.time() < entry["expires_at"]:
+            return entry["token"]
+        with entry["lock"]:
+            # 等锁期间其他线程可能已刷新
+            fresh = entry["token"] and time.time() < entry["expires_at"]
+            if fresh and not (force_refresh and entry["token"] == stale):
+                return entry["token"]
+            return self._refresh(wx, entry)
+
+    def invalidate(self, wx: "WeCom"):
+        entry = self._entry((wx.CORPID, wx.AGENTID))
+        entry["expires_at"] = 0.0
+
+    def _refresh(self, wx: "WeCom", entry: dict) -> str:
+        token, expires_in = wx.fetch_access_token()
+        entry["token"] = token
+        entry["expires_at"] = time.time() + expires_in - 60
+        if entry["timer"] is not None:
+            entry["timer"].cancel()
+        timer = threading.Timer(max(expires_in - self.REFRESH_AHEAD, 60), self._background_refresh, (wx, entry))
+        timer.daemon = True
+        timer.start()
+        entry["timer"] = timer
+        return token
+
+    def _background_refresh(self, wx: "WeCom", entry: dict):
+        with entry["lock"]:
+            try:
+                self._refresh(wx, entry)
+            except Exception as e:
+                # 后台刷新失败时不影响现有令牌，下次发送时按需获取
+                print(f"企业微信 access_token 后台刷新失败：{e}")
+
+
+wecom_tokens = WeComTokenCache()
 
 
 class WeCom:
+    # access_token 无效或已过期的错误码
+    TOKEN_ERRCODES = (40014, 42001)
+
     def __init__(self, corpid, corpsecret, agentid):
         self.CORPID = corpid
         self.CORPSECRET = corpsecret
@@ -492,20 +688,36 @@ class WeCom:
         if push_config.get("QYWX_ORIGIN"):
             self.ORIGIN = push_config.get("QYWX_ORIGIN")
 
-    def get_access_token(self):
+    def fetch_access_token(self):
+        """向企业微信请求新的 access_token，返回 (token, expires_in)"""
         url = f"{self.ORIGIN}/cgi-bin/gettoken"
         values = {
             "corpid": self.CORPID,
             "corpsecret": self.CORPSECRET,
         }
-        req = requests.post(url, params=values)
+        req = _post(url, params=values)
         data = json.loads(req.text)
-        return data["access_token"]
+        if "access_token" not in data:
+            raise RuntimeError(f"获取企业微信 access_token 失败：{data}")
+        return data["access_token"], int(data.get("expires_in") or 7200)
+
+    def get_access_token(self, force_refresh=False):
+        return wecom_tokens.get(self, force_refresh)
+
+    def _send_message(self, send_values):
+        send_msges = bytes(json.dumps(send_values), "utf-8")
+        respone = None
+        for attempt in range(2):
+            send_url = (
+                f"{self.ORIGIN}/cgi-bin/message/send?access_token={self.get_access_token(attempt > 0)}"
+            )
+            respone = _post(send_url, send_msges).json()
+            # 令牌失效时强制刷新并重试一次
+            if respone.get("errcode") not in self.TOKEN_ERRCODES:
+                break
+        return respone["errmsg"]
 
     def send_text(self, message, touser="@all"):
-        send_url = (
-            f"{self.ORIGIN}/cgi-bin/message/send?access_token={self.get_access_token()}"
-        )
         send_values = {
             "touser": touser,
             "msgtype": "text",
@@ -513,15 +725,9 @@ class WeCom:
             "text": {"content": message},
             "safe": "0",
         }
-        send_msges = bytes(json.dumps(send_values), "utf-8")
-        respone = requests.post(send_url, send_msges)
-        respone = respone.json()
-        return respone["errmsg"]
+        return self._send_message(send_values)
 
     def send_mpnews(self, title, message, media_id, touser="@all"):
-        send_url = (
-            f"{self.ORIGIN}/cgi-bin/message/send?access_token={self.get_access_token()}"
-        )
         send_values = {
             "touser": touser,
             "msgtype": "mpnews",
@@ -539,10 +745,19 @@ class WeCom:
                 ]
             },
         }
-        send_msges = bytes(json.dumps(send_values), "utf-8")
-        respone = requests.post(send_url, send_msges)
-        respone = respone.json()
-        return respone["errmsg"]
+        return self._send_message(send_values)
+
+
+_wecom_clients: Dict[tuple, WeCom] = {}
+
+
+def get_wecom(corpid, corpsecret, agentid) -> WeCom:
+    """按应用配置复用 WeCom 实例"""
+    key = (corpid, corpsecret, agentid, push_config.get("QYWX_ORIGIN"))
+    wx = _wecom_clients.get(key)
+    if wx is None:
+        wx = _wecom_clients.setdefault(key, WeCom(corpid, corpsecret, agentid))
+    return wx
 
 
 def wecom_bot(title: str, content: str) -> None:
@@ -561,14 +776,14 @@ def wecom_bot(title: str, content: str) -> None:
     url = f"{origin}/cgi-bin/webhook/send?key={push_config.get('QYWX_KEY')}"
     headers = {"Content-Type": "application/json;charset=utf-8"}
     data = {"msgtype": "text", "text": {"content": f"{title}\n\n{content}"}}
-    response = requests.post(
-        url=url, data=json.dumps(data), headers=headers, timeout=15
+    response = _post(
+        url=url, data=json.dumps(data), headers=headers
     ).json()
 
     if response["errcode"] == 0:
         print("企业微信机器人推送成功！")
     else:
-        print("企业微信机器人推送失败！")
+        raise NotifyError("企业微信机器人推送失败！")
 
 
 def telegram_bot(title: str, content: str) -> None:
@@ -594,17 +809,12 @@ def telegram_bot(title: str, content: str) -> None:
     }
     proxies = None
     if push_config.get("TG_PROXY_HOST") and push_config.get("TG_PROXY_PORT"):
-        if push_config.get("TG_PROXY_AUTH") is not None and "@" not in push_config.get(
-            "TG_PROXY_HOST"
-        ):
-            push_config["TG_PROXY_HOST"] = (
-                push_config.get("TG_PROXY_AUTH")
-                + "@"
-                + push_config.get("TG_PROXY_HOST")
-            )
-        proxyStr = "http://{}:{}".format(
-            push_config.get("TG_PROXY_HOST"), push_config.get("TG_PROXY_PORT")
-        )
+        # 带认证信息的代理地址只在本次请求中使用，不写回 push_config：
+        # 写回会修改全局配置的版本，订阅者的临时配置也会借此泄漏到全局配置中
+        proxy_host = push_config.get("TG_PROXY_HOST")
+        if push_config.get("TG_PROXY_AUTH") is not None and "@" not in proxy_host:
+            proxy_host = push_config.get("TG_PROXY_AUTH") + "@" + proxy_host
+        proxyStr = "http://{}:{}".format(proxy_host, push_config.get("TG_PROXY_PORT"))
         proxies = {"http": proxyStr, "https": proxyStr}
     
     # 打印调试信息
@@ -614,7 +824,7 @@ def telegram_bot(title: str, content: str) -> None:
         print(f"使用代理: {proxies}")
 
     try:
-        response = requests.post(
+        response = _post(
             url=url, headers=headers, params=payload, proxies=proxies
         )
         
@@ -627,12 +837,12 @@ def telegram_bot(title: str, content: str) -> None:
         if response_json["ok"]:
             print("tg 推送成功！")
         else:
-            print("tg 推送失败！", response_json.get("description", "无详细信息"))
+            raise NotifyError(f'tg 推送失败！{response_json.get("description", "无详细信息")}')
     except requests.exceptions.JSONDecodeError as e:
         print("响应不是有效的 JSON 格式。可能是请求失败或服务器返回了非 JSON 格式的内容。")
-        print(f"错误信息: {str(e)}")
-    except Exception as e:
-        print(f"请求过程中发生异常: {str(e)}")
+        raise NotifyError(f"tg 推送失败！错误信息: {str(e)}")
+    except requests.exceptions.RequestException as e:
+        raise NotifyError(f"tg 推送失败！请求过程中发生异常: {str(e)}")
 
 
 def aibotk(title: str, content: str) -> None:
@@ -666,12 +876,12 @@ def aibotk(title: str, content: str) -> None:
         }
     body = json.dumps(data).encode(encoding="utf-8")
     headers = {"Content-Type": "application/json"}
-    response = requests.post(url=url, data=body, headers=headers).json()
+    response = _post(url=url, data=body, headers=headers).json()
     print(response)
     if response["code"] == 0:
         print("智能微秘书 推送成功！")
     else:
-        print(f'智能微秘书 推送失败！{response["error"]}')
+        raise NotifyError(f'智能微秘书 推送失败！{response["error"]}')
 
 
 def smtp(title: str, content: str) -> None:
@@ -707,23 +917,167 @@ def smtp(title: str, content: str) -> None:
     message["Subject"] = Header(title, "utf-8")
 
     try:
-        smtp_server = (
-            smtplib.SMTP_SSL(push_config.get("SMTP_SERVER"))
-            if push_config.get("SMTP_SSL") == "true"
-            else smtplib.SMTP(push_config.get("SMTP_SERVER"))
-        )
-        smtp_server.login(
-            push_config.get("SMTP_EMAIL"), push_config.get("SMTP_PASSWORD")
-        )
-        smtp_server.sendmail(
-            push_config.get("SMTP_EMAIL"),
-            push_config.get("SMTP_EMAIL"),
-            message.as_bytes(),
-        )
-        smtp_server.close()
+        get_smtp_session().deliver(message)
         print("SMTP 邮件 推送成功！")
     except Exception as e:
-        print(f"SMTP 邮件 推送失败！{e}")
+        raise NotifyError(f"SMTP 邮件 推送失败！{e}")
+
+
+class SmtpSession:
+    """
+    复用的 SMTP 连接：需要时建立并登录，由后台线程串行发送，
+    建连前批处理窗口内排队的邮件共用一次连接，空闲超过 idle_timeout 后关闭连接，后台线程随之退出，
+    有新邮件时再启动。
+    """
+
+    # 超过该空闲时间（秒）再次使用连接前先 NOOP 检查
+    HEALTH_CHECK_AFTER = 5
+
+    def __init__(self, server: str, use_ssl: bool, email: str, password: str,
+                 idle_timeout: float = 60, batch_window: float = 0.1, timeout: float = 15):
+        self.server = server
+        self.use_ssl = use_ssl
+        self.email = email
+        self.password = password
+        self.idle_timeout = idle_timeout
+        self.batch_window = batch_window
+        # 每次网络操作（建连、登录、发送）的超时，服务器无响应时不会永久占用发送线程
+        self.timeout = timeout
+        self.conn: Optional[smtplib.SMTP] = None
+        self.last_used = 0.0
+        self.jobs = queue.Queue()
+        self.stats = {"messages": 0, "batches": 0, "connections": 0}
+        # 发送线程，空闲退出后为 None
+        self.thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+
+    @property
+    def idle(self) -> bool:
+        """发送线程已因空闲退出（连接已关闭）"""
+        return self.thread is None
+
+    def send(self, message: MIMEText) -> Future:
+        future = Future()
+        with self.lock:
+            self.jobs.put((future, message))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._worker, name="smtp", daemon=True)
+                self.thread.start()
+        return future
+
+    def deliver(self, message: MIMEText, timeout: Optional[float] = None):
+        """
+        发送并等待结果。默认最多等待一次完整投递（建连、登录、发送及重连重试）所需的超时之和，
+        超时后仍在排队的邮件不再发送，调用方（通知分发器的工作线程）不会被卡住的服务器一直占用。
+        """
+        future = self.send(message)
+        timeout = self.timeout * 6 + self.batch_window if timeout is None else timeout
+        try:
+            future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"SMTP 服务器 {timeout:.0f} 秒内未完成发送")
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.use_ssl:
+            conn = smtplib.SMTP_SSL(self.server, timeout=self.timeout)
+        else:
+            conn = smtplib.SMTP(self.server, timeout=self.timeout)
+        conn.login(self.email, self.password)
+        self.stats["connections"] += 1
+        return conn
+
+    def _connection(self) -> smtplib.SMTP:
+        if self.conn is not None and time.time() - self.last_used > self.HEALTH_CHECK_AFTER:
+            try:
+                if self.conn.noop()[0] != 250:
+                    self._close()
+            except (smtplib.SMTPException, OSError):
+                self._close()
+        if self.conn is None:
+            self.conn = self._connect()
+        return self.conn
+
+    def _close(self):
+        if self.conn is None:
+            return
+        try:
+            self.conn.quit()
+        except (smtplib.SMTPException, OSError):
+            self.conn.close()
+        self.conn = None
+
+    def _deliver(self, message: MIMEText):
+        # 连接被服务器断开时重连并重试一次
+        for attempt in range(2):
+            try:
+                self._connection().sendmail(self.email, self.email, message.as_bytes())
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                if self.conn is not None:
+                    self.conn.close()
+                    self.conn = None
+                if attempt:
+                    raise
+            finally:
+                self.last_used = time.time()
+
+    def _worker(self):
+        while True:
+            try:
+                batch = [self.jobs.get(timeout=self.idle_timeout)]
+            except queue.Empty:
+                self._close()
+                with self.lock:
+                    if self.jobs.empty():
+                        self.thread = None
+                        return
+                continue
+            # 连接未建立时在窗口内收集邮件，一次建连后连续发出；连接可用时只带上已排队的邮件
+            deadline = time.time() + (self.batch_window if self.conn is None else 0)
+            while True:
+                try:
+                    batch.append(self.jobs.get(timeout=max(deadline - time.time(), 0)))
+                except queue.Empty:
+                    break
+            self.stats["batches"] += 1
+            for future, message in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    self._deliver(message)
+                    self.stats["messages"] += 1
+                    future.set_result(None)
+                except BaseException as e:
+                    future.set_exception(e)
+
+
+# 按 (服务器, 是否 SSL, 邮箱, 密码) 区分的会话：订阅者可以用自己的 SMTP 配置，
+# 与全局配置交替发送时各自复用自己的连接，不会每次切换都重新登录
+_smtp_sessions: Dict[Tuple[str, bool, str, str], SmtpSession] = {}
+_smtp_lock = threading.Lock()
+
+
+def get_smtp_session() -> SmtpSession:
+    """获取当前 SMTP 配置对应的复用会话，没有时新建；其他配置已空闲的会话一并移除"""
+    key = (
+        push_config.get("SMTP_SERVER"),
+        push_config.get("SMTP_SSL") == "true",
+        push_config.get("SMTP_EMAIL"),
+        push_config.get("SMTP_PASSWORD"),
+    )
+    with _smtp_lock:
+        for other in [k for k, s in _smtp_sessions.items() if k != key and s.idle]:
+            del _smtp_sessions[other]
+        session = _smtp_sessions.get(key)
+        if session is None:
+            session = _smtp_sessions[key] = SmtpSession(
+                *key,
+                idle_timeout=float(push_config.get("SMTP_IDLE_TIMEOUT") or 60),
+                batch_window=float(push_config.get("SMTP_BATCH_WINDOW") or 0),
+                timeout=float(push_config.get("NOTIFY_READ_TIMEOUT") or 15),
+            )
+    return session
 
 
 def pushme(title: str, content: str) -> None:
@@ -747,12 +1101,12 @@ def pushme(title: str, content: str) -> None:
         "date": push_config.get("date") if push_config.get("date") else "",
         "type": push_config.get("type") if push_config.get("type") else "",
     }
-    response = requests.post(url, data=data)
+    response = _post(url, data=data)
 
     if response.status_code == 200 and response.text == "success":
         print("PushMe 推送成功！")
     else:
-        print(f"PushMe 推送失败！{response.status_code} {response.text}")
+        raise NotifyError(f"PushMe 推送失败！{response.status_code} {response.text}")
 
 
 def chronocat(title: str, content: str) -> None:
@@ -778,6 +1132,7 @@ def chronocat(title: str, content: str) -> None:
         "Authorization": f'Bearer {push_config.get("CHRONOCAT_TOKEN")}',
     }
 
+    failed = []
     for chat_type, ids in [(1, user_ids), (2, group_ids)]:
         if not ids:
             continue
@@ -791,7 +1146,7 @@ def chronocat(title: str, content: str) -> None:
                     }
                 ],
             }
-            response = requests.post(url, headers=headers, data=json.dumps(data))
+            response = _post(url, headers=headers, data=json.dumps(data))
             if response.status_code == 200:
                 if chat_type == 1:
                     print(f"QQ个人消息:{ids}推送成功！")
@@ -799,9 +1154,11 @@ def chronocat(title: str, content: str) -> None:
                     print(f"QQ群消息:{ids}推送成功！")
             else:
                 if chat_type == 1:
-                    print(f"QQ个人消息:{ids}推送失败！")
+                    failed.append(f"QQ个人消息:{ids}推送失败！")
                 else:
-                    print(f"QQ群消息:{ids}推送失败！")
+                    failed.append(f"QQ群消息:{ids}推送失败！")
+    if failed:
+        raise NotifyError("\n".join(failed))
 
 
 def ntfy(title: str, content: str) -> None:
@@ -834,11 +1191,11 @@ def ntfy(title: str, content: str) -> None:
     }
     
     url = push_config.get("NTFY_URL") + "/" + push_config.get("NTFY_TOPIC")
-    response = requests.post(url, data=data, headers=headers)
+    response = _post(url, data=data, headers=headers)
     if response.status_code == 200:  # 使用 response.status_code 进行检查
         print("Ntfy 推送成功！")
     else:
-        print("Ntfy 推送失败！错误信息：", response.text)
+        raise NotifyError(f"Ntfy 推送失败！错误信息：{response.text}")
 
 def parse_headers(headers):
     if not headers:
@@ -922,14 +1279,14 @@ def custom_notify(title: str, content: str) -> None:
     formatted_url = WEBHOOK_URL.replace(
         "$title", urllib.parse.quote_plus(title)
     ).replace("$content", urllib.parse.quote_plus(content))
-    response = requests.request(
-        method=WEBHOOK_METHOD, url=formatted_url, headers=headers, timeout=15, data=body
+    response = _request(
+        method=WEBHOOK_METHOD, url=formatted_url, headers=headers, data=body
     )
 
     if response.status_code == 200:
         print("自定义通知推送成功！")
     else:
-        print(f"自定义通知推送失败！{response.status_code} {response.text}")
+        raise NotifyError(f"自定义通知推送失败！{response.status_code} {response.text}")
 
 
 def one() -> str:
@@ -937,109 +1294,554 @@ def one() -> str:
     获取一条一言。
     :return:
     """
-    url = "https://v1.hitokoto.cn/"
-    res = requests.get(url).json()
+    url = push_config.get("HITOKOTO_URL") or "https://v1.hitokoto.cn/"
+    timeout = float(push_config.get("HITOKOTO_TIMEOUT") or 3)
+    res = _get(url, timeout=timeout).json()
     return res["hitokoto"] + "    ----" + res["from"]
 
 
+# 一言接口不可用且缓存耗尽时使用的本地句子
+HITOKOTO_FALLBACK = (
+    "路漫漫其修远兮，吾将上下而求索。    ----离骚",
+    "不积跬步，无以至千里；不积小流，无以成江海。    ----劝学",
+    "业精于勤，荒于嬉；行成于思，毁于随。    ----进学解",
+    "纸上得来终觉浅，绝知此事要躬行。    ----冬夜读书示子聿",
+    "博学之，审问之，慎思之，明辨之，笃行之。    ----礼记",
+)
+
+
+class HitokotoPool:
+    """
+    一言缓存池：后台线程预取并补充，get 只从缓存取出，不发起网络请求。
+    """
+
+    def __init__(self, size: int, fetch: Callable[[], str] = one):
+        self.size = max(size, 1)
+        self.fetch = fetch
+        self.quotes = deque(maxlen=self.size)
+        self.wakeup = threading.Event()
+        self.failures = 0
+        self.thread = threading.Thread(target=self._refill, name="hitokoto", daemon=True)
+        self.thread.start()
+        self.wakeup.set()
+
+    def get(self) -> str:
+        """取出一条一言，缓存为空时返回本地句子；低于一半时唤醒后台补充"""
+        try:
+            quote = self.quotes.popleft()
+        except IndexError:
+            quote = random.choice(HITOKOTO_FALLBACK)
+        if len(self.quotes) <= self.size // 2:
+            self.wakeup.set()
+        return quote
+
+    def _refill(self):
+        while True:
+            self.wakeup.wait()
+            self.wakeup.clear()
+            while len(self.quotes) < self.size:
+                try:
+                    self.quotes.append(self.fetch())
+                    self.failures = 0
+                except Exception as e:
+                    # 接口异常时退避，避免持续请求不可用的服务
+                    self.failures += 1
+                    print(f"一言获取失败：{e}")
+                    time.sleep(min(2 ** self.failures, 300))
+                    break
+
+
+_hitokoto_pool: Optional[HitokotoPool] = None
+_hitokoto_lock = threading.Lock()
+
+
+def get_hitokoto_pool() -> HitokotoPool:
+    """获取全局一言缓存池，首次使用时创建并开始预取"""
+    global _hitokoto_pool
+    if _hitokoto_pool is None:
+        with _hitokoto_lock:
+            if _hitokoto_pool is None:
+                _hitokoto_pool = HitokotoPool(int(push_config.get("HITOKOTO_POOL_SIZE") or 10))
+    return _hitokoto_pool
+
+
+def hitokoto_enabled() -> bool:
+    return get_registry().hitokoto
+
+
+class ChannelRegistry:
+    """
+    由当前配置计算出的推送快照：启用的渠道、跳过的标题、是否附加一言。
+    配置或注册的渠道变化后才重建，send 只需遍历预先计算好的渠道元组。
+    """
+
+    __slots__ = ("channels", "skip_titles", "hitokoto", "config", "version")
+
+    def __init__(self, config: PushConfig, version: int):
+        self.config = config
+        self.version = version
+        self.channels: Tuple[Callable[[str, str], None], ...] = tuple(
+            func for func, enabled in _channel_specs.values() if enabled(config)
+        )
+        # 根据标题跳过一些消息推送，环境变量：SKIP_PUSH_TITLE 用回车分隔
+        self.skip_titles = frozenset(t for t in re.split("\n", os.getenv("SKIP_PUSH_TITLE") or "") if t)
+        self.hitokoto = config.get("HITOKOTO") != "false"
+        if not self.channels:
+            print(f"无推送渠道，请检查通知变量是否正确")
+
+    def is_stale(self) -> bool:
+        return self.config is not push_config or self.version != push_config.version + _channel_version
+
+
+# 渠道名 -> (推送函数, 是否启用的判断)，按注册顺序推送
+_channel_specs: Dict[str, Tuple[Callable[[str, str], None], Callable[[dict], bool]]] = {}
+_channel_version = 0
+_registry: Optional[ChannelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def register_channel(func: Callable[[str, str], None], *required_keys: str,
+                     enabled: Optional[Callable[[dict], bool]] = None) -> Callable[[str, str], None]:
+    """
+    注册推送渠道：required_keys 对应的配置全部非空时启用，也可以传入 enabled(push_config) 自定义判断。
+    同名渠道会被替换，返回 func 本身。
+    """
+    global _channel_version
+    if enabled is None:
+        enabled = lambda config: all(config.get(key) for key in required_keys)
+    with _registry_lock:
+        _channel_specs[func.__name__] = (func, enabled)
+        _channel_version += 1
+    return func
+
+
+def unregister_channel(name: str) -> None:
+    global _channel_version
+    with _registry_lock:
+        if _channel_specs.pop(name, None) is not None:
+            _channel_version += 1
+
+
+def reload_channels() -> ChannelRegistry:
+    """立即按当前配置和环境变量重建渠道注册表"""
+    global _registry
+    with _registry_lock:
+        _registry = ChannelRegistry(push_config, push_config.version + _channel_version)
+    return _registry
+
+
+def get_registry() -> ChannelRegistry:
+    registry = _registry
+    if registry is None or registry.is_stale():
+        registry = reload_channels()
+    return registry
+
+
 def add_notify_function():
-    notify_function = []
-    if push_config.get("BARK_PUSH"):
-        notify_function.append(bark)
-    if push_config.get("CONSOLE"):
-        notify_function.append(console)
-    if push_config.get("DD_BOT_TOKEN") and push_config.get("DD_BOT_SECRET"):
-        notify_function.append(dingding_bot)
-    if push_config.get("FSKEY"):
-        notify_function.append(feishu_bot)
-    if push_config.get("GOBOT_URL") and push_config.get("GOBOT_QQ"):
-        notify_function.append(go_cqhttp)
-    if push_config.get("GOTIFY_URL") and push_config.get("GOTIFY_TOKEN"):
-        notify_function.append(gotify)
-    if push_config.get("IGOT_PUSH_KEY"):
-        notify_function.append(iGot)
-    if push_config.get("PUSH_KEY"):
-        notify_function.append(serverJ)
-    if push_config.get("DEER_KEY"):
-        notify_function.append(pushdeer)
-    if push_config.get("CHAT_URL") and push_config.get("CHAT_TOKEN"):
-        notify_function.append(chat)
-    if push_config.get("PUSH_PLUS_TOKEN"):
-        notify_function.append(pushplus_bot)
-    if push_config.get("WE_PLUS_BOT_TOKEN"):
-        notify_function.append(weplus_bot)
-    if push_config.get("QMSG_KEY") and push_config.get("QMSG_TYPE"):
-        notify_function.append(qmsg_bot)
-    if push_config.get("QYWX_AM"):
-        notify_function.append(wecom_app)
-    if push_config.get("QYWX_KEY"):
-        notify_function.append(wecom_bot)
-    if push_config.get("TG_BOT_TOKEN") and push_config.get("TG_USER_ID"):
-        notify_function.append(telegram_bot)
-    if (
-        push_config.get("AIBOTK_KEY")
-        and push_config.get("AIBOTK_TYPE")
-        and push_config.get("AIBOTK_NAME")
-    ):
-        notify_function.append(aibotk)
-    if (
-        push_config.get("SMTP_SERVER")
-        and push_config.get("SMTP_SSL")
-        and push_config.get("SMTP_EMAIL")
-        and push_config.get("SMTP_PASSWORD")
-        and push_config.get("SMTP_NAME")
-    ):
-        notify_function.append(smtp)
-    if push_config.get("PUSHME_KEY"):
-        notify_function.append(pushme)
-    if (
-        push_config.get("CHRONOCAT_URL")
-        and push_config.get("CHRONOCAT_QQ")
-        and push_config.get("CHRONOCAT_TOKEN")
-    ):
-        notify_function.append(chronocat)
-    if push_config.get("WEBHOOK_URL") and push_config.get("WEBHOOK_METHOD"):
-        notify_function.append(custom_notify)
-    if push_config.get("NTFY_TOPIC"):
-        notify_function.append(ntfy)
-    if not notify_function:
-        print(f"无推送渠道，请检查通知变量是否正确")
-    return notify_function
+    return list(get_registry().channels)
+
+
+# 订阅者渠道名（渠道@订阅者）-> 推送函数，重试队列据此找回订阅者的渠道
+_subscriber_channels: Dict[str, Callable[[str, str], None]] = {}
+
 
+def _subscriber_channel(name: str) -> Optional[Callable[[str, str], None]]:
+    """按 "渠道@订阅者" 查找订阅者的渠道；重试队列可能早于订阅路由重放，找不到时先加载订阅文件"""
+    if "@" not in name:
+        return None
+    if name not in _subscriber_channels:
+        from utils import subscription
+        subscription.get_router()
+    return _subscriber_channels.get(name)
 
-def send(title: str, content: str, ignore_default_config: bool = False, **kwargs):
+
+def subscriber_channel(channel: str, name: str, config: Optional[Dict[str, str]] = None) -> Callable[[str, str], None]:
+    """
+    以订阅者自己的配置（如自己的 NTFY_TOPIC、QYWX_KEY）调用已注册的推送渠道，config 为空时使用全局配置。
+    返回的函数名为 "渠道@订阅者"，合并、统计和重试按订阅者区分，限速沿用该渠道的限速规则。
+    """
+    spec = _channel_specs.get(channel)
+    if spec is None:
+        raise ValueError(f"未知的推送渠道: {channel}")
+    func, config = spec[0], {key: str(value) for key, value in (config or {}).items()}
+
+    def deliver(title: str, content: str) -> None:
+        with push_config.override(config):
+            return func(title, content)
+
+    deliver.__name__ = f"{channel}@{name}"
+    _subscriber_channels[deliver.__name__] = deliver
+    return deliver
+
+
+register_channel(bark, "BARK_PUSH")
+register_channel(console, "CONSOLE")
+register_channel(dingding_bot, "DD_BOT_TOKEN", "DD_BOT_SECRET")
+register_channel(feishu_bot, "FSKEY")
+register_channel(go_cqhttp, "GOBOT_URL", "GOBOT_QQ")
+register_channel(gotify, "GOTIFY_URL", "GOTIFY_TOKEN")
+register_channel(iGot, "IGOT_PUSH_KEY")
+register_channel(serverJ, "PUSH_KEY")
+register_channel(pushdeer, "DEER_KEY")
+register_channel(chat, "CHAT_URL", "CHAT_TOKEN")
+register_channel(pushplus_bot, "PUSH_PLUS_TOKEN")
+register_channel(weplus_bot, "WE_PLUS_BOT_TOKEN")
+register_channel(qmsg_bot, "QMSG_KEY", "QMSG_TYPE")
+register_channel(wecom_app, "QYWX_AM")
+register_channel(wecom_bot, "QYWX_KEY")
+register_channel(telegram_bot, "TG_BOT_TOKEN", "TG_USER_ID")
+register_channel(aibotk, "AIBOTK_KEY", "AIBOTK_TYPE", "AIBOTK_NAME")
+register_channel(smtp, "SMTP_SERVER", "SMTP_SSL", "SMTP_EMAIL", "SMTP_PASSWORD", "SMTP_NAME")
+register_channel(pushme, "PUSHME_KEY")
+register_channel(chronocat, "CHRONOCAT_URL", "CHRONOCAT_QQ", "CHRONOCAT_TOKEN")
+register_channel(custom_notify, "WEBHOOK_URL", "WEBHOOK_METHOD")
+register_channel(ntfy, "NTFY_TOPIC")
+
+
+class NotifyHandle:
+    """
+    一次 send 调用的句柄，持有各推送渠道的 Future。
+    """
+
+    def __init__(self, futures: Optional[Dict[str, Future]] = None):
+        self.futures = futures or {}
+
+    def done(self) -> bool:
+        return all(f.done() for f in self.futures.values())
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待所有渠道推送结束，返回是否全部完成"""
+        if not self.futures:
+            return True
+        _, not_done = wait(self.futures.values(), timeout=timeout)
+        return not not_done
+
+    def errors(self) -> Dict[str, BaseException]:
+        """已完成但抛出异常的渠道"""
+        return {
+            name: f.exception()
+            for name, f in self.futures.items()
+            if f.done() and not f.cancelled() and f.exception() is not None
+        }
+
+
+def merge_notifications(items: List[tuple]) -> Tuple[str, str]:
+    """
+    把同一渠道积压的多条通知 (future, title, content, footer) 合并为一条摘要，返回 (title, content)。
+    """
+    if len(items) == 1:
+        _, title, content, footer = items[0]
+        return title, content + footer
+    title = f"{items[0][1]} 等 {len(items)} 条通知"
+    content = "\n\n".join(f"【{title}】\n{content}" for _, title, content, _ in items)
+    return title, content + items[-1][3]
+
+
+class NotifyDispatcher:
+    """
+    常驻的通知分发器：有界任务队列 + 固定数量的工作线程，代替每次推送为每个渠道新建线程。
+    """
+
+    _STOP = object()
+
+    def __init__(self, workers: int, queue_size: int, coalesce_window: float = 0.0,
+                 rate_limits: Optional[Dict[str, Tuple[int, float]]] = None):
+        self.jobs = queue.Queue(maxsize=queue_size)
+        self.coalesce_window = coalesce_window
+        self.rate_limits = rate_limits or {}
+        self.lanes: Dict[str, Coalescer] = {}
+        # 各合并队列发出时使用的推送函数：订阅文件重新加载后同名的订阅者渠道换成新配置的函数，
+        # 合并队列按名称取最新的函数，不沿用创建时的
+        self.lane_funcs: Dict[str, Callable[[str, str], None]] = {}
+        # 推送失败时的回调 (渠道名, 标题, 内容, 异常)，用于写入重试队列
+        self.failure_hook: Optional[Callable[[str, str, str, BaseException], None]] = None
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self.stats_lock = threading.Lock()
+        self.threads = [
+            threading.Thread(target=self._worker, name=f"notify-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self.threads:
+            t.start()
+
+    def submit(self, func: Callable[[str, str], None], title: str, content: str, footer: str = "") -> Future:
+        """
+        提交一个推送任务。需要合并或限速的渠道先进入该渠道的合并队列，
+        否则直接进入任务队列，队列满时等待空位。footer 附加在（合并后的）消息末尾。
+        """
+        future = Future()
+        item = (future, title, content, footer)
+        lane = self._lane(func)
+        if lane is None:
+            self._put(func, [item])
+        else:
+            lane.add(item)
+        return future
+
+    def _lane(self, func: Callable[[str, str], None]) -> Optional[Coalescer]:
+        name = func.__name__
+        self.lane_funcs[name] = func
+        lane = self.lanes.get(name)
+        if lane is None:
+            # 订阅者的渠道（渠道@订阅者）沿用该渠道的限速规则
+            limit = self.rate_limits.get(name) or self.rate_limits.get(name.partition("@")[0])
+            if self.coalesce_window <= 0 and not limit:
+                return None
+            with self.stats_lock:
+                lane = self.lanes.get(name)
+                if lane is None:
+                    lane = Coalescer(
+                        lambda items, name=name: self._put(self.lane_funcs[name], items),
+                        self.coalesce_window,
+                        TokenBucket.per(*limit) if limit else None,
+                    )
+                    self.lanes[name] = lane
+        return lane
+
+    def _put(self, func: Callable[[str, str], None], items: List[tuple]):
+        title, content = merge_notifications(items)
+        self.jobs.put(([item[0] for item in items], func, title, content, True))
+
+    def submit_retry(self, func: Callable[[str, str], None], title: str, content: str) -> Future:
+        """重新提交一条失败的推送：跳过合并与限速，失败时不再触发 failure_hook"""
+        future = Future()
+        self.jobs.put(([future], func, title, content, False))
+        return future
+
+    def _worker(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                if job is self._STOP:
+                    return
+                futures, func, title, content, record_failure = job
+                futures = [f for f in futures if f.set_running_or_notify_cancel()]
+                if not futures:
+                    continue
+                start = time.perf_counter()
+                try:
+                    result = func(title, content)
+                    self._record(func.__name__, time.perf_counter() - start, True)
+                    for future in futures:
+                        future.set_result(result)
+                except BaseException as e:
+                    self._record(func.__name__, time.perf_counter() - start, False)
+                    print(f"{func.__name__} 推送异常：{e}")
+                    if record_failure and self.failure_hook is not None:
+                        try:
+                            self.failure_hook(func.__name__, title, content, e)
+                        except Exception as hook_error:
+                            print(f"{func.__name__} 写入重试队列失败：{hook_error}")
+                    for future in futures:
+                        future.set_exception(e)
+            finally:
+                self.jobs.task_done()
+
+    def _record(self, channel: str, elapsed: float, ok: bool):
+        with self.stats_lock:
+            stats = self.stats.setdefault(
+                channel, {"count": 0, "failures": 0, "total_latency": 0.0, "max_latency": 0.0}
+            )
+            stats["count"] += 1
+            stats["failures"] += 0 if ok else 1
+            stats["total_latency"] += elapsed
+            stats["max_latency"] = max(stats["max_latency"], elapsed)
+        metrics.NOTIFY_SECONDS.labels(channel).observe(elapsed)
+        metrics.NOTIFY_RESULTS.labels(channel, "success" if ok else "failure").inc()
+
+    def shutdown(self, timeout: Optional[float] = None):
+        """发出各渠道积压的消息后停止工作线程，最多等待 timeout 秒让队列中的任务完成"""
+        for lane in list(self.lanes.values()):
+            lane.drain()
+        deadline = None if timeout is None else time.time() + timeout
+        for _ in self.threads:
+            try:
+                self.jobs.put(self._STOP, timeout=timeout)
+            except queue.Full:
+                break
+        for t in self.threads:
+            t.join(None if deadline is None else max(deadline - time.time(), 0))
+
+
+_dispatcher: Optional[NotifyDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> NotifyDispatcher:
+    """获取全局通知分发器，首次使用时创建"""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                rate_limits = dict(DEFAULT_RATE_LIMITS)
+                rate_limits.update(parse_rate_limits(push_config.get("NOTIFY_RATE_LIMITS")))
+                _dispatcher = NotifyDispatcher(
+                    int(push_config.get("NOTIFY_WORKERS") or 4),
+                    int(push_config.get("NOTIFY_QUEUE_SIZE") or 100),
+                    float(push_config.get("NOTIFY_COALESCE_WINDOW") or 0),
+                    rate_limits,
+                )
+                _attach_outbox(_dispatcher)
+                atexit.register(shutdown_dispatcher)
+    return _dispatcher
+
+
+_outbox: Optional[Outbox] = None
+
+
+def _attach_outbox(dispatcher: NotifyDispatcher):
+    """为分发器接入重试队列：失败的推送写入 outbox，到期后经分发器重新提交"""
+    global _outbox
+    path = push_config.get("NOTIFY_OUTBOX")
+    if not path:
+        return
+    _outbox = Outbox(
+        path,
+        push_config.get("NOTIFY_DEAD_LETTER") or "data/dead_letter.jsonl",
+        max_attempts=int(push_config.get("NOTIFY_MAX_ATTEMPTS") or 5),
+        base_delay=float(push_config.get("NOTIFY_RETRY_BASE") or 30),
+        max_delay=float(push_config.get("NOTIFY_RETRY_MAX") or 3600),
+        on_dead=lambda entry: print(
+            f"{entry['channel']} 推送「{entry['title']}」重试 {entry['attempts']} 次仍失败，已移入死信文件"
+        ),
+    )
+    dispatcher.failure_hook = lambda channel, title, content, error: _outbox.add(
+        channel, title, content, str(error)
+    )
+
+    def resend(entry: dict) -> Future:
+        functions = {func.__name__: func for func in add_notify_function()}
+        func = functions.get(entry["channel"]) or _subscriber_channel(entry["channel"])
+        if func is None:
+            raise NotifyError(f"{entry['channel']} 渠道未配置")
+        return dispatcher.submit_retry(func, entry["title"], entry["content"])
+
+    _outbox.start(resend)
+
+
+def shutdown_dispatcher():
+    """程序退出时等待未完成的通知"""
+    global _dispatcher
+    with _dispatcher_lock:
+        dispatcher, _dispatcher = _dispatcher, None
+    if dispatcher is not None:
+        dispatcher.shutdown(float(push_config.get("NOTIFY_SHUTDOWN_TIMEOUT") or 30))
+    if _outbox is not None:
+        _outbox.close()
+
+
+def channel_stats() -> Dict[str, Dict]:
+    """
+    各推送渠道的调用次数、失败次数与延迟，各渠道合并队列的积压情况，以及各主机的连接复用情况。
+    """
+    channels, backpressure, queue_depth = {}, {}, 0
+    if _dispatcher is not None:
+        with _dispatcher.stats_lock:
+            for name, stats in _dispatcher.stats.items():
+                channels[name] = dict(stats, avg_latency=stats["total_latency"] / stats["count"])
+            for name, lane in _dispatcher.lanes.items():
+                backpressure[name] = dict(lane.stats)
+        queue_depth = _dispatcher.jobs.qsize()
+    return {
+        "channels": channels,
+        "backpressure": backpressure,
+        "queue_depth": queue_depth,
+        "outbox": _outbox.stats() if _outbox is not None else {},
+        "connections": session_pool.stats_by_host(),
+    }
+
+
+def _collect_metrics():
+    """采集时读取推送队列长度、各渠道合并队列积压、重试队列长度与各主机的连接复用情况"""
+    dispatcher = _dispatcher
+    if dispatcher is not None:
+        yield "notify_queue_depth", "gauge", "等待推送的任务数", {(): dispatcher.jobs.qsize()}, ()
+        with dispatcher.stats_lock:
+            lanes = {name: dict(lane.stats) for name, lane in dispatcher.lanes.items()}
+        for key, kind, help in (
+            ("pending", "gauge", "各渠道合并队列中等待发出的消息数"),
+            ("max_pending", "gauge", "各渠道合并队列的最大积压消息数"),
+            ("max_delay", "gauge", "各渠道消息从提交到发出的最长等待（秒）"),
+            ("submitted", "counter", "各渠道合并队列收到的消息数"),
+            ("flushed", "counter", "各渠道合并队列发出的推送数"),
+            ("merged", "counter", "各渠道合并到其他消息中发出的消息数"),
+            ("throttled", "counter", "各渠道因限速推迟发出的次数"),
+        ):
+            name = f"notify_coalesce_{key}_total" if kind == "counter" else f"notify_coalesce_{key}"
+            yield name, kind, help, {(channel,): stats[key] for channel, stats in lanes.items()}, ("channel",)
+    if _outbox is not None:
+        stats = _outbox.stats()
+        yield "notify_outbox_pending", "gauge", "重试队列中待重试的推送数", {(): stats["pending"]}, ()
+        yield "notify_outbox_inflight", "gauge", "重试队列中正在重试的推送数", {(): stats["inflight"]}, ()
+    connections = session_pool.stats_by_host()
+    yield ("notify_http_requests_total", "counter", "各主机的推送请求数",
+           {(host,): s["requests"] for host, s in connections.items()}, ("host",))
+    yield ("notify_http_connections_total", "counter", "各主机新建的连接数",
+           {(host,): s["connections"] for host, s in connections.items()}, ("host",))
+
+
+metrics.registry.add_collector(_collect_metrics)
+
+
+def report_channel_stats() -> None:
+    """
+    输出各推送渠道的延迟、积压与连接复用统计。
+    """
+    stats = channel_stats()
+    for name, s in stats["channels"].items():
+        print(
+            f"{name}: 推送 {s['count']} 次，失败 {s['failures']} 次，"
+            f"平均耗时 {s['avg_latency'] * 1000:.1f}ms，最大耗时 {s['max_latency'] * 1000:.1f}ms"
+        )
+    for name, s in stats["backpressure"].items():
+        print(
+            f"{name}: 收到 {s['submitted']} 条，发出 {s['flushed']} 条，合并 {s['merged']} 条，"
+            f"限速推迟 {s['throttled']} 次，积压 {s['pending']} 条（最多 {s['max_pending']} 条），"
+            f"最长等待 {s['max_delay']:.1f}s"
+        )
+    print(f"任务队列长度：{stats['queue_depth']}")
+    if stats["outbox"]:
+        print(f"重试队列：待重试 {stats['outbox']['pending']} 条，重试中 {stats['outbox']['inflight']} 条")
+    for host, s in stats["connections"].items():
+        print(f"{host}: 请求 {s['requests']} 次，新建连接 {s['connections']} 个，复用 {s['reused']} 次")
+
+
+def send(title: str, content: str, ignore_default_config: bool = False, block: bool = False,
+         channels: Optional[Sequence[Callable[[str, str], None]]] = None, **kwargs) -> NotifyHandle:
+    """
+    推送消息到所有已配置的渠道，立即返回 NotifyHandle；block=True 时等待所有渠道完成（旧的阻塞行为）。
+    channels 指定时只推送到这些渠道（如 subscriber_channel 返回的订阅者渠道）。
+    """
     if kwargs:
         global push_config
         if ignore_default_config:
-            push_config = kwargs  # 清空从环境变量获取的配置
+            push_config = PushConfig(kwargs)  # 清空从环境变量获取的配置
         else:
             push_config.update(kwargs)
 
     if not content:
         print(f"{title} 推送内容为空！")
-        return
+        return NotifyHandle()
 
-    # 根据标题跳过一些消息推送，环境变量：SKIP_PUSH_TITLE 用回车分隔
-    skipTitle = os.getenv("SKIP_PUSH_TITLE")
-    if skipTitle:
-        if title in re.split("\n", skipTitle):
-            print(f"{title} 在SKIP_PUSH_TITLE环境变量内，跳过推送！")
-            return
+    registry = get_registry()
+    if title in registry.skip_titles:
+        print(f"{title} 在SKIP_PUSH_TITLE环境变量内，跳过推送！")
+        return NotifyHandle()
 
-    hitokoto = push_config.get("HITOKOTO")
-    content += "\n\n" + one() if hitokoto != "false" else ""
+    footer = "\n\n" + get_hitokoto_pool().get() if registry.hitokoto else ""
 
-    notify_function = add_notify_function()
-    ts = [
-        threading.Thread(target=mode, args=(title, content), name=mode.__name__)
-        for mode in notify_function
-    ]
-    [t.start() for t in ts]
-    [t.join() for t in ts]
+    dispatcher = get_dispatcher()
+    handle = NotifyHandle({
+        mode.__name__: dispatcher.submit(mode, title, content, footer)
+        for mode in (registry.channels if channels is None else channels)
+    })
+    if block:
+        handle.wait()
+    return handle
 
 
 def main():
-    send("title", "content")
+    send("title", "content", block=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+
+class Outbox:
+    """
+    推送失败重试队列：失败的渠道推送追加写入 JSONL 文件（只追加，启动时重放并压缩），
+    后台线程按带抖动的指数退避重新提交，超过最大次数后移入死信文件。
+
+    resend(entry) 负责重新提交推送并返回 Future，由调用方接入通知分发器，
+    因此重试在分发器的工作线程中执行，不会阻塞监控循环。
+    """
+
+    def __init__(self, path: Path, dead_letter_path: Path, max_attempts: int = 5,
+                 base_delay: float = 30, max_delay: float = 3600,
+                 on_dead: Optional[Callable[[dict], None]] = None):
+        self.path = Path(path)
+        self.dead_letter_path = Path(dead_letter_path)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.on_dead = on_dead
+        self.pending: Dict[str, dict] = {}
+        self.inflight = set()
+        self.resend: Optional[Callable[[dict], Future]] = None
+        self.cond = threading.Condition()
+        self.records = 0
+        self.thread: Optional[threading.Thread] = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._load()
+        self.file = open(self.path, "a", encoding="utf-8")
+
+    def _load(self):
+        """重放日志恢复待重试的条目，并把文件压缩为只包含这些条目"""
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # 进程崩溃时可能留下写了一半的行
+                        continue
+                    if record.get("op") == "done":
+                        self.pending.pop(record["id"], None)
+                    else:
+                        self.pending[record["id"]] = record["entry"]
+        self._compact()
+
+    def _compact(self):
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in self.pending.values():
+                f.write(json.dumps({"op": "put", "id": entry["id"], "entry": entry}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.records = len(self.pending)
+
+    def _append(self, record: dict):
+        if self.file.closed:
+            # 已关闭（程序退出中），未落盘的状态在下次启动时按原记录重试
+            return
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.records += 1
+        # 已完成的记录过多时重写文件
+        if self.records > 2 * len(self.pending) + 1000:
+            self.file.close()
+            self._compact()
+            self.file = open(self.path, "a", encoding="utf-8")
+
+    def backoff(self, attempts: int) -> float:
+        """第 attempts 次失败后的等待时间：指数增长，取 [delay/2, delay] 之间的随机值"""
+        delay = min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+        return random.uniform(delay / 2, delay)
+
+    def add(self, channel: str, title: str, content: str, error: str) -> dict:
+        """记录一次失败的推送，安排重试"""
+        entry = {
+            "id": uuid.uuid4().hex,
+            "channel": channel,
+            "title": title,
+            "content": content,
+            "attempts": 1,
+            "created_at": time.time(),
+            "next_at": time.time() + self.backoff(1),
+            "error": error,
+        }
+        with self.cond:
+            self.pending[entry["id"]] = entry
+            self._append({"op": "put", "id": entry["id"], "entry": entry})
+            self.cond.notify()
+        return entry
+
+    def start(self, resend: Callable[[dict], Future]):
+        """启动后台重试线程"""
+        self.resend = resend
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="outbox", daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                now = time.time()
+                due = [e for e in self.pending.values() if e["id"] not in self.inflight and e["next_at"] <= now]
+                if not due:
+                    waiting = [e["next_at"] for e in self.pending.values() if e["id"] not in self.inflight]
+                    self.cond.wait(min(waiting) - now if waiting else None)
+                    continue
+                for entry in due:
+                    self.inflight.add(entry["id"])
+            for entry in due:
+                try:
+                    future = self.resend(entry)
+                except Exception as e:
+                    future = Future()
+                    future.set_exception(e)
+                future.add_done_callback(lambda f, e=entry: self._on_result(e, f))
+
+    def _on_result(self, entry: dict, future: Future):
+        error = future.exception()
+        with self.cond:
+            self.inflight.discard(entry["id"])
+            if error is None:
+                self.pending.pop(entry["id"], None)
+                self._append({"op": "done", "id": entry["id"]})
+            elif entry["attempts"] + 1 >= self.max_attempts:
+                entry = dict(entry, attempts=entry["attempts"] + 1, error=str(error), dead_at=time.time())
+                self.pending.pop(entry["id"], None)
+                with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self._append({"op": "done", "id": entry["id"]})
+                if self.on_dead is not None:
+                    self.on_dead(entry)
+            else:
+                attempts = entry["attempts"] + 1
+                entry.update(attempts=attempts, error=str(error), next_at=time.time() + self.backoff(attempts))
+                self._append({"op": "put", "id": entry["id"], "entry": entry})
+            self.cond.notify()
+
+    def stats(self) -> Dict[str, int]:
+        with self.cond:
+            return {"pending": len(self.pending), "inflight": len(self.inflight)}
+
+    def close(self):
+        with self.cond:
+            self.file.close()
@@ -0,0 +1,131 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 各推送渠道的默认限速：渠道名 -> (条数, 秒)
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[int, float]] = {
+    "dingding_bot": (20, 60),   # 钉钉机器人每分钟最多 20 条
+    "wecom_bot": (20, 60),      # 企业微信机器人每分钟最多 20 条
+    "telegram_bot": (20, 60),   # Telegram 同一群组每分钟最多 20 条
+    "feishu_bot": (100, 60),    # 飞书机器人每分钟最多 100 条
+}
+
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[int, float]]:
+    """
+    解析限速配置，格式为 "渠道=条数/秒数"，多个渠道用逗号分隔，例如 "dingding_bot=20/60,gotify=5/1"
+    """
+    limits = {}
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            name, rule = part.split("=", 1)
+            count, seconds = rule.split("/", 1)
+            limits[name.strip()] = (int(count), float(seconds))
+        except ValueError:
+            raise ValueError(f"无效的限速配置: {part}，应为 渠道=条数/秒数")
+    return limits
+
+
+class TokenBucket:
+    """令牌桶：容量为 capacity，每秒补充 rate 个令牌"""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def per(cls, count: int, seconds: float, **kwargs) -> "TokenBucket":
+        """每 seconds 秒最多 count 次"""
+        return cls(count / seconds, count, **kwargs)
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """尝试取出令牌；成功返回 0，否则返回需要等待的秒数"""
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+
+class Coalescer:
+    """
+    合并窗口：首条消息到达后等待 window 秒收集后续消息，再整体交给 flush；
+    配置了令牌桶时，没有令牌则继续积压，直到有令牌后合并发出。
+    """
+
+    def __init__(self, flush: Callable[[List], None], window: float = 0.0,
+                 bucket: Optional[TokenBucket] = None, max_batch: int = 50):
+        self.flush = flush
+        self.window = window
+        self.bucket = bucket
+        self.max_batch = max_batch
+        self.pending: List[Tuple[float, object]] = []
+        self.timer: Optional[threading.Timer] = None
+        self.lock = threading.Lock()
+        self.stats = {
+            "submitted": 0,     # 收到的消息数
+            "flushed": 0,       # 实际发出的（合并后）消息数
+            "merged": 0,        # 被合并掉的消息数
+            "throttled": 0,     # 因无令牌而推迟的次数
+            "pending": 0,       # 当前积压的消息数
+            "max_pending": 0,   # 最大积压
+            "max_delay": 0.0,   # 消息从提交到发出的最长等待（秒）
+        }
+
+    def add(self, item) -> None:
+        with self.lock:
+            self.pending.append((time.monotonic(), item))
+            self.stats["submitted"] += 1
+            self.stats["pending"] = len(self.pending)
+            self.stats["max_pending"] = max(self.stats["max_pending"], len(self.pending))
+            if self.timer is None:
+                self._schedule(self.window)
+
+    def _schedule(self, delay: float):
+        self.timer = threading.Timer(delay, self._fire)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def _fire(self):
+        with self.lock:
+            self.timer = None
+            if not self.pending:
+                return
+            wait = self.bucket.try_acquire() if self.bucket else 0.0
+            if wait > 0:
+                self.stats["throttled"] += 1
+                self._schedule(wait)
+                return
+            batch = self._take(self.max_batch)
+            if self.pending:
+                self._schedule(0)
+        self.flush(batch)
+
+    def drain(self):
+        """立即发出全部积压消息，不再等待窗口和令牌（程序退出时使用）"""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            batch = self._take(len(self.pending))
+        if batch:
+            self.flush(batch)
+
+    def _take(self, count: int) -> List:
+        batch, self.pending = self.pending[:count], self.pending[count:]
+        if batch:
+            self.stats["flushed"] += 1
+            self.stats["merged"] += len(batch) - 1
+            self.stats["max_delay"] = max(self.stats["max_delay"], time.monotonic() - batch[0][0])
+        self.stats["pending"] = len(self.pending)
+        return [item for _, item in batch]
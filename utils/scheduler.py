@@ -0,0 +1,146 @@
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from utils.logger import logger
+
+
+class Job:
+    """一个定时任务；interval 不为空时周期执行，daily 不为空时每天在该时间执行"""
+
+    __slots__ = ("when", "seq", "func", "name", "interval", "daily", "cancelled")
+
+    def __init__(self, when: float, seq: int, func: Callable[[], None], name: str,
+                 interval: Optional[float] = None, daily: Optional[str] = None):
+        self.when = when
+        self.seq = seq
+        self.func = func
+        self.name = name
+        self.interval = interval
+        self.daily = daily
+        self.cancelled = False
+
+    def __lt__(self, other: "Job") -> bool:
+        return (self.when, self.seq) < (other.when, other.seq)
+
+
+def next_daily(at: str, now: float) -> float:
+    """下一个本地时间 HH:MM（或 HH:MM:SS）的时间戳，严格晚于 now"""
+    parts = [int(p) for p in at.split(":")]
+    hour, minute, second = (parts + [0, 0])[:3]
+    current = datetime.fromtimestamp(now)
+    target = current.replace(hour=hour, minute=minute, second=second, microsecond=0)
+    if target.timestamp() <= now:
+        target += timedelta(days=1)
+    return target.timestamp()
+
+
+class Scheduler:
+    """
+    基于最小堆的定时器：run 只在最近一个任务到期时醒来（新增更早的任务会立即唤醒），
+    扫描和定时推送各自作为独立任务调度。
+
+    clock 和 sleep 可注入，便于用假时钟验证调度精度：传入 sleep 时由它推进时间，
+    不再在条件变量上等待。
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time,
+                 sleep: Optional[Callable[[float], None]] = None,
+                 on_error: Optional[Callable[[Job, Exception], None]] = None):
+        self.clock = clock
+        self.sleep = sleep
+        self.on_error = on_error
+        self.heap: List[Job] = []
+        self.seq = itertools.count()
+        self.cond = threading.Condition()
+        self.stopped = False
+
+    def _push(self, job: Job) -> Job:
+        with self.cond:
+            heapq.heappush(self.heap, job)
+            if self.heap[0] is job:
+                self.cond.notify()
+        return job
+
+    def call_at(self, when: float, func: Callable[[], None], name: str = "") -> Job:
+        return self._push(Job(when, next(self.seq), func, name or func.__name__))
+
+    def call_later(self, delay: float, func: Callable[[], None], name: str = "") -> Job:
+        return self.call_at(self.clock() + delay, func, name)
+
+    def every(self, interval: float, func: Callable[[], None], name: str = "",
+              first: Optional[float] = None) -> Job:
+        """每 interval 秒执行一次，首次在 first 秒后（默认一个周期后）"""
+        when = self.clock() + (interval if first is None else first)
+        return self._push(Job(when, next(self.seq), func, name or func.__name__, interval=interval))
+
+    def daily(self, at: str, func: Callable[[], None], name: str = "") -> Job:
+        """每天在本地时间 at（HH:MM）执行"""
+        when = next_daily(at, self.clock())
+        return self._push(Job(when, next(self.seq), func, name or func.__name__, daily=at))
+
+    def cancel(self, job: Job):
+        # 堆中的任务只做标记，出堆时丢弃
+        job.cancelled = True
+
+    def next_due(self) -> Optional[float]:
+        with self.cond:
+            while self.heap and self.heap[0].cancelled:
+                heapq.heappop(self.heap)
+            return self.heap[0].when if self.heap else None
+
+    def run_pending(self) -> int:
+        """执行所有已到期的任务，返回执行的任务数"""
+        executed = 0
+        while True:
+            with self.cond:
+                if not self.heap or self.heap[0].when > self.clock():
+                    return executed
+                job = heapq.heappop(self.heap)
+                if job.cancelled:
+                    continue
+            try:
+                job.func()
+            except Exception as e:
+                if self.on_error is None:
+                    logger.error(f"定时任务 {job.name} 执行失败: {e}")
+                else:
+                    self.on_error(job, e)
+            executed += 1
+            # 周期任务按计划时间顺延，不因执行耗时而累积漂移
+            if job.cancelled:
+                continue
+            if job.interval is not None:
+                job.when = max(job.when + job.interval, self.clock())
+            elif job.daily is not None:
+                job.when = next_daily(job.daily, max(job.when, self.clock()))
+            else:
+                continue
+            job.seq = next(self.seq)
+            self._push(job)
+
+    def run(self):
+        """循环执行任务，直到 stop 被调用"""
+        while not self.stopped:
+            due = self.next_due()
+            delay = None if due is None else due - self.clock()
+            if delay is not None and delay <= 0:
+                self.run_pending()
+                continue
+            if self.sleep is not None:
+                if delay is None:
+                    return
+                self.sleep(delay)
+                continue
+            with self.cond:
+                # 等待期间加入了更早的任务时会被唤醒
+                if not self.stopped and (not self.heap or self.heap[0].when == due):
+                    self.cond.wait(delay)
+
+    def stop(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify()
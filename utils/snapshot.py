@@ -0,0 +1,54 @@
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+News = Dict[str, str]
+
+
+class Snapshot:
+    """一次抓取得到的页面快照：原始内容、内容摘要，以及首次访问时才解析的条目列表
+
+    同一快照在缓存有效期内由更新检查、最新消息、启动通知和每日汇总共享，避免重复抓取和解析。
+    解析完成后即释放原始内容，只保留摘要和条目。
+    """
+
+    __slots__ = ('content', 'digest', 'fetched_at', '_parser', '_items', '_lock')
+
+    def __init__(self, content: Optional[str], parser: Optional[Callable[[str], List[News]]] = None,
+                 digest: Optional[str] = None, items: Optional[List[News]] = None):
+        self.content = content
+        self.digest = digest or hashlib.sha1(content.encode('utf-8')).hexdigest()
+        self.fetched_at = time.time()
+        self._parser = parser
+        self._items = items
+        self._lock = threading.Lock()
+
+    @classmethod
+    def restored(cls, digest: str, items: List[News]) -> 'Snapshot':
+        """由摘要和已知条目重建快照（服务器返回 304 而本地没有快照时使用，没有原始内容）"""
+        return cls(None, digest=digest, items=items)
+
+    @property
+    def items(self) -> List[News]:
+        """解析后的条目列表，只解析一次"""
+        if self._items is None:
+            with self._lock:
+                if self._items is None:
+                    self._items = self._parser(self.content)
+                    self.content = None
+        return self._items
+
+    @property
+    def latest(self) -> Optional[News]:
+        """最新的一条条目"""
+        items = self.items
+        return items[0] if items else None
+
+    def age(self) -> float:
+        """距离抓取（或最近一次 304 确认）的秒数"""
+        return time.time() - self.fetched_at
+
+    def touch(self):
+        """服务器确认内容未修改（304）时刷新抓取时间，保留已解析的条目"""
+        self.fetched_at = time.time()
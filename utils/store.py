@@ -0,0 +1,392 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.diff import item_fingerprint, item_key
+from utils.logger import logger
+
+News = Dict[str, str]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_items (
+    target TEXT NOT NULL,
+    key TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    date TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    PRIMARY KEY (target, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS target_state (
+    target TEXT PRIMARY KEY,
+    digest TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    page_keys TEXT NOT NULL DEFAULT '[]',
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS backfill_blocks (
+    target TEXT NOT NULL,
+    per_page INTEGER NOT NULL,
+    block INTEGER NOT NULL,
+    PRIMARY KEY (target, per_page, block)
+) WITHOUT ROWID;
+"""
+
+# 全文索引：notice_ids 为每个条目分配整数编号，notice_fts 以该编号为 rowid 保存切分后的标题。
+# 编号为 日期(YYYYMMDD) * 1000000 + 当天序号，按编号倒序即按日期从新到旧，
+# 查询时 FTS5 按 rowid 倒序流式返回，取够条数即停止，日期范围转换为 rowid 范围。
+# 触发器只用纯 SQL 把新写入或标题、日期有变化的条目记入 notice_pending，其他程序直接写库也不会出错；
+# 编号和标题由 StateStore 在写入已见条目的同一事务中批量写入（FTS5 在触发器中逐条写入时每条都会落盘，慢数倍）
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notice_ids (
+    id INTEGER PRIMARY KEY,
+    target TEXT NOT NULL,
+    key TEXT NOT NULL,
+    UNIQUE (target, key)
+);
+
+CREATE TABLE IF NOT EXISTS notice_pending (
+    target TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (target, key)
+);
+
+CREATE INDEX IF NOT EXISTS seen_items_date ON seen_items (date);
+
+DROP TRIGGER IF EXISTS seen_items_index;
+CREATE TRIGGER seen_items_index AFTER INSERT ON seen_items BEGIN
+    INSERT OR IGNORE INTO notice_pending (target, key) VALUES (new.target, new.key);
+END;
+
+DROP TRIGGER IF EXISTS seen_items_reindex;
+CREATE TRIGGER seen_items_reindex AFTER UPDATE OF title, date ON seen_items BEGIN
+    DELETE FROM notice_fts WHERE rowid = (SELECT id FROM notice_ids WHERE target = old.target AND key = old.key);
+    DELETE FROM notice_ids WHERE target = old.target AND key = old.key;
+    INSERT OR IGNORE INTO notice_pending (target, key) VALUES (new.target, new.key);
+END;
+"""
+
+# SQLite 单条语句可绑定的参数数量有限，批量查询时分块
+_CHUNK = 500
+
+_DATE_RE = re.compile(r'\s*(\d{4})\D(\d{1,2})\D(\d{1,2})')
+# 中日韩文字没有空格分词，按单字切分后用短语查询实现任意长度的子串匹配；
+# 用 str.translate 在每个字符两侧加空格，比正则替换快一个数量级
+_CJK_SPACED = {
+    code: f" {chr(code)} "
+    for start, end in ((0x3040, 0x3100), (0x3400, 0x4DC0), (0x4E00, 0xA000), (0xF900, 0xFB00))
+    for code in range(start, end)
+}
+
+
+def segment(text: Optional[str]) -> str:
+    """在每个中日韩字符两侧加空格，其余文字按 FTS5 默认规则分词"""
+    return (text or '').translate(_CJK_SPACED)
+
+
+def date_key(date: Optional[str]) -> int:
+    """条目日期对应的索引编号起点，无法识别的日期排在最后"""
+    match = _DATE_RE.match(date or '')
+    if match is None:
+        return 0
+    year, month, day = map(int, match.groups())
+    return (year * 10000 + month * 100 + day) * 1000000
+
+
+def match_query(keywords: str) -> str:
+    """把空格分隔的关键词转换为 FTS5 查询：每个关键词为一个短语，多个关键词同时满足"""
+    phrases = []
+    for word in keywords.split():
+        tokens = segment(word).split()
+        if tokens:
+            phrases.append('"' + " ".join(tokens).replace('"', '""') + '"')
+    return " AND ".join(phrases)
+
+
+class StateStore:
+    """基于 SQLite（WAL 模式）的监控状态存储，保存已见条目、页面摘要与缓存校验信息
+
+    启动时只读取目标状态和上次页面上的条目，判断条目是否见过时按主键查询，
+    因此已存条目数量再多也不影响启动速度。
+    """
+
+    def __init__(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._create_index()
+        self._conn.commit()
+
+    def _create_index(self):
+        """
+        创建全文索引，并补建旧版本的状态库或其他程序写入的条目的索引；
+        SQLite 未编译 FTS5 时不建索引（fts 为 False），搜索改为逐条匹配标题。
+        """
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'notice_fts'"
+        ).fetchone()
+        try:
+            self._conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS notice_fts USING fts5(title)")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite 不支持 FTS5，不建立全文索引，搜索将逐条匹配标题: {str(e)}")
+            # 在支持 FTS5 的环境中创建过索引的状态库：更新条目时的触发器会访问 notice_fts，在此无法执行
+            self._conn.execute("DROP TRIGGER IF EXISTS seen_items_reindex")
+            self.fts = False
+            return
+        self.fts = True
+        self._conn.executescript(INDEX_SCHEMA)
+        with self._conn:
+            if not exists:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO notice_pending (target, key) "
+                    "SELECT target, key FROM seen_items ORDER BY first_seen"
+                )
+            self._index_pending()
+
+    def _index_pending(self):
+        """
+        为待索引条目分配编号并把标题写入全文索引，须在写入已见条目的事务中调用。
+        同一天的条目按写入顺序编号，接在当天已有的最大编号之后。
+        """
+        if not self.fts:
+            return
+        rows = self._conn.execute(
+            "SELECT p.target, p.key, s.title, s.date FROM notice_pending p "
+            "JOIN seen_items s ON s.target = p.target AND s.key = p.key ORDER BY p.rowid"
+        ).fetchall()
+        if not rows:
+            return
+        next_ids: Dict[int, int] = {}
+        ids, titles = [], []
+        for target, key, title, date in sorted(rows, key=lambda row: date_key(row[3])):
+            day = date_key(date)
+            id = next_ids.get(day)
+            if id is None:
+                id = self._conn.execute(
+                    "SELECT IFNULL(MAX(id) + 1, ?) FROM notice_ids WHERE id BETWEEN ? AND ?",
+                    (day, day, day + 999999),
+                ).fetchone()[0]
+            next_ids[day] = id + 1
+            ids.append((id, target, key))
+            titles.append((id, segment(title)))
+        self._conn.executemany("INSERT INTO notice_ids (id, target, key) VALUES (?, ?, ?)", ids)
+        self._conn.executemany("INSERT INTO notice_fts (rowid, title) VALUES (?, ?)", titles)
+        self._conn.execute("DELETE FROM notice_pending")
+
+    def load_state(self, target: str) -> Optional[Dict]:
+        """读取目标的上次状态：摘要、校验信息、上次页面条目指纹（按页面顺序）、最新一条条目和保存时间"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest, etag, last_modified, page_keys, updated_at FROM target_state WHERE target = ?",
+                (target,),
+            ).fetchone()
+            if row is None:
+                return None
+            digest, etag, last_modified, page_keys, updated_at = row
+            keys = json.loads(page_keys)
+            fingerprints = {}
+            for i in range(0, len(keys), _CHUNK):
+                chunk = keys[i:i + _CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                fingerprints.update(self._conn.execute(
+                    f"SELECT key, fingerprint FROM seen_items WHERE target = ? AND key IN ({placeholders})",
+                    [target, *chunk],
+                ))
+        page_fingerprints = {key: fingerprints[key] for key in keys if key in fingerprints}
+        latest = self.get_items(target, keys[:1]).get(keys[0]) if keys else None
+        return {
+            "digest": digest,
+            "etag": etag,
+            "last_modified": last_modified,
+            "page_fingerprints": page_fingerprints,
+            "latest": latest,
+            "updated_at": updated_at,
+        }
+
+    def save_state(self, target: str, digest: Optional[str], etag: Optional[str],
+                   last_modified: Optional[str], news_list: List[News]):
+        """保存目标当前状态，并把页面上的条目写入已见条目表"""
+        now = time.time()
+        rows = [
+            (target, item_key(news), item_fingerprint(news), news.get('title', ''), news.get('url', ''),
+             news.get('date', ''), now)
+            for news in news_list
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO seen_items (target, key, fingerprint, title, url, date, first_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (target, key) DO UPDATE SET fingerprint = excluded.fingerprint, "
+                "title = excluded.title, url = excluded.url, date = excluded.date "
+                "WHERE fingerprint != excluded.fingerprint",
+                rows,
+            )
+            self._index_pending()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO target_state (target, digest, etag, last_modified, page_keys, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (target, digest, etag, last_modified, json.dumps([row[1] for row in rows]), now),
+            )
+
+    def known_keys(self, target: str, keys: Iterable[str]) -> Set[str]:
+        """返回 keys 中已经见过的条目标识"""
+        keys = list(keys)
+        known = set()
+        with self._lock:
+            for i in range(0, len(keys), _CHUNK):
+                chunk = keys[i:i + _CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                known.update(row[0] for row in self._conn.execute(
+                    f"SELECT key FROM seen_items WHERE target = ? AND key IN ({placeholders})",
+                    [target, *chunk],
+                ))
+        return known
+
+    def get_items(self, target: str, keys: List[str]) -> Dict[str, News]:
+        """按标识读取已见条目"""
+        items = {}
+        with self._lock:
+            for i in range(0, len(keys), _CHUNK):
+                chunk = keys[i:i + _CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                for key, title, url, date in self._conn.execute(
+                    f"SELECT key, title, url, date FROM seen_items WHERE target = ? AND key IN ({placeholders})",
+                    [target, *chunk],
+                ):
+                    items[key] = {'title': title, 'url': url, 'date': date}
+        return items
+
+    def publish_history(self, target: str, limit: int = 1000) -> List[Tuple[str, float]]:
+        """最近见到的条目的 (日期, 首次发现时间)，按发现时间从早到晚排列"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date, first_seen FROM seen_items WHERE target = ? ORDER BY first_seen DESC LIMIT ?",
+                (target, limit),
+            ).fetchall()
+        return rows[::-1]
+
+    def add_items(self, target: str, news_list: Iterable[News]):
+        """批量写入已见条目（已存在的忽略），用于导入历史数据"""
+        now = time.time()
+        rows = [
+            (target, item_key(news), item_fingerprint(news), news.get('title', ''), news.get('url', ''),
+             news.get('date', ''), now)
+            for news in news_list
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen_items (target, key, fingerprint, title, url, date, first_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._index_pending()
+
+    def save_backfill_block(self, target: str, per_page: int, block: int, news_list: Iterable[News]):
+        """写入回填抓取到的一页条目，并在同一事务中记录该页已完成，中断后据此续抓"""
+        now = time.time()
+        rows = [
+            (target, item_key(news), item_fingerprint(news), news.get('title', ''), news.get('url', ''),
+             news.get('date', ''), now)
+            for news in news_list
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen_items (target, key, fingerprint, title, url, date, first_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._index_pending()
+            if block >= 0:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO backfill_blocks (target, per_page, block) VALUES (?, ?, ?)",
+                    (target, per_page, block),
+                )
+
+    def backfill_blocks(self, target: str, per_page: int) -> Set[int]:
+        """已完成回填的页（按从最早一条开始计数的分页编号）"""
+        with self._lock:
+            return {row[0] for row in self._conn.execute(
+                "SELECT block FROM backfill_blocks WHERE target = ? AND per_page = ?", (target, per_page)
+            )}
+
+    def page_keys(self, target: str) -> Set[str]:
+        """上次检查时页面上的条目标识"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT page_keys FROM target_state WHERE target = ?", (target,)
+            ).fetchone()
+        return set(json.loads(row[0])) if row else set()
+
+    def search(self, keywords: str = "", since: Optional[str] = None, until: Optional[str] = None,
+               target: Optional[str] = None, limit: int = 50) -> List[News]:
+        """
+        按关键词（空格分隔，需同时包含）和日期范围（YYYY-MM-DD，含两端）查找已见条目，按日期从新到旧排列。
+        """
+        query = match_query(keywords)
+        if not query:
+            return self._search_by_date(since, until, target, limit)
+        if not self.fts:
+            return self._search_by_date(since, until, target, limit, keywords.split())
+        sql = ("SELECT s.target, s.title, s.url, s.date FROM notice_fts f "
+               "JOIN notice_ids i ON i.id = f.rowid "
+               "JOIN seen_items s ON s.target = i.target AND s.key = i.key "
+               "WHERE notice_fts MATCH ?")
+        params: list = [query]
+        if since:
+            sql += " AND f.rowid >= ?"
+            params.append(date_key(since))
+        if until:
+            sql += " AND f.rowid < ?"
+            params.append(date_key(until) + 1000000)
+        if target:
+            sql += " AND i.target = ?"
+            params.append(target)
+        sql += " ORDER BY f.rowid DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{'target': target, 'title': title, 'url': url, 'date': date} for target, title, url, date in rows]
+
+    def _search_by_date(self, since: Optional[str], until: Optional[str], target: Optional[str],
+                        limit: int, words: Iterable[str] = ()) -> List[News]:
+        """不经全文索引按日期倒序查找；words 非空时逐条检查标题是否包含全部关键词"""
+        sql = "SELECT target, title, url, date FROM seen_items WHERE 1"
+        params: list = []
+        for condition, value in (("date >= ?", since), ("date <= ?", until), ("target = ?", target)):
+            if value:
+                sql += " AND " + condition
+                params.append(value)
+        for word in words:
+            sql += " AND title LIKE ? ESCAPE '\\'"
+            params.append("%" + re.sub(r"([\\%_])", r"\\\1", word) + "%")
+        sql += " ORDER BY date DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{'target': target, 'title': title, 'url': url, 'date': date} for target, title, url, date in rows]
+
+    def count_items(self, target: Optional[str] = None) -> int:
+        """已见条目数量"""
+        with self._lock:
+            if target is None:
+                return self._conn.execute("SELECT COUNT(*) FROM seen_items").fetchone()[0]
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM seen_items WHERE target = ?", (target,)
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,217 @@
+import json
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from utils.logger import logger
+from utils.notify import subscriber_channel
+from config.settings import settings
+
+News = Dict[str, str]
+Channel = Callable[[str, str], None]
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick 多模式匹配自动机：所有关键词编译为一棵带失败指针的字典树，
+    扫描一遍文本即可找出其中出现的全部关键词，耗时只与文本长度和命中数有关，与关键词数量无关。
+    匹配不区分大小写。
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        # 状态 0 为根；goto[s] 为状态 s 的转移，output[s] 为到达 s 时结束的关键词序号（含失败链上的）
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[Tuple[int, ...]] = [()]
+        for index, pattern in enumerate(self.patterns):
+            self._add(pattern.casefold(), index)
+        self._link()
+
+    def _add(self, pattern: str, index: int):
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(())
+            state = next_state
+        self.output[state] += (index,)
+
+    def _link(self):
+        """按层次遍历计算失败指针，并把失败链上的输出合并到每个状态，匹配时无需沿失败链收集"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] += self.output[self.fail[next_state]]
+
+    def search(self, text: str) -> Set[int]:
+        """返回 text 中出现的关键词序号"""
+        goto, fail, output = self.goto, self.fail, self.output
+        found: Set[int] = set()
+        state = 0
+        for char in text.casefold():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+class Subscription:
+    """
+    一个订阅：keywords 中任一项出现在标题中即匹配（某一项为列表时，列表中的关键词需同时出现），
+    exclude 中任一关键词出现时不匹配；targets 非空时只匹配这些监控目标的条目。
+    """
+
+    def __init__(self, name: str, keywords: Iterable, channels: List[Channel],
+                 exclude: Iterable[str] = (), targets: Iterable[str] = ()):
+        self.name = name
+        groups = (tuple(k for k in ([group] if isinstance(group, str) else group) if k) for group in keywords)
+        self.groups: List[Tuple[str, ...]] = [group for group in groups if group]
+        self.exclude = tuple(k for k in exclude if k)
+        self.targets = frozenset(targets)
+        self.channels = channels
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Subscription":
+        """
+        从配置项创建订阅，channels 的每项为渠道名，或带该订阅者自己配置的对象，例如
+        {"channel": "ntfy", "NTFY_TOPIC": "zhang"}
+        """
+        name = str(data.get("name") or "")
+        if not name:
+            raise ValueError(f"订阅缺少 name: {data}")
+        channels = []
+        for entry in data.get("channels") or []:
+            if isinstance(entry, str):
+                entry = {"channel": entry}
+            config = {key: value for key, value in entry.items() if key != "channel"}
+            channels.append(subscriber_channel(entry["channel"], name, config))
+        if not channels:
+            raise ValueError(f"订阅 {name} 没有配置推送渠道")
+        return cls(name, data.get("keywords") or [], channels, data.get("exclude") or [], data.get("targets") or [])
+
+
+class SubscriptionRouter:
+    """
+    把所有订阅的关键词编译为一个自动机：每条新条目的标题只扫描一遍，
+    由命中的关键词反查包含它的订阅，订阅数量增加到数千个时单条的匹配耗时基本不变。
+    """
+
+    def __init__(self, subscriptions: List[Subscription]):
+        self.subscriptions = subscriptions
+        words: Dict[str, int] = {}
+        # 关键词序号 -> 包含该关键词的 (订阅序号, 组序号) / 排除该关键词的订阅序号
+        self.word_groups: List[List[Tuple[int, int]]] = []
+        self.word_excludes: List[List[int]] = []
+
+        def word_id(word: str) -> int:
+            key = word.casefold()
+            if key not in words:
+                words[key] = len(words)
+                self.word_groups.append([])
+                self.word_excludes.append([])
+            return words[key]
+
+        # (订阅序号, 组序号) -> 组内不同关键词的个数，命中个数达到该值时整组匹配
+        self.group_sizes: Dict[Tuple[int, int], int] = {}
+        for sub_index, subscription in enumerate(subscriptions):
+            for group_index, group in enumerate(subscription.groups):
+                ids = {word_id(word) for word in group}
+                self.group_sizes[(sub_index, group_index)] = len(ids)
+                for id in ids:
+                    self.word_groups[id].append((sub_index, group_index))
+            for word in subscription.exclude:
+                self.word_excludes[word_id(word)].append(sub_index)
+        self.automaton = KeywordAutomaton(list(words))
+
+    def match(self, news: News, target: Optional[str] = None) -> List[Subscription]:
+        """返回匹配该条目的订阅"""
+        found = self.automaton.search(news.get('title') or '')
+        if not found:
+            return []
+        hits: Dict[Tuple[int, int], int] = {}
+        excluded: Set[int] = set()
+        for id in found:
+            for group in self.word_groups[id]:
+                hits[group] = hits.get(group, 0) + 1
+            excluded.update(self.word_excludes[id])
+        matched = []
+        for sub_index in sorted({group[0] for group, count in hits.items() if count == self.group_sizes[group]}):
+            subscription = self.subscriptions[sub_index]
+            if sub_index in excluded or (subscription.targets and target not in subscription.targets):
+                continue
+            matched.append(subscription)
+        return matched
+
+    def route(self, news_list: Iterable[News], target: Optional[str] = None) -> Dict[Channel, List[News]]:
+        """按订阅者的渠道分组新条目；同一渠道被多个订阅命中的条目只推送一次"""
+        routes: Dict[Channel, List[News]] = {}
+        for news in news_list:
+            channels = {
+                channel.__name__: channel for subscription in self.match(news, target) for channel in subscription.channels
+            }
+            for channel in channels.values():
+                routes.setdefault(channel, []).append(news)
+        return routes
+
+
+def load_subscriptions(path: Path) -> List[Subscription]:
+    """从 JSON 文件读取订阅列表，配置有误的订阅跳过并记录错误"""
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    subscriptions = []
+    for entry in entries:
+        try:
+            subscriptions.append(Subscription.from_dict(entry))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"订阅配置无效，已跳过: {str(e)}")
+    return subscriptions
+
+
+_router: Optional[SubscriptionRouter] = None
+_router_mtime: Optional[float] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> Optional[SubscriptionRouter]:
+    """
+    获取订阅路由，订阅文件修改后自动重新编译；未配置订阅文件或文件不存在时返回 None。
+    """
+    global _router, _router_mtime
+    path = settings.SUBSCRIPTIONS_FILE
+    if not path:
+        return None
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+    if mtime == _router_mtime:
+        return _router
+    with _router_lock:
+        if mtime != _router_mtime:
+            try:
+                subscriptions = load_subscriptions(path)
+            except (OSError, ValueError) as e:
+                logger.error(f"读取订阅文件 {path} 失败: {str(e)}")
+                subscriptions = None
+            if subscriptions is not None:
+                _router = SubscriptionRouter(subscriptions)
+                logger.info(f"已加载 {len(subscriptions)} 个订阅，共 {len(_router.automaton.patterns)} 个关键词")
+            _router_mtime = mtime
+    return _router